@@ -3,11 +3,11 @@
 
   const script = document.currentScript || Array.from(document.scripts || []).find((item) => {
     const src = String(item.getAttribute('src') || item.src || '');
-    return /(?:^|\/)js\/admin-bootstrap\.js(?:$|[?#])/.test(src);
+    return /(?:^|\/)js\/admin-bootstrap(?:\.[0-9a-f]{12})?\.js(?:$|[?#])/.test(src);
   });
   const rawSrc = script ? String(script.getAttribute('src') || script.src || '') : '';
   const cleanSrc = rawSrc.split('?', 1)[0].split('#', 1)[0];
-  const marker = cleanSrc.lastIndexOf('js/admin-bootstrap.js');
+  const marker = cleanSrc.search(/js\/admin-bootstrap(?:\.[0-9a-f]{12})?\.js$/);
   const rootPath = marker === -1 ? '' : cleanSrc.slice(0, marker);
   const HYDRATION_SENTINEL = 'resume-cms-public-hydrated-v2';
   let editorLoaded = false;
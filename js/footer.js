@@ -19,12 +19,12 @@
 	    function inferRootPathFromFooterScript() {
 	        const script = Array.from(document.scripts || []).find((s) => {
 	            const src = String(s.getAttribute('src') || s.src || '');
-	            return /(?:^|\/)js\/footer\.js(?:$|[?#])/.test(src);
+	            return /(?:^|\/)js\/footer(?:\.[0-9a-f]{12})?\.js(?:$|[?#])/.test(src);
 	        });
 	        if (!script) return '';
 	        const raw = String(script.getAttribute('src') || script.src || '');
 	        const clean = raw.split('?', 1)[0].split('#', 1)[0];
-	        const marker = clean.lastIndexOf('js/footer.js');
+	        const marker = clean.search(/js\/footer(?:\.[0-9a-f]{12})?\.js$/);
 	        if (marker === -1) return '';
 	        return clean.slice(0, marker);
 	    }
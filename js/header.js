@@ -55,12 +55,12 @@
     function inferRootPrefixFromHeaderScript() {
         const script = Array.from(document.scripts || []).find((s) => {
             const src = String(s.getAttribute('src') || s.src || '');
-            return /(?:^|\/)js\/header\.js(?:$|[?#])/.test(src);
+            return /(?:^|\/)js\/header(?:\.[0-9a-f]{12})?\.js(?:$|[?#])/.test(src);
         });
         if (!script) return '';
         const raw = String(script.getAttribute('src') || script.src || '');
         const clean = raw.split('?', 1)[0].split('#', 1)[0];
-        const marker = clean.lastIndexOf('js/header.js');
+        const marker = clean.search(/js\/header(?:\.[0-9a-f]{12})?\.js$/);
         if (marker === -1) return '';
         return normalizeRootPrefix(clean.slice(0, marker));
     }
@@ -460,7 +460,9 @@
 
 	        // Nested "inner" pages that live under /pages/*/ (for example /pages/blog/my-post.html).
 	        // Same visual style as `inner`, but links must step up one extra directory.
-	        if (variant === 'inner-nested') {
+	        // `inner-nested-deep` is for pages two levels down (for example /pages/blog/page/2.html).
+	        if (variant === 'inner-nested' || variant === 'inner-nested-deep') {
+	            const up = variant === 'inner-nested-deep' ? '../../' : '../';
 	            return `
 	      <div class="shell">
 	        <nav class="nav">
@@ -472,15 +474,15 @@
 	          </div>
 	          <div class="nav-main">
 	            ${renderMainNavLinks(activePage, {
-	                overviewHref: '../../index.html',
+	                overviewHref: `${up}../index.html`,
 
-	                projectsHref: '../projects.html',
-	                projectsDropdownPrefix: '../projects/',
+	                projectsHref: `${up}projects.html`,
+	                projectsDropdownPrefix: `${up}projects/`,
 	                projectsWrapperClass: 'dropdown',
 	                projectsAnchorClass: 'dropbtn',
 	                projectsDropdownClass: 'dropdown-content',
-	                blogHref: '../blog.html',
-	                aboutHref: '../about.html'
+	                blogHref: `${up}blog.html`,
+	                aboutHref: `${up}about.html`
 	            })}
 	          </div>
 		          <div class="nav-auth-cta">
@@ -489,11 +491,11 @@
 		          </div>
 
 	          ${renderMobileMenu(activePage, {
-	                overviewHref: '../../index.html',
-	                projectsHref: '../projects.html',
-	                projectsDropdownPrefix: '../projects/',
-	                blogHref: '../blog.html',
-	                aboutHref: '../about.html'
+	                overviewHref: `${up}../index.html`,
+	                projectsHref: `${up}projects.html`,
+	                projectsDropdownPrefix: `${up}projects/`,
+	                blogHref: `${up}blog.html`,
+	                aboutHref: `${up}about.html`
 	            })}
 	        </nav>
 	      </div>`;
@@ -130,6 +130,12 @@
   var slug = currentProjectSlug();
   if (!slug || slug === 'project-template') return;
 
+  // scripts/prerender_projects.py renders the section into the page at build time.
+  if (document.querySelector('.project-case-study')) {
+    document.body.classList.add('has-project-case-study');
+    return;
+  }
+
   var embedded = parseEmbeddedCaseStudy();
   if (embedded) {
     renderCaseStudy(embedded);
@@ -145,23 +145,27 @@
         : null;
     }
 
-    async function loadCaseStudyMap(rootPrefix) {
-      try {
-        const response = await fetch(`${rootPrefix || ""}data/project-case-studies.json?v=5`, {
-          credentials: "same-origin",
+    // The card preview fields of a case-study card the build pre-rendered.
+    function readCardCaseStudy(card) {
+      const desc = card.querySelector(".project-desc");
+      const rows = Array.from(card.querySelectorAll(".project-case-study-preview p"));
+      const rowText = (label) => {
+        const row = rows.find((item) => {
+          const span = item.querySelector("span");
+          return span && span.textContent.trim() === label;
         });
-        if (!response.ok) return new Map();
-        const payload = await response.json();
-        const projects = payload && payload.projects && typeof payload.projects === "object"
-          ? payload.projects
-          : {};
-        const entries = Object.entries(projects)
-          .map(([slug, value]) => [slug, normalizeCaseStudy(value)])
-          .filter((entry) => entry[0] && entry[1]);
-        return new Map(entries);
-      } catch (_e) {
-        return new Map();
-      }
+        if (!row) return "";
+        const span = row.querySelector("span");
+        return String(row.textContent || "").slice(String(span.textContent || "").length).trim();
+      };
+      return {
+        summary: desc ? String(desc.textContent || "").trim() : "",
+        problem: rowText("Problem"),
+        impact: rowText("Value"),
+        tools: Array.from(card.querySelectorAll(".project-card-tags span"))
+          .map((tag) => String(tag.textContent || "").trim())
+          .filter(Boolean),
+      };
     }
 
     function resolveCaseStudy(project, slug, caseStudies) {
@@ -170,11 +174,21 @@
       return slug && caseStudies instanceof Map ? caseStudies.get(slug) || null : null;
     }
 
-    function readEmbeddedProjects() {
+    // The build writes the snapshot to a content-hashed file the element points at;
+    // older pages carry it inline.
+    async function loadSnapshotProjects() {
       const script = document.querySelector('script[type="application/json"][data-projects-fallback="1"]');
       if (!script) return [];
       try {
-        const payload = JSON.parse(String(script.textContent || "[]"));
+        const src = String(script.getAttribute("data-src") || "").trim();
+        let payload;
+        if (src) {
+          const response = await fetch(src, { credentials: "same-origin" });
+          if (!response.ok) return [];
+          payload = await response.json();
+        } else {
+          payload = JSON.parse(String(script.textContent || "[]"));
+        }
         return Array.isArray(payload) ? payload.filter((item) => item && typeof item === "object") : [];
       } catch (_e) {
         return [];
@@ -237,9 +251,17 @@
         document.getElementById("site-footer").dataset &&
         document.getElementById("site-footer").dataset.rootPath) ||
       "../";
-    const caseStudies = await loadCaseStudyMap(rootPrefix);
     armImageFallbacks(grid);
 
+    // Supabase rows without their own case_study keep the preview the build rendered
+    // into their card from the repository case studies.
+    const prerenderedCaseStudies = new Map(
+      Array.from(grid.querySelectorAll(".project-card.project-card--case-study")).map((card) => {
+        const link = card.querySelector(".project-title a");
+        return [hrefToSlug(link && link.getAttribute("href")), readCardCaseStudy(card)];
+      })
+    );
+
     const LOCAL_PREVIEW_SLUGS = new Set([
       "fleet-maintenance-analytics",
       "inventory-control-dashboard",
@@ -277,9 +299,14 @@
         .map((entry) => entry.project);
     }
 
-    const fallbackProjects = mergeLocalProjects(readEmbeddedProjects());
+    // Fetched only when the pre-rendered cards are missing and Supabase cannot replace them.
+    async function renderFallbackProjects() {
+      if (grid.querySelector(".project-card")) return;
+      const fallbackProjects = mergeLocalProjects(await loadSnapshotProjects());
+      renderProjects(fallbackProjects.length ? fallbackProjects : LOCAL_PROJECTS);
+    }
 
-    function renderCards(list, noteHtml) {
+    function renderCards(list, noteHtml, caseStudies) {
       const note = noteHtml ? `<div style="color: var(--text-muted); font-size: 12px; margin-bottom: 10px;">${noteHtml}</div>` : "";
       const cards = (list || []).map((p) => {
         const href = normalizeProjectHref(p.href) || "#";
@@ -342,10 +369,12 @@
       armImageFallbacks(grid);
     }
 
+    function renderProjects(list) {
+      setGridHtml(renderCards(list, "", prerenderedCaseStudies));
+    }
+
     if (!cfg.url || !cfg.anonKey || !window.supabase) {
-      if (!grid.querySelector(".project-card")) {
-        setGridHtml(renderCards(fallbackProjects.length ? fallbackProjects : LOCAL_PROJECTS, ""));
-      }
+      await renderFallbackProjects();
       return;
     }
 
@@ -358,20 +387,16 @@
       .order("id", { ascending: true });
 
     if (error) {
-      if (!grid.querySelector(".project-card")) {
-        setGridHtml(renderCards(fallbackProjects.length ? fallbackProjects : LOCAL_PROJECTS, ""));
-      }
+      await renderFallbackProjects();
       return;
     }
 
     if (!data || data.length === 0) {
-      if (!grid.querySelector(".project-card")) {
-        setGridHtml(renderCards(fallbackProjects.length ? fallbackProjects : LOCAL_PROJECTS, ""));
-      }
+      await renderFallbackProjects();
       return;
     }
 
-    setGridHtml(renderCards(mergeLocalProjects(data), ""));
+    renderProjects(mergeLocalProjects(data));
   }
 
   document.addEventListener("DOMContentLoaded", () => {
@@ -0,0 +1,257 @@
+(function () {
+  // Client for the static index scripts/search_index.py writes. Only index.json, the
+  // term shards a query touches and the document chunks of the shown results are fetched.
+  const SEARCH_ROOT = '/data/search/';
+  const BM25_K1 = 1.2;
+  const BM25_B = 0.75;
+  const TITLE_BOOST = 2;
+  const MAX_PREFIX_TERMS = 50;
+
+  const requests = new Map();
+  let manifestRequest = null;
+
+  function fetchJson(name) {
+    if (!requests.has(name)) {
+      const request = fetch(SEARCH_ROOT + name, { credentials: 'same-origin' }).then((response) => {
+        if (!response.ok) throw new Error(`Search index request failed: ${response.status} ${name}`);
+        return response.json();
+      });
+      // Forget failures so a later query can retry.
+      request.catch(() => requests.delete(name));
+      requests.set(name, request);
+    }
+    return requests.get(name);
+  }
+
+  function loadManifest() {
+    if (!manifestRequest) {
+      manifestRequest = fetchJson('index.json').then((manifest) => ({
+        ...manifest,
+        shardSet: new Set(manifest.shards),
+        stopwordSet: new Set(manifest.stopwords),
+      }));
+      manifestRequest.catch(() => {
+        manifestRequest = null;
+      });
+    }
+    return manifestRequest;
+  }
+
+  // Same folding as search_terms() in scripts/search_index.py.
+  function tokenize(text) {
+    return String(text || '')
+      .normalize('NFKD')
+      .replace(/\p{M}/gu, '')
+      .toLowerCase()
+      .match(/[a-z0-9]+/g) || [];
+  }
+
+  function isIndexed(manifest, term) {
+    return term.length >= manifest.prefix_length && !manifest.stopwordSet.has(term);
+  }
+
+  function decodePostings(encoded) {
+    const postings = new Map();
+    let doc = 0;
+    for (let i = 0; i < encoded.length; i += 2) {
+      doc += encoded[i];
+      let position = 0;
+      postings.set(doc, encoded[i + 1].map((step) => (position += step)));
+    }
+    return postings;
+  }
+
+  async function loadShard(manifest, term) {
+    const prefix = term.slice(0, manifest.prefix_length);
+    if (!manifest.shardSet.has(prefix)) return {};
+    return fetchJson(`terms-${prefix}.json`);
+  }
+
+  // Each clause is a list of terms, any of which satisfies it (several for a prefix).
+  function parseQuery(manifest, query, allowPrefix) {
+    const clauses = [];
+    const phrases = [];
+    const source = String(query || '');
+    const quoted = /"([^"]*)"?/g;
+    let match;
+    while ((match = quoted.exec(source))) {
+      const tokens = tokenize(match[1]);
+      const phrase = tokens
+        .map((term, offset) => ({ term, offset }))
+        .filter(({ term }) => isIndexed(manifest, term));
+      if (phrase.length > 1) phrases.push(phrase);
+      phrase.forEach(({ term }) => clauses.push({ terms: [term], prefix: false }));
+    }
+    const loose = tokenize(source.replace(quoted, ' ')).filter((term) => isIndexed(manifest, term));
+    const endsOpen = allowPrefix && /[a-z0-9]$/i.test(source.trim()) && !/"$/.test(source.trim());
+    loose.forEach((term, index) => {
+      clauses.push({ terms: [term], prefix: endsOpen && index === loose.length - 1 });
+    });
+    return { clauses, phrases };
+  }
+
+  function matchesPhrase(phrase, positionsFor) {
+    const [first, ...rest] = phrase;
+    return positionsFor(first.term).some((start) =>
+      rest.every(({ term, offset }) => positionsFor(term).includes(start - first.offset + offset)),
+    );
+  }
+
+  async function search(query, options = {}) {
+    const limit = options.limit || 10;
+    const manifest = await loadManifest();
+    const { clauses, phrases } = parseQuery(manifest, query, options.prefix !== false);
+    if (!clauses.length) return [];
+
+    const shards = await Promise.all(clauses.map((clause) => loadShard(manifest, clause.terms[0])));
+    const termPostings = new Map();
+    const clauseDocs = clauses.map((clause, index) => {
+      const shard = shards[index];
+      const [word] = clause.terms;
+      const terms = clause.prefix
+        ? Object.keys(shard).filter((term) => term.startsWith(word)).slice(0, MAX_PREFIX_TERMS)
+        : [word].filter((term) => term in shard);
+      const docs = new Set();
+      terms.forEach((term) => {
+        if (!termPostings.has(term)) termPostings.set(term, decodePostings(shard[term]));
+        termPostings.get(term).forEach((_, doc) => docs.add(doc));
+      });
+      clause.terms = terms;
+      return docs;
+    });
+
+    clauseDocs.sort((a, b) => a.size - b.size);
+    let candidates = [...clauseDocs[0]].filter((doc) => clauseDocs.every((docs) => docs.has(doc)));
+    if (phrases.length) {
+      candidates = candidates.filter((doc) =>
+        phrases.every((phrase) =>
+          matchesPhrase(phrase, (term) => (termPostings.get(term) && termPostings.get(term).get(doc)) || []),
+        ),
+      );
+    }
+
+    const total = manifest.documents || 1;
+    const averageLength = manifest.average_length || 1;
+    const scored = candidates.map((doc) => {
+      const [length, titleLength] = manifest.lengths[doc] || [averageLength, 0];
+      let score = 0;
+      clauses.forEach((clause) => {
+        clause.terms.forEach((term) => {
+          const postings = termPostings.get(term);
+          const positions = postings.get(doc);
+          if (!positions) return;
+          const idf = Math.log(1 + (total - postings.size + 0.5) / (postings.size + 0.5));
+          const frequency = positions.length + (TITLE_BOOST - 1) * positions.filter((p) => p < titleLength).length;
+          const norm = BM25_K1 * (1 - BM25_B + (BM25_B * length) / averageLength);
+          score += (idf * frequency * (BM25_K1 + 1)) / (frequency + norm);
+        });
+      });
+      return { doc, score };
+    });
+    scored.sort((a, b) => b.score - a.score || a.doc - b.doc);
+
+    const top = scored.slice(0, limit);
+    const chunks = await Promise.all(
+      [...new Set(top.map(({ doc }) => Math.floor(doc / manifest.chunk_size)))].map(async (chunk) => [
+        chunk,
+        await fetchJson(`docs-${chunk}.json`),
+      ]),
+    );
+    const entries = new Map(chunks);
+    return top
+      .map(({ doc, score }) => {
+        const entry = entries.get(Math.floor(doc / manifest.chunk_size))[doc % manifest.chunk_size];
+        if (!entry) return null;
+        const [key, url, title, snippet] = entry;
+        return { key, url, title, snippet, score };
+      })
+      .filter(Boolean);
+  }
+
+  const INPUT_DELAY_MS = 150;
+
+  function escapeHtml(value) {
+    return String(value || '')
+      .replace(/&/g, '&amp;')
+      .replace(/</g, '&lt;')
+      .replace(/>/g, '&gt;')
+      .replace(/"/g, '&quot;');
+  }
+
+  function renderResults(results) {
+    const items = results
+      .map(
+        (result) => `
+          <article class="blog-list-item">
+            <h2 class="blog-list-title"><a href="${escapeHtml(result.url)}">${escapeHtml(result.title)}</a></h2>
+            ${result.snippet ? `<p class="blog-list-excerpt">${escapeHtml(result.snippet)}</p>` : ''}
+          </article>`,
+      )
+      .join('');
+    return items ? `<div class="blog-list">${items}</div>` : '';
+  }
+
+  // A form[data-site-search] names its results container and the listing it stands in
+  // for while a query is typed; the query is kept in ?q= so results can be linked.
+  function bindForm(form) {
+    const input = form.querySelector('input[name="q"]');
+    const results = document.getElementById(form.dataset.siteSearch);
+    const listing = Array.from(document.querySelectorAll(form.dataset.siteSearchReplaces || ''));
+    if (!input || !results) return;
+
+    let latest = 0;
+    let timer = null;
+
+    function show(query) {
+      const searching = Boolean(query.trim());
+      results.hidden = !searching;
+      listing.forEach((element) => {
+        element.hidden = searching;
+      });
+      const url = new URL(window.location.href);
+      if (searching) url.searchParams.set('q', query);
+      else url.searchParams.delete('q');
+      window.history.replaceState(null, '', url);
+      if (!searching) {
+        results.innerHTML = '';
+        return;
+      }
+      const current = ++latest;
+      search(query)
+        .then((found) => {
+          if (current !== latest) return;
+          const status = found.length
+            ? `${found.length} result${found.length === 1 ? '' : 's'}`
+            : 'No posts or projects match that search.';
+          results.innerHTML = `<p class="blog-search-status">${status}</p>${renderResults(found)}`;
+        })
+        .catch((err) => {
+          if (current !== latest) return;
+          results.innerHTML = '<p class="blog-search-status">Search is unavailable right now.</p>';
+          console.warn('Site search failed.', err);
+        });
+    }
+
+    form.addEventListener('submit', (event) => {
+      event.preventDefault();
+      clearTimeout(timer);
+      show(input.value);
+    });
+    input.addEventListener('input', () => {
+      clearTimeout(timer);
+      timer = setTimeout(() => show(input.value), INPUT_DELAY_MS);
+    });
+
+    const initial = new URLSearchParams(window.location.search).get('q');
+    if (initial) {
+      input.value = initial;
+      show(initial);
+    }
+  }
+
+  document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('form[data-site-search]').forEach(bindForm);
+  });
+
+  window.SiteSearch = { search, tokenize };
+})();
@@ -1,6 +1,18 @@
 (function () {
   const SUPABASE_VENDOR_PATH = 'assets/vendor/supabase/supabase-js.v2.js';
   const THREE_VENDOR_PATH = 'assets/vendor/three/three.r128.min.js';
+  // Also matches the content-hashed copies generated pages link to (site-shell.<hash>.js).
+  const SHELL_SCRIPT_PATH = /js\/site-shell(?:\.[0-9a-f]{12})?\.js(?:$|[?#])/;
+
+  function findShellScript() {
+    return Array.from(document.scripts || []).find((s) => SHELL_SCRIPT_PATH.test(String(s.getAttribute('src') || '')));
+  }
+
+  // Pages with inlined critical CSS fetch the full stylesheets as media="print" so they
+  // do not block the first paint; apply them now that the document has been parsed.
+  document.querySelectorAll('link[data-deferred-style]').forEach((link) => {
+    link.media = 'all';
+  });
 
 
   function init() {
@@ -42,10 +54,10 @@
 
     // 2. Determine base path
     let basePath = '';
-    const shellScript = document.querySelector('script[src*="site-shell.js"]');
+    const shellScript = findShellScript();
     if (shellScript) {
       const src = shellScript.getAttribute('src');
-      const idx = src.lastIndexOf('js/site-shell.js');
+      const idx = src.search(SHELL_SCRIPT_PATH);
       if (idx !== -1) {
         basePath = src.substring(0, idx);
       }
@@ -79,10 +91,10 @@
   }
 
   function getShellBasePath() {
-    const shellScript = document.querySelector('script[src*="site-shell.js"]');
+    const shellScript = findShellScript();
     if (!shellScript) return '';
     const src = String(shellScript.getAttribute('src') || '');
-    const idx = src.lastIndexOf('js/site-shell.js');
+    const idx = src.search(SHELL_SCRIPT_PATH);
     if (idx === -1) return '';
     return src.substring(0, idx);
   }
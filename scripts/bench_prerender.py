@@ -0,0 +1,604 @@
+#!/usr/bin/env python3
+"""Microbenchmarks for the prerender scripts.
+
+Each benchmark compares the current implementation with the one it replaced,
+checks that both produce identical output, and prints timings.
+
+Usage:
+  python3 scripts/bench_prerender.py render-body [--words 120000] [--repeat 5]
+  python3 scripts/bench_prerender.py page-shell [--pages 10000] [--repeat 5]
+  python3 scripts/bench_prerender.py merge-projects [--projects 20000] [--repeat 5]
+  python3 scripts/bench_prerender.py detail-metadata [--copies 256] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import html
+import random
+import re
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+from urllib.parse import urlparse
+
+import prerender_blog
+import prerender_projects
+from fingerprint_assets import asset_url
+
+# The f-string shell hard-coded its asset URLs; resolve them once so it still does.
+LEGACY_STYLESHEET = html.escape(asset_url("assets/css/styles.css"), quote=True)
+LEGACY_SCRIPTS = "".join(
+    f'  <script src="{html.escape(asset_url(path), quote=True)}"></script>\n'
+    for path in ("js/admin-bootstrap.js", "js/header.js", "js/site-shell.js")
+)
+
+def legacy_escape_inline(text: str) -> str:
+    safe = html.escape(str(text or ""), quote=False)
+    safe = safe.replace("\t", "&nbsp;&nbsp;&nbsp;&nbsp;")
+    safe = re.sub(r"\+\+([^+\n][^+\n]*?)\+\+", r"<u>\1</u>", safe)
+    safe = re.sub(r"\*\*([^*\n][^*\n]*?)\*\*", r"<strong>\1</strong>", safe)
+    safe = re.sub(r"(^|[^*])\*([^*\n][^*\n]*?)\*(?!\*)", r"\1<em>\2</em>", safe)
+    return safe
+
+
+def legacy_render_body(raw_body: str) -> str:
+    raw = str(raw_body or "").replace("\r\n", "\n").replace("\r", "\n").strip()
+    if not raw:
+        return '<p class="blog-note">No content yet.</p>'
+
+    blocks = [block.strip() for block in re.split(r"\n{2,}", raw) if block.strip()]
+    rendered: list[str] = []
+
+    for block in blocks:
+        img_match = re.fullmatch(r"!\[(.*?)\]\((.*?)\)", block)
+        if img_match:
+            alt = html.escape(img_match.group(1).strip() or "Article illustration", quote=True)
+            src = html.escape(prerender_blog.normalize_asset_url(img_match.group(2)), quote=True)
+            if not src:
+                continue
+            rendered.append(
+                f"""
+          <figure class="blog-inline-image">
+            <img src="{src}" alt="{alt}" loading="lazy">
+          </figure>
+        """.strip()
+            )
+            continue
+
+        if block.startswith("## "):
+            rendered.append(f"<h2>{legacy_escape_inline(block[3:].strip() or 'Section')}</h2>")
+            continue
+
+        if block.startswith("### "):
+            rendered.append(f"<h3>{legacy_escape_inline(block[4:].strip() or 'Subsection')}</h3>")
+            continue
+
+        paragraph = "<br>".join(legacy_escape_inline(part) for part in block.split("\n"))
+        rendered.append(f"<p>{paragraph}</p>")
+
+    return "\n".join(rendered)
+
+
+def legacy_render_head(
+    title: str,
+    description: str,
+    canonical: str,
+    og_type: str,
+    image: str = "",
+    links: list[tuple[str, str]] | None = None,
+) -> str:
+    feeds = (
+        ("application/atom+xml", prerender_blog.ATOM_FEED_PATH),
+        ("application/rss+xml", prerender_blog.RSS_FEED_PATH),
+        ("application/feed+json", prerender_blog.JSON_FEED_PATH),
+    )
+    link_tags = "".join(
+        f'\n  <link rel="alternate" type="{html.escape(feed_type, quote=True)}" '
+        f'title="{html.escape("Juan R. Reynoso | Blog", quote=True)}" href="{html.escape("/" + path, quote=True)}">'
+        for feed_type, path in feeds
+    )
+    link_tags += "".join(
+        f'\n  <link rel="{html.escape(rel, quote=True)}" href="{html.escape(href, quote=True)}">'
+        for rel, href in links or []
+    )
+    image_tags = ""
+    if image:
+        image = prerender_blog.absolute_asset_url(image)
+        image_tags = (
+            f'\n  <meta property="og:image" content="{html.escape(image, quote=True)}">'
+            f'\n  <meta name="twitter:image" content="{html.escape(image, quote=True)}">'
+        )
+    return f"""<!DOCTYPE html>
+{prerender_blog.GENERATED_MARKER}
+<html lang="en">
+<head>
+  <meta charset="UTF-8" />
+  <title>{html.escape(title, quote=True)}</title>
+  <meta name="description" content="{html.escape(description, quote=True)}">
+  <meta name="robots" content="index,follow">
+  <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+  <link rel="canonical" href="{html.escape(canonical, quote=True)}">{link_tags}
+  <meta property="og:site_name" content="Juan R. Reynoso">
+  <meta property="og:title" content="{html.escape(title, quote=True)}">
+  <meta property="og:description" content="{html.escape(description, quote=True)}">
+  <meta property="og:url" content="{html.escape(canonical, quote=True)}">
+  <meta property="og:type" content="{html.escape(og_type, quote=True)}">
+  <meta name="twitter:card" content="summary_large_image">{image_tags}
+  <meta http-equiv="Content-Security-Policy" content="default-src 'self'; base-uri 'self'; object-src 'none'; img-src 'self' data: blob: https://xxrllcpoklgavakmzhnb.supabase.co; media-src 'self' data: blob: https://xxrllcpoklgavakmzhnb.supabase.co; script-src 'self'; style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; font-src 'self' https://fonts.gstatic.com data:; connect-src 'self' https://xxrllcpoklgavakmzhnb.supabase.co; form-action 'self'">
+  <meta name="referrer" content="strict-origin-when-cross-origin">
+  <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap" rel="stylesheet" />
+  <link rel="stylesheet" href="{LEGACY_STYLESHEET}" />
+"""
+
+
+def legacy_render_site_footer(root_path: str) -> str:
+    return f"""
+  <footer id="site-footer" data-root-path="{html.escape(root_path, quote=True)}">
+    <div class="shell">
+      <div class="footer-row">
+        <div style="display: flex; align-items: center; gap: 8px;">
+          <span>© <span data-footer-year="1">2026</span> Juan R. Reynoso. All rights reserved.</span>
+        </div>
+        <div class="footer-links">
+          <a href="#top">Back to top</a>
+        </div>
+      </div>
+    </div>
+  </footer>
+"""
+
+
+def legacy_page_shell(page: dict) -> str:
+    head = legacy_render_head(
+        page["title"], page["description"], page["canonical"], "article", page["image"], page["links"]
+    )
+    return f"""{head}</head>
+{legacy_render_site_footer(page["root_path"])}
+{LEGACY_SCRIPTS}  <script type="application/ld+json">{page["json_ld"]}</script>
+"""
+
+
+def current_page_shell(page: dict) -> str:
+    head = prerender_blog.render_head(
+        page["title"], page["description"], page["canonical"], "article", page["image"], page["links"]
+    )
+    return f"""{head}</head>
+{prerender_blog.render_site_footer(page["root_path"])}
+{prerender_blog.blog_scripts().render(json_ld=page["json_ld"])}"""
+
+
+def legacy_href_to_slug(raw_href: object) -> str:
+    href = str(raw_href or "").strip().split("#", 1)[0].split("?", 1)[0]
+    filename = href.rstrip("/").rsplit("/", 1)[-1]
+    return re.sub(r"\.html$", "", filename, flags=re.IGNORECASE)
+
+
+def legacy_normalize_project_href(raw_href: object) -> str:
+    href = str(raw_href or "").strip()
+    if not href:
+        return ""
+    parsed = urlparse(href)
+    path = parsed.path
+    match = re.search(r"(?:^|/)projects/([a-z0-9][a-z0-9-]*\.html)$", path, re.IGNORECASE)
+    if not match:
+        return ""
+    suffix = f"?{parsed.query}" if parsed.query else ""
+    suffix += f"#{parsed.fragment}" if parsed.fragment else ""
+    return f"projects/{match.group(1)}{suffix}"
+
+
+def legacy_merge_projects(remote_projects: list[dict], case_studies: dict[str, dict]) -> list[dict]:
+    href_to_slug = legacy_href_to_slug
+    featured_slugs = prerender_projects.FEATURED_PROJECT_SLUGS
+    merged = [dict(item) for item in remote_projects]
+    for local_project in prerender_projects.LOCAL_PROJECTS:
+        local_slug = href_to_slug(local_project["href"])
+        existing_index = next(
+            (
+                index
+                for index, item in enumerate(merged)
+                if href_to_slug(item.get("href")) == local_slug
+            ),
+            None,
+        )
+        if existing_index is None:
+            merged.append(dict(local_project))
+        else:
+            merged[existing_index].update(local_project)
+
+    normalized = []
+    for project in merged:
+        href = legacy_normalize_project_href(project.get("href"))
+        if not href:
+            continue
+        project["href"] = href
+        slug = href_to_slug(href)
+        if slug in case_studies:
+            case_study = case_studies[slug]
+            project["case_study"] = case_study
+            if str(case_study.get("summary") or "").strip():
+                project["description"] = str(case_study["summary"]).strip()
+        normalized.append(project)
+    featured_rank = {slug: index for index, slug in enumerate(featured_slugs)}
+    normalized.sort(key=lambda project: featured_rank.get(href_to_slug(project.get("href")), len(featured_slugs)))
+    return normalized
+
+
+def legacy_upsert_head_metadata(source: str, description: str, canonical_url: str) -> str:
+    description_tag = prerender_projects.META_DESCRIPTION_TAG.render(description=description)
+    canonical_tag = prerender_projects.CANONICAL_LINK_TAG.render(canonical=canonical_url)
+
+    description_pattern = re.compile(r'<meta\s+name="description"\s+content="[^"]*"\s*/?>', re.IGNORECASE)
+    canonical_pattern = re.compile(r'<link\s+rel="canonical"\s+href="[^"]*"\s*/?>', re.IGNORECASE)
+
+    if description_pattern.search(source):
+        source = description_pattern.sub(description_tag, source, count=1)
+    else:
+        source = re.sub(r"(\s*</title>)", rf"\1\n  {description_tag}", source, count=1)
+
+    if canonical_pattern.search(source):
+        source = canonical_pattern.sub(canonical_tag, source, count=1)
+    else:
+        source = source.replace(description_tag, f"{description_tag}\n  {canonical_tag}", 1)
+    return source
+
+
+def legacy_update_detail_metadata(path: Path, source: str) -> str:
+    hero_match = re.search(
+        r'<section\s+class="hero"[^>]*>[\s\S]*?<h1[^>]*>[\s\S]*?</h1>\s*<p[^>]*>([\s\S]*?)</p>',
+        source,
+        re.IGNORECASE,
+    )
+    if not hero_match:
+        raise RuntimeError(f"Could not find a hero summary in {path.name}")
+    seo_description_match = re.search(
+        r'<section\s+class="hero"[^>]*\sdata-seo-description="([^"]+)"',
+        source,
+        re.IGNORECASE,
+    )
+    description = (
+        html.unescape(seo_description_match.group(1)).strip()
+        if seo_description_match
+        else prerender_projects.text_content(hero_match.group(1))
+    )
+    canonical = f"{prerender_projects.SITE_ORIGIN}/pages/projects/{path.name}"
+    return legacy_upsert_head_metadata(source, description, canonical)
+
+
+DESCRIPTION_META = re.compile(r'\s*<meta\s+name="description"[^>]*>', re.IGNORECASE)
+CANONICAL_LINK = re.compile(r'\s*<link\s+rel="canonical"[^>]*>', re.IGNORECASE)
+
+
+def detail_page_variants(source: str) -> list[str]:
+    """The page as committed plus versions missing the head tags the generator adds."""
+    bare = CANONICAL_LINK.sub("", DESCRIPTION_META.sub("", source))
+    return [
+        source,
+        DESCRIPTION_META.sub("", source),
+        CANONICAL_LINK.sub("", source),
+        bare,
+        bare.replace('<section class="hero">', '<section class="hero" data-seo-description="Set &amp; kept.">', 1),
+    ]
+
+
+def large_detail_page(source: str, copies: int) -> str:
+    """A detail page whose main column repeats its sections ``copies`` times, head tags missing."""
+    start = source.index("</section>", source.index('class="hero"')) + len("</section>")
+    end = source.index("</main>")
+    body = source[start:end] + '\n      <section class="card"><h1>Appendix</h1><div>Notes</div></section>'
+    page = source[:start] + body * copies + source[end:]
+    return CANONICAL_LINK.sub("", DESCRIPTION_META.sub("", page))
+
+
+def synthetic_projects(count: int, seed: int = 7) -> tuple[list[dict], dict[str, dict]]:
+    """Remote rows in the href shapes Supabase returns, some unusable.
+
+    Featured slugs are mixed in, but none of the local projects are published remotely
+    yet, which is the case ``LOCAL_PROJECTS`` exists for and the one the old merge
+    answered with a scan of every row per local project.
+    """
+    rng = random.Random(seed)
+    featured = prerender_projects.FEATURED_PROJECT_SLUGS
+    rows = []
+    for number in range(count):
+        slug = rng.choice(featured) if rng.random() < 0.001 else f"project-{number}"
+        roll = rng.random()
+        if roll < 0.6:
+            href = f"projects/{slug}.html"
+        elif roll < 0.8:
+            href = f"https://www.jreynoso.net/pages/projects/{slug}.HTML?ref=card#top"
+        elif roll < 0.95:
+            href = f"../projects/{slug}.html"
+        else:
+            href = f"pages/{slug}"
+        rows.append(
+            {
+                "id": number,
+                "title": f"Project {number}",
+                "description": f"Remote description {number}.",
+                "href": href,
+                "image_url": f"assets/images/projects/{slug}.png" if rng.random() < 0.5 else "",
+                "is_published": True,
+                "sort_order": number,
+            }
+        )
+    case_studies = {
+        f"project-{number}": {"summary": f"Case study {number}." if number % 3 else "", "problem": "Downtime."}
+        for number in range(0, count, 7)
+    }
+    return rows, case_studies
+
+
+def synthetic_local_projects(count: int, remote_count: int, seed: int = 11) -> list[dict]:
+    """Local projects for a catalog of ``remote_count`` rows: half overlay one, half are new."""
+    rng = random.Random(seed)
+    projects = []
+    for number in range(count):
+        slug = f"project-{rng.randrange(remote_count)}" if number % 2 else f"local-{number}"
+        projects.append(
+            {
+                "title": f"Local project {number}",
+                "description": f"Local description {number}.",
+                "href": f"projects/{slug}.html",
+                "image_url": f"/assets/images/projects/previews/{slug}.svg",
+                "is_published": True,
+                "sort_order": 1000 + number,
+            }
+        )
+    return projects
+
+
+@contextmanager
+def local_projects(projects: list[dict]) -> Iterator[None]:
+    """Run the merges with ``projects`` standing in for ``LOCAL_PROJECTS``."""
+    saved = prerender_projects.LOCAL_PROJECTS
+    prerender_projects.LOCAL_PROJECTS = projects
+    try:
+        yield
+    finally:
+        prerender_projects.LOCAL_PROJECTS = saved
+
+
+def synthetic_pages(count: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    pages = []
+    for number in range(count):
+        canonical = f"{prerender_blog.SITE_ORIGIN}/pages/blog/post-{number}.html"
+        pages.append(
+            {
+                "title": f"Post {number}: fleet & inventory <notes> | Juan R. Reynoso",
+                "description": f"Excerpt {number} on \"downtime\" and R&D cost drivers.",
+                "canonical": canonical,
+                "image": f"assets/images/blog/cover-{number}.png" if rng.random() < 0.7 else "",
+                "links": [("prev", canonical)] if rng.random() < 0.1 else [],
+                "root_path": "../../",
+                "json_ld": f'{{"@type": "Article", "url": "{canonical}"}}',
+            }
+        )
+    return pages
+
+
+def render_peak_bytes(render: Callable[[dict], str], pages: list[dict]) -> float:
+    """Mean tracemalloc peak per page: the memory a render holds at once, output included."""
+    tracemalloc.start()
+    try:
+        total = 0
+        for page in pages:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            render(page)
+            total += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return total / len(pages)
+
+
+def synthetic_body(words: int, seed: int = 7, constructs: bool = True) -> str:
+    """Build a body in the markup the editor produces: headings, images and marked-up paragraphs.
+
+    With ``constructs`` it also has lists, ``>`` quotes, fenced code (with blank lines
+    inside) and nested emphasis, which the legacy renderer treated as plain paragraphs.
+    """
+    rng = random.Random(seed)
+    vocabulary = [
+        "fleet", "maintenance", "downtime", "inventory", "analytics", "operations", "GPS",
+        "cost", "asset", "workflow", "reliability", "R&D", "<queue>", "**critical**",
+        "*noted*", "++reviewed++", "a*b", "1+1", "vendor", "exception", "report",
+    ]
+    if constructs:
+        vocabulary += ["***urgent***", "**very *late* parts**", "++**owned**++"]
+
+    def sentence(low: int, high: int) -> str:
+        nonlocal total
+        count = rng.randint(low, high)
+        total += count
+        return " ".join(rng.choice(vocabulary) for _ in range(count))
+
+    blocks: list[str] = []
+    total = 0
+    while total < words:
+        roll = rng.random()
+        if roll < 0.06:
+            blocks.append(f"## Section {len(blocks)}")
+        elif roll < 0.09:
+            blocks.append(f"### Detail {len(blocks)}")
+        elif roll < 0.11:
+            blocks.append(f"![Figure {len(blocks)}](assets/images/blog/chapter-{rng.randint(1, 3)}.png)")
+        elif constructs and roll < 0.16:
+            marker = rng.choice(["- ", "* ", "1. "])
+            blocks.append("\n".join(f"{marker}{sentence(4, 12)}" for _ in range(rng.randint(2, 5))))
+        elif constructs and roll < 0.19:
+            blocks.append("\n".join(f"> {sentence(8, 24)}" for _ in range(rng.randint(1, 3))))
+        elif constructs and roll < 0.21:
+            code = [f"asset_{number} = load(\"{rng.choice(vocabulary)}\") < limit" for number in range(4)]
+            blocks.append("```python\n" + "\n".join(code[:2]) + "\n\n" + "\n".join(code[2:]) + "\n```")
+        else:
+            blocks.append("\n".join(sentence(20, 80) for _ in range(rng.randint(1, 3))))
+    return "\n\n".join(blocks)
+
+
+def best_of(repeat: int, *funcs: Callable[[], object]) -> list[float]:
+    """Best wall time per function; runs are interleaved so machine noise hits all of them."""
+    timings: list[list[float]] = [[] for _ in funcs]
+    for _ in range(repeat):
+        for func, runs in zip(funcs, timings):
+            started = time.perf_counter()
+            func()
+            runs.append(time.perf_counter() - started)
+    return [min(runs) for runs in timings]
+
+
+def bench_render_body(args: argparse.Namespace) -> int:
+    samples = [post.body for post in prerender_blog.load_local_blog_posts()]
+    samples.append(synthetic_body(args.words, constructs=False))
+    for index, sample in enumerate(samples):
+        if legacy_render_body(sample) != prerender_blog.render_body(sample):
+            print(f"Output mismatch on sample {index}", file=sys.stderr)
+            return 1
+
+    # Timed on the full markup; the legacy renderer turns the newer constructs into paragraphs.
+    body = synthetic_body(args.words)
+    rendered = prerender_blog.render_body(body)
+    constructs = {tag: rendered.count(f"<{tag}>") for tag in ("ul", "ol", "blockquote", "pre", "em", "u")}
+    if not all(constructs.values()):
+        print(f"The synthetic body is missing constructs: {constructs}", file=sys.stderr)
+        return 1
+
+    word_count = len(body.split())
+    legacy, current = best_of(
+        args.repeat, lambda: legacy_render_body(body), lambda: prerender_blog.render_body(body)
+    )
+    print(f"render_body on {word_count} words ({len(body)} chars), best of {args.repeat}:")
+    print(f"  legacy regex chain : {legacy * 1000:8.1f} ms")
+    print(f"  tokenizer          : {current * 1000:8.1f} ms")
+    print(f"  speedup            : {legacy / current:8.2f}x")
+    print("  constructs rendered: " + ", ".join(f"{count} <{tag}>" for tag, count in constructs.items()))
+    print(f"Identical output for {len(samples)} bodies (existing posts plus the synthetic body without the newer constructs).")
+    return 0
+
+
+def bench_page_shell(args: argparse.Namespace) -> int:
+    pages = synthetic_pages(args.pages)
+    for index, page in enumerate(pages):
+        if legacy_page_shell(page) != current_page_shell(page):
+            print(f"Output mismatch on page {index}", file=sys.stderr)
+            return 1
+
+    def render_all(render: Callable[[dict], str]) -> Callable[[], object]:
+        def run() -> None:
+            for page in pages:
+                render(page)
+
+        return run
+
+    legacy, current = best_of(args.repeat, render_all(legacy_page_shell), render_all(current_page_shell))
+    legacy_peak = render_peak_bytes(legacy_page_shell, pages)
+    current_peak = render_peak_bytes(current_page_shell, pages)
+    output = sum(len(current_page_shell(page).encode("utf-8")) for page in pages) / len(pages)
+    print(f"Page shell (head, footer, scripts) for {len(pages)} pages, best of {args.repeat}:")
+    print(f"  f-string rebuild   : {legacy * 1000:8.1f} ms, {legacy_peak:8.0f} bytes peak per page")
+    print(f"  bound templates    : {current * 1000:8.1f} ms, {current_peak:8.0f} bytes peak per page")
+    print(f"  speedup            : {legacy / current:8.2f}x")
+    print(f"  peak memory        : {legacy_peak / current_peak:8.2f}x less (pages average {output:.0f} bytes)")
+    print(f"Identical output for {len(pages)} pages.")
+    return 0
+
+
+def bench_merge_projects(args: argparse.Namespace) -> int:
+    """Time both merges over catalog sizes n, with the real local projects and with m = n / 100.
+
+    The old merge scans every row once per local project, O(n * m); the slug index
+    is O(n + m), so its cost per row (remote plus local) stays flat in both series.
+    """
+    sizes = sorted({max(1, args.projects // 100), max(1, args.projects // 10), args.projects})
+    real_locals = prerender_projects.LOCAL_PROJECTS
+    cases = []
+    for size in sizes:
+        rows, case_studies = synthetic_projects(size)
+        for locals_ in (real_locals, synthetic_local_projects(max(1, size // 100), size)):
+            with local_projects(locals_):
+                if legacy_merge_projects(rows, case_studies) != prerender_projects.merge_projects(rows, case_studies):
+                    print(f"Output mismatch with {size} projects and {len(locals_)} local ones", file=sys.stderr)
+                    return 1
+                legacy, current = best_of(
+                    args.repeat,
+                    lambda: legacy_merge_projects(rows, case_studies),
+                    lambda: prerender_projects.merge_projects(rows, case_studies),
+                )
+            cases.append((size, len(locals_), legacy, current))
+
+    print(f"merge_projects, best of {args.repeat} (cost per remote or local row):")
+    for size, local_count, legacy, current in cases:
+        count = size + local_count
+        print(
+            f"  n={size:>6} m={local_count:>4}: linear scans {legacy * 1000:8.1f} ms ({legacy / count * 1e6:6.2f} us/row), "
+            f"slug index {current * 1000:7.1f} ms ({current / count * 1e6:5.2f} us/row), {legacy / current:6.2f}x"
+        )
+    per_row = [current / (size + local_count) for size, local_count, _legacy, current in cases]
+    print(f"  slug index cost per row: {min(per_row) * 1e6:.2f}-{max(per_row) * 1e6:.2f} us across every case")
+    print(f"Identical output in all {len(cases)} cases.")
+    return 0
+
+
+def bench_detail_metadata(args: argparse.Namespace) -> int:
+    paths = prerender_projects.detail_pages()
+    samples = [
+        (path, variant)
+        for path in paths
+        for variant in detail_page_variants(path.read_text(encoding="utf-8"))
+    ]
+    base_path = paths[0]
+    base = base_path.read_text(encoding="utf-8")
+    sizes = sorted({1, max(1, args.copies // 16), max(1, args.copies // 4), args.copies})
+    large = [large_detail_page(base, copies) for copies in sizes]
+    samples.extend((base_path, page) for page in large)
+    for path, source in samples:
+        if legacy_update_detail_metadata(path, source) != prerender_projects.update_detail_metadata(path, source):
+            print(f"Output mismatch on a variant of {path.name}", file=sys.stderr)
+            return 1
+
+    print(f"Detail page metadata for {base_path.name} grown by repeating its sections, best of {args.repeat}:")
+    for copies, page in zip(sizes, large):
+        legacy, current = best_of(
+            args.repeat,
+            lambda: legacy_update_detail_metadata(base_path, page),
+            lambda: prerender_projects.update_detail_metadata(base_path, page),
+        )
+        print(
+            f"  {copies:>4}x ({len(page) / 1024:8.0f} KiB): regex passes {legacy * 1000:8.2f} ms, "
+            f"single scan {current * 1000:8.2f} ms ({legacy / current:5.1f}x)"
+        )
+    print(f"Identical output for {len(samples)} pages (every detail page, head-tag variants and grown pages).")
+    return 0
+
+
+BENCHMARKS = {
+    "detail-metadata": bench_detail_metadata,
+    "merge-projects": bench_merge_projects,
+    "page-shell": bench_page_shell,
+    "render-body": bench_render_body,
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark prerender hot paths against their previous versions.")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--words", type=int, default=120_000, help="Size of synthetic inputs.")
+    parser.add_argument("--pages", type=int, default=10_000, help="Number of synthetic pages.")
+    parser.add_argument("--copies", type=int, default=256, help="Times a detail page's sections are repeated.")
+    parser.add_argument("--projects", type=int, default=20_000, help="Number of synthetic remote project rows.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per implementation; the best is reported.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    return BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
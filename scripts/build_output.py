@@ -0,0 +1,242 @@
+"""Write-if-changed, atomic output layer shared by the generator scripts.
+
+Every generator records what it wrote in ``.build-cache/outputs-<name>.json`` as
+``[sha256, size, mtime_ns]`` per file. A target whose stat still matches its record
+is compared by hash alone, without reading it back; anything else is compared
+byte for byte once and then recorded. Changed files are written to a temporary
+sibling and renamed into place, so a half-written page is never served, and the
+paths that actually changed are reported as JSON for deploy and cache steps.
+
+With precompression enabled, text outputs also get ``.gz`` (and, when the optional
+``brotli`` package is installed, ``.br``) siblings. They are rebuilt only when the
+output itself changed or a sibling is missing, and removed along with it.
+"""
+
+from __future__ import annotations
+
+import filecmp
+import gzip
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the build environment
+    brotli = None
+
+from build_profile import span
+
+
+ROOT = Path(__file__).resolve().parents[1]
+BUILD_CACHE_DIR = ROOT / ".build-cache"
+OUTPUT_MANIFEST_VERSION = 1
+PRECOMPRESS_SUFFIXES = {".html", ".css", ".js", ".json", ".xml", ".svg", ".txt"}
+PRECOMPRESS_MIN_BYTES = 1024
+
+OutputRecord = list  # [sha256 hex digest, size in bytes, mtime_ns]
+
+
+def file_record(path: Path, digest: str) -> OutputRecord:
+    stat = path.stat()
+    return [digest, stat.st_size, stat.st_mtime_ns]
+
+
+def matches_record(path: Path, digest: str, record: OutputRecord | None) -> bool:
+    """True when ``path`` still holds content with ``digest``, judged from its stat alone."""
+    if not record or record[0] != digest:
+        return False
+    try:
+        stat = path.stat()
+    except OSError:
+        return False
+    return [stat.st_size, stat.st_mtime_ns] == record[1:]
+
+
+def matches_content(path: Path, data: bytes) -> bool:
+    try:
+        if path.stat().st_size != len(data):
+            return False
+        return path.read_bytes() == data
+    except OSError:
+        return False
+
+
+@contextmanager
+def atomic_output(path: Path) -> Iterator[BinaryIO]:
+    """Yield a binary handle on a temporary sibling of ``path`` and rename it into place."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(temp_path, "wb") as handle:
+            yield handle
+        os.replace(temp_path, path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+def compressed_siblings(path: Path) -> dict[str, Path]:
+    return {"gzip": path.with_name(f"{path.name}.gz"), "br": path.with_name(f"{path.name}.br")}
+
+
+def sync_compressed_siblings(path: Path, data: bytes, changed: bool, precompress: bool) -> None:
+    """Bring the ``.gz``/``.br`` siblings of ``path`` in line with ``data``.
+
+    Siblings of files that are not (or no longer) precompressed are deleted, so a host
+    never serves stale compressed bytes.
+    """
+    wanted = precompress and path.suffix in PRECOMPRESS_SUFFIXES and len(data) >= PRECOMPRESS_MIN_BYTES
+    for encoding, sibling in compressed_siblings(path).items():
+        if not wanted or (encoding == "br" and brotli is None):
+            if sibling.exists():
+                sibling.unlink()
+            continue
+        if changed or not sibling.exists():
+            if encoding == "gzip":
+                compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            else:
+                compressed = brotli.compress(data, quality=11)
+            with atomic_output(sibling) as handle:
+                handle.write(compressed)
+
+
+def write_if_changed(
+    path: Path,
+    data: bytes,
+    record: OutputRecord | None,
+    check: bool = False,
+    precompress: bool = False,
+) -> tuple[OutputRecord | None, bool]:
+    """Write ``data`` to ``path`` unless it is already there.
+
+    Returns the record to store and whether the file differed. In check mode nothing
+    is written and a differing file gets no record. Safe to call from worker processes:
+    it touches only ``path`` and its compressed siblings and returns its bookkeeping
+    instead of storing it.
+    """
+    with span("write output", "disk", path=path):
+        digest = hashlib.sha256(data).hexdigest()
+        if matches_record(path, digest, record):
+            result = record, False
+        elif matches_content(path, data):
+            result = file_record(path, digest), False
+        elif check:
+            return None, True
+        else:
+            with atomic_output(path) as handle:
+                handle.write(data)
+            result = file_record(path, digest), True
+        if not check:
+            sync_compressed_siblings(path, data, result[1], precompress)
+        return result
+
+
+class OutputWriter:
+    """Tracks one generator's outputs across runs and reports the paths it changed."""
+
+    def __init__(
+        self,
+        name: str,
+        check: bool = False,
+        report_path: Path | None = None,
+        precompress: bool = False,
+    ) -> None:
+        self.name = name
+        self.check = check
+        self.precompress = precompress
+        self.manifest_path = BUILD_CACHE_DIR / f"outputs-{name}.json"
+        self.report_path = report_path or BUILD_CACHE_DIR / f"changes-{name}.json"
+        self.records = self._load()
+        self.changed: list[str] = []
+        self.removed: list[str] = []
+
+    def _load(self) -> dict[str, OutputRecord]:
+        try:
+            payload = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(payload, dict) or payload.get("version") != OUTPUT_MANIFEST_VERSION:
+            return {}
+        outputs = payload.get("outputs")
+        if not isinstance(outputs, dict):
+            return {}
+        return {str(k): v for k, v in outputs.items() if isinstance(v, list) and len(v) == 3}
+
+    def rel_path(self, path: Path) -> str:
+        return path.resolve().relative_to(ROOT).as_posix()
+
+    def record_for(self, path: Path) -> OutputRecord | None:
+        return self.records.get(self.rel_path(path))
+
+    def record(self, path: Path, record: OutputRecord | None, changed: bool) -> bool:
+        """Store the result of a ``write_if_changed`` call made elsewhere (e.g. in a worker)."""
+        rel_path = self.rel_path(path)
+        if record is None:
+            self.records.pop(rel_path, None)
+        else:
+            self.records[rel_path] = record
+        if changed:
+            self.changed.append(rel_path)
+        return changed
+
+    def write_bytes(self, path: Path, data: bytes) -> bool:
+        record, changed = write_if_changed(path, data, self.record_for(path), self.check, self.precompress)
+        return self.record(path, record, changed)
+
+    def write_text(self, path: Path, content: str) -> bool:
+        return self.write_bytes(path, content.encode("utf-8"))
+
+    @contextmanager
+    def stream(self, path: Path) -> Iterator[BinaryIO]:
+        """Stream a large output to a temporary file, keeping it only if it changed."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.tmp")
+        try:
+            digest = hashlib.sha256()
+            with open(temp_path, "wb") as handle:
+                yield handle
+            with open(temp_path, "rb") as handle:
+                for chunk in iter(lambda: handle.read(1 << 16), b""):
+                    digest.update(chunk)
+            record = self.record_for(path)
+            if matches_record(path, digest.hexdigest(), record):
+                changed = self.record(path, record, False)
+            elif path.exists() and filecmp.cmp(temp_path, path, shallow=False):
+                changed = self.record(path, file_record(path, digest.hexdigest()), False)
+            elif self.check:
+                self.record(path, None, True)
+                return
+            else:
+                os.replace(temp_path, path)
+                changed = self.record(path, file_record(path, digest.hexdigest()), True)
+            data = path.read_bytes() if self.precompress else b""
+            sync_compressed_siblings(path, data, changed, self.precompress)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
+    def remove(self, path: Path) -> None:
+        rel_path = self.rel_path(path)
+        self.records.pop(rel_path, None)
+        if self.check:
+            self.changed.append(rel_path)
+            return
+        path.unlink()
+        for sibling in compressed_siblings(path).values():
+            if sibling.exists():
+                sibling.unlink()
+        self.removed.append(rel_path)
+
+    def save(self) -> None:
+        """Persist the manifest (outside check mode) and write the change report."""
+        BUILD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        if not self.check:
+            payload = {"version": OUTPUT_MANIFEST_VERSION, "outputs": dict(sorted(self.records.items()))}
+            self.manifest_path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+        report = {"generator": self.name, "changed": sorted(self.changed), "removed": sorted(self.removed)}
+        self.report_path.parent.mkdir(parents=True, exist_ok=True)
+        self.report_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
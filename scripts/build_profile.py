@@ -0,0 +1,198 @@
+"""Timing spans behind the site scripts' ``--profile`` flag.
+
+Scripts wrap their stages (fetch, parse, render, write) and the items inside them
+(one request, one page) in ``span()`` blocks. Spans cost one branch while profiling
+is off. With ``--profile`` the script's run is recorded and written as Chrome
+trace-event JSON, which ``chrome://tracing`` and https://ui.perfetto.dev open with
+one lane per thread, and a table of the slowest span names is printed. "Self" time
+excludes nested spans, so a stage that only waits on its items does not hide them.
+Work done in worker processes is not traced; the pool shows up as one span.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+# Not imported from build_output, which records its own writes through this module.
+ROOT = Path(__file__).resolve().parents[1]
+PROFILE_DIR = ROOT / ".build-cache" / "profiles"
+SUMMARY_ROWS = 20
+
+
+@dataclass(frozen=True)
+class Span:
+    name: str
+    category: str
+    start: float
+    duration: float
+    thread: int
+    thread_name: str
+    args: dict = field(default_factory=dict)
+
+
+class Profiler:
+    """Collects spans from every thread of the current process while enabled."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.origin = time.perf_counter()
+        self.spans: list[Span] = []
+
+    def start(self) -> None:
+        self.enabled = True
+        self.origin = time.perf_counter()
+        self.spans = []
+
+    def stop(self) -> list[Span]:
+        self.enabled = False
+        return sorted(self.spans, key=lambda item: (item.start, -item.duration))
+
+
+PROFILER = Profiler()
+
+
+@contextmanager
+def span(name: str, category: str = "stage", **args: object) -> Iterator[None]:
+    """Time the enclosed block as ``name``; ``args`` (say, the page's path) go into the trace."""
+    if not PROFILER.enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        thread = threading.current_thread()
+        # list.append is atomic, so build_site.py's stage threads can record concurrently.
+        PROFILER.spans.append(
+            Span(name, category, started, time.perf_counter() - started, thread.ident or 0, thread.name, args)
+        )
+
+
+def add_profile_argument(parser: argparse.ArgumentParser, name: str) -> None:
+    default = PROFILE_DIR / f"{name}.json"
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        type=Path,
+        const=default,
+        metavar="TRACE",
+        help="Record where the run spends its time, write a Chrome trace-event file "
+        f"(default: {default.relative_to(ROOT).as_posix()}) and print a summary.",
+    )
+
+
+def trace_arg(value: object) -> object:
+    if isinstance(value, Path):
+        try:
+            return value.resolve().relative_to(ROOT).as_posix()
+        except ValueError:
+            return str(value)
+    return value if isinstance(value, (str, int, float, bool)) or value is None else str(value)
+
+
+def trace_events(name: str, spans: list[Span], origin: float) -> list[dict]:
+    """Complete (``ph: X``) events in microseconds, plus process and thread names."""
+    pid = os.getpid()
+    threads: dict[int, int] = {}
+    events: list[dict] = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": name}}]
+    for item in spans:
+        if item.thread not in threads:
+            threads[item.thread] = len(threads) + 1
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": threads[item.thread],
+                    "args": {"name": item.thread_name},
+                }
+            )
+        events.append(
+            {
+                "name": item.name,
+                "cat": item.category,
+                "ph": "X",
+                "ts": round((item.start - origin) * 1e6, 1),
+                "dur": round(item.duration * 1e6, 1),
+                "pid": pid,
+                "tid": threads[item.thread],
+                "args": {key: trace_arg(value) for key, value in item.args.items()},
+            }
+        )
+    return events
+
+
+def self_times(spans: list[Span]) -> list[float]:
+    """Each span's duration minus the spans directly nested in it on the same thread."""
+    result = [item.duration for item in spans]
+    open_spans: dict[int, list[int]] = {}
+    for index, item in enumerate(spans):
+        stack = open_spans.setdefault(item.thread, [])
+        while stack and spans[stack[-1]].start + spans[stack[-1]].duration <= item.start:
+            stack.pop()
+        if stack:
+            result[stack[-1]] -= item.duration
+        stack.append(index)
+    return result
+
+
+def summary_rows(spans: list[Span]) -> list[tuple[str, str, int, float, float, float]]:
+    """``(category, name, count, total, self, max)`` per span name, largest self time first."""
+    totals: dict[tuple[str, str], list[float]] = {}
+    for item, own in zip(spans, self_times(spans)):
+        row = totals.setdefault((item.category, item.name), [0, 0.0, 0.0, 0.0])
+        row[0] += 1
+        row[1] += item.duration
+        row[2] += own
+        row[3] = max(row[3], item.duration)
+    rows = [
+        (category, name, int(row[0]), row[1], row[2], row[3])
+        for (category, name), row in totals.items()
+        # The run's own span is the wall time printed below the table.
+        if category != "script"
+    ]
+    rows.sort(key=lambda row: row[4], reverse=True)
+    return rows
+
+
+def print_summary(spans: list[Span], wall: float) -> None:
+    print()
+    print(f"{'span':<32} {'category':<8} {'count':>6} {'total ms':>10} {'self ms':>10} {'max ms':>9} {'self %':>7}")
+    rows = summary_rows(spans)
+    for category, name, count, total, own, longest in rows[:SUMMARY_ROWS]:
+        share = own / wall * 100 if wall else 0.0
+        print(
+            f"{name[:32]:<32} {category[:8]:<8} {count:>6} {total * 1000:>10.1f} "
+            f"{own * 1000:>10.1f} {longest * 1000:>9.1f} {share:>6.1f}%"
+        )
+    if len(rows) > SUMMARY_ROWS:
+        print(f"... {len(rows) - SUMMARY_ROWS} more span names in the trace.")
+
+
+@contextmanager
+def profile_run(name: str, trace_path: Path | None) -> Iterator[None]:
+    """Profile the enclosed run as ``name`` when ``trace_path`` is set, then write and summarize it."""
+    if trace_path is None:
+        yield
+        return
+    PROFILER.start()
+    started = time.perf_counter()
+    try:
+        with span(name, "script"):
+            yield
+    finally:
+        wall = time.perf_counter() - started
+        spans = PROFILER.stop()
+        trace_path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"traceEvents": trace_events(name, spans, PROFILER.origin), "displayTimeUnit": "ms"}
+        trace_path.write_text(json.dumps(payload, separators=(",", ":")) + "\n", encoding="utf-8")
+        print_summary(spans, wall)
+        print(f"Profile: {trace_path} ({len(spans)} spans, {wall:.2f}s)")
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""Build the whole site in one process: assets, blog, projects, asset pruning and links.
+
+Each stage declares the stages it runs after, the inputs that decide whether it can
+be skipped and the outputs that must exist for a skip to be safe. Stages whose
+dependencies are done run in parallel threads, and they share one sync of the local
+content store, one fingerprinted asset map and one read of every HTML page instead
+of each script redoing that work. The blog runs after the projects: its sitemap
+hashes the project pages for their ``<lastmod>``, and running the two generators in
+turn also keeps their worker process pools from starting concurrently. After
+a stage succeeds, the digest of its inputs (taken after the run, because generators
+rewrite some of their own inputs) is stored in ``.build-cache``; the next build skips
+the stage while that digest still matches. The content sync and the blog always run
+and rely on their own incremental state.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import check_links
+import content_store
+import prerender_blog
+import prerender_projects
+from build_output import BUILD_CACHE_DIR, ROOT, OutputWriter
+from build_profile import add_profile_argument, profile_run, span
+from fingerprint_assets import (
+    ASSET_MANIFEST_PATH,
+    fingerprint_assets,
+    fingerprinted_copies,
+    html_sources,
+    load_asset_manifest,
+    prune_copies,
+    source_assets,
+)
+
+
+STAGE_STATE_PATH = BUILD_CACHE_DIR / "build-site.json"
+STAGE_STATE_VERSION = 1
+# Directories never part of a stage's inputs.
+IGNORED_DIRS = {".git", ".build-cache", "__pycache__", "node_modules"}
+PROJECT_INPUTS = (
+    "data/project-case-studies.json",
+    "pages/projects.html",
+    "pages/projects/*.html",
+    "scripts/*.py",
+)
+# The Supabase tables the generators read, synced once by the content stage.
+CONTENT_TABLES = ("blog_posts", "projects")
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One build step. ``inputs`` returns what its skip digest covers; ``None`` means always run."""
+
+    name: str
+    run: Callable[[BuildContext], int]
+    after: tuple[str, ...] = ()
+    inputs: Callable[[BuildContext], object] | None = None
+    outputs: tuple[str, ...] = ()
+
+
+class BuildContext:
+    """State the stages share, each piece computed at most once per build."""
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.assets: dict[str, str] | None = None
+        self.projects: list[dict] | None = None
+        self._html: dict[Path, str] | None = None
+        self._lock = threading.Lock()
+
+    def asset_map(self) -> dict[str, str]:
+        return load_asset_manifest() if self.assets is None else self.assets
+
+    def html_sources(self) -> dict[Path, str]:
+        """Every HTML page, read once the generators are done with them."""
+        with self._lock:
+            if self._html is None:
+                self._html = html_sources()
+            return self._html
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Fingerprint assets, pre-render the blog and projects, prune stale asset copies and check links."
+    )
+    parser.add_argument(
+        "--stages",
+        help="Comma-separated stages to run, plus the stages they depend on (default: all). "
+        f"Stages: {', '.join(stage.name for stage in STAGES)}.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Run every stage even when its inputs are unchanged, and re-render every blog output.",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Build from the rows already in the local content store instead of querying Supabase.",
+    )
+    parser.add_argument(
+        "--trim-project-snapshot",
+        action="store_true",
+        help="Keep only the fields the project cards use in the project snapshot.",
+    )
+    parser.add_argument(
+        "--full-fetch",
+        action="store_true",
+        help="Ignore the rows in the local content store and download every published blog post and project.",
+    )
+    parser.add_argument(
+        "--critical-css",
+        action="store_true",
+        help="Inline critical CSS in the blog and project pages.",
+    )
+    parser.add_argument("--minify", action="store_true", help="Minify generated blog HTML.")
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="Write .gz and .br siblings next to blog text outputs.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Render blog posts and project detail pages in N worker processes; 0 uses every CPU (default: 1).",
+    )
+    add_profile_argument(parser, "build-site")
+    args = parser.parse_args()
+    if args.offline and args.full_fetch:
+        parser.error("--offline cannot be combined with --full-fetch")
+    names = {stage.name for stage in STAGES}
+    args.stages = [name.strip() for name in args.stages.split(",") if name.strip()] if args.stages else []
+    unknown = [name for name in args.stages if name not in names]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+    return args
+
+
+def file_digests(patterns: tuple[str, ...]) -> dict[str, str]:
+    digests: dict[str, str] = {}
+    for pattern in patterns:
+        for path in sorted(ROOT.glob(pattern)):
+            if path.is_file():
+                digests[path.relative_to(ROOT).as_posix()] = hashlib.sha256(path.read_bytes()).hexdigest()
+    return digests
+
+
+def site_files() -> list[str]:
+    """Every file path in the site, so the link check notices added and deleted targets."""
+    paths: list[str] = []
+    for directory, dirnames, filenames in os.walk(ROOT):
+        dirnames[:] = sorted(name for name in dirnames if name not in IGNORED_DIRS)
+        base = Path(directory).relative_to(ROOT)
+        paths.extend((base / name).as_posix() for name in sorted(filenames))
+    return paths
+
+
+def html_digest(context: BuildContext) -> str:
+    digest = hashlib.sha256()
+    for path, source in sorted(context.html_sources().items()):
+        digest.update(f"{path.relative_to(ROOT).as_posix()}\0{source}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def blog_argv(args: argparse.Namespace) -> list[str]:
+    flags = {
+        "--force": args.force,
+        # The content stage has already synced the store.
+        "--offline": True,
+        "--critical-css": args.critical_css,
+        "--minify": args.minify,
+        "--precompress": args.precompress,
+    }
+    return [flag for flag, enabled in flags.items() if enabled] + ["--jobs", str(args.jobs)]
+
+
+def run_assets(context: BuildContext) -> int:
+    writer = OutputWriter("fingerprint-assets")
+    context.assets = fingerprint_assets(writer)
+    writer.save()
+    return 0
+
+
+def run_content(context: BuildContext) -> int:
+    """Sync the tables the generators read, then load the project rows they share.
+
+    A table that fails to sync is built from its stored rows with a warning; one
+    the store has never held fails the stage, so nothing renders from empty data.
+    """
+    missing: list[str] = []
+    if not context.args.offline:
+        for name in CONTENT_TABLES:
+            try:
+                content_store.sync_tables([name], full_refresh=context.args.full_fetch)
+            except Exception as exc:  # noqa: BLE001 - reported here; stored rows may still serve
+                if content_store.table_state(name) is None:
+                    print(f"Error: syncing {name} from Supabase failed and none are stored: {exc}", file=sys.stderr)
+                    missing.append(name)
+                    continue
+                print(
+                    f"Warning: syncing {name} from Supabase failed; building from the stored rows: {exc}",
+                    file=sys.stderr,
+                )
+    if missing:
+        return 1
+    context.projects = prerender_projects.load_projects(offline=True)
+    return 0
+
+
+def run_blog(context: BuildContext) -> int:
+    return prerender_blog.run(prerender_blog.parse_args(blog_argv(context.args)), assets=context.asset_map())
+
+
+def run_projects(context: BuildContext) -> int:
+    flags = {"--critical-css": context.args.critical_css, "--trim-snapshot": context.args.trim_project_snapshot}
+    argv = [flag for flag, enabled in flags.items() if enabled] + ["--jobs", str(context.args.jobs)]
+    return prerender_projects.run(
+        prerender_projects.parse_args(argv), projects=context.projects, assets=context.asset_map()
+    )
+
+
+def run_prune(context: BuildContext) -> int:
+    writer = OutputWriter("fingerprint-assets")
+    prune_copies(writer, context.asset_map(), context.html_sources())
+    writer.save()
+    return 0
+
+
+def run_links(context: BuildContext) -> int:
+    return check_links.run(check_links.parse_args([]), context.html_sources())
+
+
+STAGES = (
+    Stage(
+        "assets",
+        run_assets,
+        inputs=lambda context: file_digests(
+            tuple(path.relative_to(ROOT).as_posix() for path in source_assets())
+        ),
+        outputs=(ASSET_MANIFEST_PATH.relative_to(ROOT).as_posix(), "_headers"),
+    ),
+    Stage("content", run_content),
+    Stage(
+        "projects",
+        run_projects,
+        after=("assets", "content"),
+        inputs=lambda context: [
+            context.projects,
+            context.asset_map(),
+            context.args.critical_css,
+            context.args.trim_project_snapshot,
+            file_digests(PROJECT_INPUTS),
+        ],
+        outputs=("pages/projects.html", "data/projects-snapshot.*.json", "data/search/index.json"),
+    ),
+    # The sitemap hashes the project pages, so the blog waits for the projects.
+    Stage("blog", run_blog, after=("assets", "content", "projects")),
+    Stage(
+        "prune",
+        run_prune,
+        after=("assets", "blog", "projects"),
+        inputs=lambda context: [
+            context.asset_map(),
+            html_digest(context),
+            [path.name for path in fingerprinted_copies()],
+        ],
+    ),
+    Stage(
+        "links",
+        run_links,
+        after=("prune",),
+        inputs=lambda context: [
+            html_digest(context),
+            site_files(),
+            file_digests(("js/header.js", "js/footer.js", "scripts/check_links.py")),
+        ],
+    ),
+)
+
+
+def select_stages(names: list[str]) -> list[Stage]:
+    """The named stages and everything they depend on, in dependency order."""
+    by_name = {stage.name: stage for stage in STAGES}
+    ordered: list[Stage] = []
+    visiting: set[str] = set()
+
+    def visit(name: str) -> None:
+        if any(stage.name == name for stage in ordered):
+            return
+        if name in visiting:
+            raise RuntimeError(f"Build stages form a cycle through {name!r}")
+        visiting.add(name)
+        for dependency in by_name[name].after:
+            visit(dependency)
+        visiting.discard(name)
+        ordered.append(by_name[name])
+
+    for name in names or list(by_name):
+        visit(name)
+    return ordered
+
+
+def load_stage_state() -> dict[str, str]:
+    try:
+        payload = json.loads(STAGE_STATE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(payload, dict) or payload.get("version") != STAGE_STATE_VERSION:
+        return {}
+    stages = payload.get("stages")
+    return {str(k): str(v) for k, v in stages.items()} if isinstance(stages, dict) else {}
+
+
+def save_stage_state(state: dict[str, str]) -> None:
+    BUILD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    STAGE_STATE_PATH.write_text(
+        json.dumps({"version": STAGE_STATE_VERSION, "stages": dict(sorted(state.items()))}, indent=2) + "\n",
+        encoding="utf-8",
+    )
+
+
+def inputs_digest(stage: Stage, context: BuildContext) -> str:
+    payload = json.dumps(stage.inputs(context), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def execute(stage: Stage, context: BuildContext, state: dict[str, str]) -> str:
+    """Run or skip one stage and return its status: ``ran``, ``skipped`` or ``failed``."""
+    try:
+        if stage.inputs is not None and not context.args.force:
+            with span("stage inputs", stage=stage.name):
+                current = state.get(stage.name) == inputs_digest(stage, context)
+            if current and all(any(ROOT.glob(pattern)) for pattern in stage.outputs):
+                return "skipped"
+        with span(f"stage {stage.name}"):
+            if stage.run(context):
+                return "failed"
+        if stage.inputs is not None:
+            with span("stage inputs", stage=stage.name):
+                state[stage.name] = inputs_digest(stage, context)
+    except Exception as exc:  # noqa: BLE001 - reported per stage; the build exits non-zero
+        print(f"Error: stage {stage.name} failed: {exc}", file=sys.stderr)
+        traceback.print_exc()
+        return "failed"
+    return "ran"
+
+
+def run_stages(stages: list[Stage], context: BuildContext, state: dict[str, str]) -> dict[str, tuple[str, float]]:
+    """Run every stage once its dependencies finish, independent ones in parallel."""
+    results: dict[str, tuple[str, float]] = {}
+    pending = list(stages)
+    running: dict[Future, tuple[str, float]] = {}
+    selected = {stage.name for stage in stages}
+    with ThreadPoolExecutor(max_workers=len(stages) or 1) as pool:
+        while pending or running:
+            for stage in list(pending):
+                if not all(name in results for name in stage.after if name in selected):
+                    continue
+                pending.remove(stage)
+                if any(results[name][0] in ("failed", "blocked") for name in stage.after if name in selected):
+                    results[stage.name] = ("blocked", 0.0)
+                    continue
+                running[pool.submit(execute, stage, context, state)] = (stage.name, time.perf_counter())
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, started = running.pop(future)
+                results[name] = (future.result(), time.perf_counter() - started)
+    return results
+
+
+def main() -> int:
+    args = parse_args()
+    with profile_run("build-site", args.profile):
+        return build(args)
+
+
+def build(args: argparse.Namespace) -> int:
+    stages = select_stages(args.stages)
+    context = BuildContext(args)
+    state = load_stage_state()
+    started = time.perf_counter()
+    results = run_stages(stages, context, state)
+    save_stage_state(state)
+
+    print()
+    for stage in stages:
+        status, seconds = results[stage.name]
+        print(f"{stage.name:<13} {status:<8} {seconds:7.2f}s")
+    print(f"Built in {time.perf_counter() - started:.2f}s.")
+    failed = [name for name, (status, _seconds) in results.items() if status in ("failed", "blocked")]
+    if failed:
+        print(f"Build failed: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
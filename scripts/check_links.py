@@ -14,6 +14,9 @@ Usage:
 Optional:
   --include-admin   Include admin/*.html in the scan (default: on).
   --check-external  Try to fetch external http(s) links (best-effort).
+  --check-supabase-projects  Validate the hrefs of published Supabase projects.
+  --offline         With --check-supabase-projects, use the rows already in the content store.
+  --profile [TRACE] Write a Chrome trace of where the check spends its time.
 """
 
 from __future__ import annotations
@@ -29,6 +32,9 @@ import urllib.request
 from dataclasses import dataclass
 from pathlib import Path
 
+from build_profile import add_profile_argument, profile_run, span
+from content_store import read_table
+
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 
@@ -202,7 +208,7 @@ def _fetch_external(url: str, timeout: float = 7.5) -> str | None:
     """
     try:
         req = urllib.request.Request(url, method="HEAD")
-        with urllib.request.urlopen(req, timeout=timeout) as r:
+        with span("external link", "network", url=url), urllib.request.urlopen(req, timeout=timeout) as r:
             code = int(getattr(r, "status", 200))
             if 200 <= code < 400:
                 return None
@@ -217,7 +223,14 @@ def _load_text(path: Path) -> str:
     return path.read_text(encoding="utf-8", errors="ignore")
 
 
-def _collect_anchor_index(html_files: list[Path]) -> dict[Path, set[str]]:
+def _read_html(path: Path, sources: dict[Path, str] | None) -> str:
+    """Page text from an already-read ``sources`` map (see build_site.py), else from disk."""
+    if sources is not None and path in sources:
+        return sources[path]
+    return _load_text(path)
+
+
+def _collect_anchor_index(html_files: list[Path], sources: dict[Path, str] | None = None) -> dict[Path, set[str]]:
     """
     Build a map: file -> { ids and named anchors }.
     """
@@ -225,7 +238,8 @@ def _collect_anchor_index(html_files: list[Path]) -> dict[Path, set[str]]:
     anchors: dict[Path, set[str]] = {}
     for p in html_files:
         try:
-            scan.scan(p, _load_text(p))
+            with span("index anchors", "parse", path=p):
+                scan.scan(p, _read_html(p, sources))
         except Exception:
             anchors[p] = set()
             continue
@@ -281,41 +295,9 @@ def _check_footer_js(errors: list[str]) -> None:
         errors.append("Missing admin/index.html (Dashboard link target).")
 
 
-def _parse_supabase_config() -> tuple[str, str] | None:
-    cfg_js = REPO_ROOT / "js" / "supabase-config.js"
-    if not cfg_js.exists():
-        return None
-    text = _load_text(cfg_js)
-    url_m = re.search(r"url:\s*'([^']+)'", text)
-    key_m = re.search(r"anonKey:\s*'([^']+)'", text)
-    url = (url_m.group(1) if url_m else "").strip()
-    key = (key_m.group(1) if key_m else "").strip()
-    if not url or not key:
-        return None
-    return url, key
-
-
-def _fetch_supabase_json(url: str, anon_key: str, path_with_query: str) -> list[dict]:
-    endpoint = url.rstrip("/") + path_with_query
-    req = urllib.request.Request(endpoint)
-    req.add_header("apikey", anon_key)
-    req.add_header("Authorization", "Bearer " + anon_key)
-    req.add_header("Accept", "application/json")
-    with urllib.request.urlopen(req, timeout=20) as r:
-        raw = r.read().decode("utf-8", errors="replace") or "[]"
-    data = __import__("json").loads(raw)
-    return data if isinstance(data, list) else []
-
-
-def _check_supabase_projects(errors: list[str]) -> None:
-    cfg = _parse_supabase_config()
-    if not cfg:
-        errors.append("Supabase config missing/invalid: js/supabase-config.js")
-        return
-    url, anon_key = cfg
-
+def _check_supabase_projects(errors: list[str], offline: bool) -> None:
     try:
-        rows = _fetch_supabase_json(url, anon_key, "/rest/v1/projects?select=href,is_published")
+        _state, rows = read_table("projects", offline)
     except Exception as e:  # noqa: BLE001
         errors.append(f"Supabase projects check failed: {e}")
         return
@@ -360,7 +342,7 @@ def _check_supabase_projects(errors: list[str]) -> None:
                 )
 
 
-def main() -> int:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--include-admin", action="store_true", default=True)
     parser.add_argument("--no-include-admin", dest="include_admin", action="store_false")
@@ -369,12 +351,24 @@ def main() -> int:
         "--check-supabase-projects",
         action="store_true",
         default=False,
-        help="Fetch published projects from Supabase and validate their href targets exist in /pages/.",
+        help="Sync published projects from Supabase into the content store and validate their href "
+        "targets exist in /pages/.",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        default=False,
+        help="With --check-supabase-projects, check the projects already in the content store "
+        "without querying Supabase.",
     )
-    args = parser.parse_args()
+    add_profile_argument(parser, "check-links")
+    return parser.parse_args(argv)
+
 
+def run(args: argparse.Namespace, sources: dict[Path, str] | None = None) -> int:
     html_files = _iter_html_files(include_admin=bool(args.include_admin))
-    anchors = _collect_anchor_index(html_files)
+    with span("anchor index", files=len(html_files)):
+        anchors = _collect_anchor_index(html_files, sources)
     # Used by the optional Supabase projects check.
     global anchors_cache  # pylint: disable=global-statement
     anchors_cache = anchors
@@ -385,59 +379,62 @@ def main() -> int:
 
     for file_path in html_files:
         try:
-            content = _load_text(file_path)
-            scan.scan(file_path, content)
+            with span("scan page", "parse", path=file_path):
+                content = _read_html(file_path, sources)
+                scan.scan(file_path, content)
         except Exception as e:  # noqa: BLE001
             errors.append(f"{file_path.relative_to(REPO_ROOT)}: failed to parse HTML: {e}")
             continue
 
-        for ref in scan.refs:
-            raw = ref.url.strip()
-            if _should_skip(raw):
-                continue
+        with span("check refs", "disk", path=file_path, refs=len(scan.refs)):
+            for ref in scan.refs:
+                raw = ref.url.strip()
+                if _should_skip(raw):
+                    continue
 
-            base, frag = _strip_query_and_fragment(raw)
+                base, frag = _strip_query_and_fragment(raw)
 
-            if _is_external_http(raw) or raw.startswith("//"):
-                if raw.startswith("//"):
-                    external.add("https:" + raw)
-                else:
-                    external.add(raw)
-                continue
+                if _is_external_http(raw) or raw.startswith("//"):
+                    if raw.startswith("//"):
+                        external.add("https:" + raw)
+                    else:
+                        external.add(raw)
+                    continue
 
-            # Fragment-only links: validate anchor exists in this file.
-            if base.strip() == "" and frag:
-                if frag not in anchors.get(file_path, set()):
-                    errors.append(
-                        f"{file_path.relative_to(REPO_ROOT)}: missing anchor '#{frag}' (from {ref.tag}[{ref.attr}])"
-                    )
-                continue
+                # Fragment-only links: validate anchor exists in this file.
+                if base.strip() == "" and frag:
+                    if frag not in anchors.get(file_path, set()):
+                        errors.append(
+                            f"{file_path.relative_to(REPO_ROOT)}: missing anchor '#{frag}' (from {ref.tag}[{ref.attr}])"
+                        )
+                    continue
 
-            target = _resolve_internal_path(file_path, raw)
-            if target is None:
-                continue
+                target = _resolve_internal_path(file_path, raw)
+                if target is None:
+                    continue
 
-            ok, checked = _target_exists(target)
-            if not ok:
-                errors.append(
-                    f"{file_path.relative_to(REPO_ROOT)}: missing target for {ref.tag}[{ref.attr}] '{raw}' -> {checked.relative_to(REPO_ROOT)}"
-                )
-                continue
+                ok, checked = _target_exists(target)
+                if not ok:
+                    errors.append(
+                        f"{file_path.relative_to(REPO_ROOT)}: missing target for {ref.tag}[{ref.attr}] '{raw}' -> {checked.relative_to(REPO_ROOT)}"
+                    )
+                    continue
 
-            if frag:
-                # If the resolved target is a directory index.html, use that as the anchor source.
-                anchor_file = checked if checked.suffix.lower() == ".html" else checked
-                if anchor_file.suffix.lower() == ".html":
-                    if frag not in anchors.get(anchor_file.resolve(), set()):
-                        errors.append(
-                            f"{file_path.relative_to(REPO_ROOT)}: missing anchor '#{frag}' in {anchor_file.relative_to(REPO_ROOT)}"
-                        )
+                if frag:
+                    # If the resolved target is a directory index.html, use that as the anchor source.
+                    anchor_file = checked if checked.suffix.lower() == ".html" else checked
+                    if anchor_file.suffix.lower() == ".html":
+                        if frag not in anchors.get(anchor_file.resolve(), set()):
+                            errors.append(
+                                f"{file_path.relative_to(REPO_ROOT)}: missing anchor '#{frag}' in {anchor_file.relative_to(REPO_ROOT)}"
+                            )
 
     _check_header_js(errors)
     _check_footer_js(errors)
 
     if args.check_supabase_projects:
-        _check_supabase_projects(errors)
+        with span("supabase projects"):
+            _check_supabase_projects(errors, args.offline)
 
     if args.check_external and external:
         for url in sorted(external):
@@ -458,5 +455,11 @@ def main() -> int:
     return 0
 
 
+def main() -> int:
+    args = parse_args()
+    with profile_run("check-links", args.profile):
+        return run(args)
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""Local SQLite mirror of the Supabase tables the site scripts read.
+
+``blog_posts``, ``projects`` and ``cms_pages`` are copied into
+``.build-cache/content.sqlite3``, one row per remote row keyed on its primary key.
+A sync first lists every live row's key and ``updated_at`` and compares that with
+the stored rows: it stops there when nothing moved, and otherwise downloads only the
+rows that are new or whose ``updated_at`` differs, and drops the rows deleted or
+unpublished since. Comparing per row instead of against a newest-``updated_at``
+watermark also catches edits whose ``now()`` timestamp predates one already synced
+(a transaction that committed late).
+The generators, the link check and the pages sync read their rows from the store,
+so ``build_site.py`` syncs once per build and every script can run ``--offline``.
+
+Usage:
+  python3 scripts/content_store.py                      # sync every table
+  python3 scripts/content_store.py blog_posts --full-refresh
+  python3 scripts/content_store.py --status             # show what is stored, offline
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+from build_output import BUILD_CACHE_DIR
+from build_profile import add_profile_argument, profile_run, span
+from supabase_config import read_public_config
+
+
+CONTENT_STORE_PATH = BUILD_CACHE_DIR / "content.sqlite3"
+CONTENT_STORE_VERSION = 2
+SUPABASE_PAGE_SIZE = 500
+KEY_BATCH_SIZE = 200
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS content_rows (
+    table_name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (table_name, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS content_tables (
+    name TEXT PRIMARY KEY,
+    columns TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    watermark TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    synced_at TEXT NOT NULL
+);
+"""
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """A mirrored table: its key, the columns and rows kept, and the order reads return."""
+
+    name: str
+    key: str
+    columns: str
+    filter: str = ""
+    order: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class TableState:
+    """The remote row count, newest ``updated_at`` and listing digest a table was last synced at.
+
+    The digest covers every row's key and ``updated_at``, so it moves with any edit.
+    """
+
+    count: int
+    watermark: str
+    digest: str
+    synced_at: str
+
+
+class EmptyStoreError(RuntimeError):
+    """Raised when a table is read before it has ever been synced into the store."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(
+            f"The content store has no {name} rows yet; sync them first with "
+            f"'python3 scripts/content_store.py {name}' or run without --offline."
+        )
+
+
+CONTENT_TABLES = {
+    spec.name: spec
+    for spec in (
+        TableSpec(
+            "blog_posts",
+            key="id",
+            columns="id,slug,title,excerpt,body,cover_image_url,is_published,published_at,updated_at,created_at",
+            filter="is_published=eq.true",
+            order=("id",),
+        ),
+        TableSpec("projects", key="id", columns="*", filter="is_published=eq.true", order=("sort_order", "id")),
+        TableSpec("cms_pages", key="path", columns="path,html,updated_at", order=("path",)),
+    )
+}
+
+
+def connect() -> sqlite3.Connection:
+    """Open the store, creating it (or resetting one written by another version) as needed."""
+    BUILD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(CONTENT_STORE_PATH, timeout=30)
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version != CONTENT_STORE_VERSION:
+        with connection:
+            connection.execute("DROP TABLE IF EXISTS content_rows")
+            connection.execute("DROP TABLE IF EXISTS content_tables")
+            connection.executescript(SCHEMA)
+            connection.execute(f"PRAGMA user_version = {CONTENT_STORE_VERSION}")
+    return connection
+
+
+def request_supabase(query: str) -> object:
+    """GET a PostgREST query and return the decoded payload."""
+    config = read_public_config()
+    headers = {
+        "apikey": config.anon_key,
+        "Authorization": f"Bearer {config.anon_key}",
+        "Accept": "application/json",
+    }
+    request = Request(f"{config.url}/rest/v1/{query}", headers=headers)
+    with span("supabase request", "network", query=query):
+        with urlopen(request, timeout=20) as response:
+            body = response.read()
+    with span("decode json", "parse", bytes=len(body)):
+        return json.loads(body)
+
+
+def request_supabase_rows(spec: TableSpec, query: str) -> list[dict]:
+    payload = request_supabase(query)
+    if not isinstance(payload, list):
+        raise RuntimeError(f"Supabase {spec.name} response was not a list")
+    return [row for row in payload if isinstance(row, dict)]
+
+
+def table_query(spec: TableSpec, *filters: str, columns: str = "") -> str:
+    parts = [f"select={columns or spec.columns}", spec.filter, *filters]
+    return f"{spec.name}?{'&'.join(part for part in parts if part)}"
+
+
+def quoted_list(values: list[str]) -> str:
+    # Keys may contain reserved characters (cms_pages paths), so each is double-quoted.
+    return ",".join(quote('"' + value.replace('"', "") + '"', safe="") for value in values)
+
+
+def request_supabase_pages(spec: TableSpec, query: str) -> list[dict]:
+    """Fetch every row matching ``query`` in bounded pages, keyed on the table's key.
+
+    Each page resumes after the last key of the previous one instead of using an
+    offset, so deep pages cost the same as the first and concurrent inserts cannot
+    shift rows between pages. ``query`` must select the key column.
+    """
+    base = f"{query}&order={spec.key}.asc&limit={SUPABASE_PAGE_SIZE}"
+    rows: list[dict] = []
+    page = request_supabase_rows(spec, base)
+    while page:
+        rows.extend(page)
+        if len(page) < SUPABASE_PAGE_SIZE:
+            break
+        last = quote(str(page[-1].get(spec.key)), safe="")
+        page = request_supabase_rows(spec, f"{base}&{spec.key}=gt.{last}")
+    return rows
+
+
+def list_table(spec: TableSpec) -> dict[str, str]:
+    """Every live row's key and ``updated_at``, the listing each sync is planned from."""
+    listing = request_supabase_pages(spec, table_query(spec, columns=f"{spec.key},updated_at"))
+    return {
+        key: str(row.get("updated_at") or "")
+        for row in listing
+        if (key := row_key(spec, row)) is not None
+    }
+
+
+def listing_digest(live: dict[str, str]) -> str:
+    encoded = json.dumps(sorted(live.items()), separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def stored_state(connection: sqlite3.Connection, spec: TableSpec) -> TableState | None:
+    row = connection.execute(
+        "SELECT count, watermark, digest, synced_at FROM content_tables WHERE name = ? AND columns = ?",
+        (spec.name, spec.columns),
+    ).fetchone()
+    return TableState(*row) if row else None
+
+
+def row_key(spec: TableSpec, row: dict) -> str | None:
+    value = row.get(spec.key)
+    return None if value is None else str(value)
+
+
+def sync_table(connection: sqlite3.Connection, spec: TableSpec, full_refresh: bool = False) -> TableState:
+    """Bring one mirrored table up to date with as little transfer as possible."""
+    live = list_table(spec)
+    count, watermark, digest = len(live), max(live.values(), default=""), listing_digest(live)
+    state = None if full_refresh else stored_state(connection, spec)
+    synced_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    deleted: set[str] = set()
+    if state is None:
+        rows = request_supabase_pages(spec, table_query(spec))
+        replace = True
+    else:
+        stored = {
+            key: str(updated_at or "")
+            for key, updated_at in connection.execute(
+                "SELECT key, json_extract(data, '$.updated_at') FROM content_rows WHERE table_name = ?",
+                (spec.name,),
+            )
+        }
+        deleted = set(stored) - set(live)
+        # New, republished and edited rows alike, whatever timestamp the edit carries.
+        stale = sorted(key for key, updated_at in live.items() if stored.get(key) != updated_at)
+        if not stale and not deleted and state.digest == digest:
+            with connection:
+                connection.execute("UPDATE content_tables SET synced_at = ? WHERE name = ?", (synced_at, spec.name))
+            return TableState(count, watermark, digest, synced_at)
+        rows = []
+        for start in range(0, len(stale), KEY_BATCH_SIZE):
+            keys = quoted_list(stale[start : start + KEY_BATCH_SIZE])
+            rows.extend(request_supabase_rows(spec, table_query(spec, f"{spec.key}=in.({keys})")))
+        replace = False
+
+    with span("store rows", "disk", table=spec.name, rows=len(rows), deleted=len(deleted)), connection:
+        if replace:
+            connection.execute("DELETE FROM content_rows WHERE table_name = ?", (spec.name,))
+        connection.executemany(
+            "DELETE FROM content_rows WHERE table_name = ? AND key = ?", [(spec.name, key) for key in deleted]
+        )
+        connection.executemany(
+            "INSERT OR REPLACE INTO content_rows (table_name, key, data) VALUES (?, ?, ?)",
+            [
+                (spec.name, key, json.dumps(row, ensure_ascii=False, separators=(",", ":")))
+                for row in rows
+                if (key := row_key(spec, row)) is not None
+            ],
+        )
+        connection.execute(
+            "INSERT OR REPLACE INTO content_tables (name, columns, count, watermark, digest, synced_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (spec.name, spec.columns, count, watermark, digest, synced_at),
+        )
+    return TableState(count, watermark, digest, synced_at)
+
+
+def sync_tables(names: list[str] | tuple[str, ...], full_refresh: bool = False) -> dict[str, TableState]:
+    """Sync the named tables, in order, and return the state each was synced at."""
+    states: dict[str, TableState] = {}
+    connection = connect()
+    try:
+        for name in names:
+            with span("sync table", table=name):
+                states[name] = sync_table(connection, CONTENT_TABLES[name], full_refresh)
+    finally:
+        connection.close()
+    return states
+
+
+def table_state(name: str) -> TableState | None:
+    """When ``name`` was last synced, or ``None`` if the store has never held it."""
+    connection = connect()
+    try:
+        return stored_state(connection, CONTENT_TABLES[name])
+    finally:
+        connection.close()
+
+
+def table_rows(name: str) -> list[dict]:
+    """The stored rows of ``name`` in the table's read order (nulls last, as PostgREST sorts)."""
+    spec = CONTENT_TABLES[name]
+    order = "".join(
+        f"json_extract(data, '$.{column}') IS NULL, json_extract(data, '$.{column}'), " for column in spec.order
+    )
+    connection = connect()
+    try:
+        with span("read table", "disk", table=name):
+            cursor = connection.execute(
+                f"SELECT data FROM content_rows WHERE table_name = ? ORDER BY {order}key", (name,)
+            )
+            return [json.loads(data) for (data,) in cursor]
+    finally:
+        connection.close()
+
+
+def read_table(name: str, offline: bool = False, full_refresh: bool = False) -> tuple[TableState, list[dict]]:
+    """``name``'s stored state and rows, synced with Supabase first unless ``offline``."""
+    if not offline:
+        sync_tables([name], full_refresh)
+    state = table_state(name)
+    if state is None:
+        raise EmptyStoreError(name)
+    return state, table_rows(name)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Sync the local content store with the Supabase tables the site scripts read."
+    )
+    parser.add_argument(
+        "tables",
+        nargs="*",
+        metavar="TABLE",
+        help=f"Tables to sync (default: all). Tables: {', '.join(CONTENT_TABLES)}.",
+    )
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="Ignore the stored rows and download every row again.",
+    )
+    parser.add_argument(
+        "--status",
+        action="store_true",
+        help="Only show what the store holds; does not query Supabase.",
+    )
+    add_profile_argument(parser, "content-store")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.tables if name not in CONTENT_TABLES]
+    if unknown:
+        parser.error(f"unknown table(s): {', '.join(unknown)}")
+    args.tables = args.tables or list(CONTENT_TABLES)
+    return args
+
+
+def run(args: argparse.Namespace) -> int:
+    if not args.status:
+        sync_tables(args.tables, args.full_refresh)
+    for name in args.tables:
+        state = table_state(name)
+        if state is None:
+            print(f"{name:<12} not synced")
+            continue
+        print(f"{name:<12} {state.count:>6} rows  newest update {state.watermark or '-'}  synced {state.synced_at}")
+    return 0
+
+
+def main() -> int:
+    args = parse_args()
+    with profile_run("content-store", args.profile):
+        return run(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,204 @@
+"""Critical CSS for generated page templates.
+
+For each template the generators render a representative page, collect the classes
+and ids it uses (plus every word in the string literals of the scripts that build the
+header, footer and page shell at runtime), and keep only the ``styles.css`` rules
+whose class and id selectors can all match. That subset is inlined in ``<head>``
+and the full stylesheets load as ``media="print"`` until ``site-shell.js`` switches
+them on, so neither blocks the first paint. Results are cached in ``.build-cache``
+per template, keyed by the stylesheet, the template's selector tokens and the
+safelisted scripts, so extraction only reruns when one of them changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+
+from build_output import BUILD_CACHE_DIR, ROOT
+from page_shell import DEFERRED_STYLESHEETS, STYLESHEET_LINKS
+
+
+STYLESHEET_PATH = ROOT / "assets" / "css" / "styles.css"
+CRITICAL_CSS_CACHE_PATH = BUILD_CACHE_DIR / "critical-css.json"
+CRITICAL_CSS_VERSION = 1
+SAFELIST_SCRIPTS = (ROOT / "js" / "header.js", ROOT / "js" / "footer.js", ROOT / "js" / "site-shell.js")
+# Group rules whose children are filtered; any other at-rule block is kept whole or dropped.
+GROUPING_AT_RULES = ("@media", "@supports")
+
+COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+PSEUDO_FUNCTION = re.compile(r":{1,2}[\w-]+\((?:[^()]|\([^()]*\))*\)")
+ATTRIBUTE_SELECTOR = re.compile(r"\[[^\]]*\]")
+PSEUDO = re.compile(r":{1,2}[\w-]+")
+SELECTOR_TOKEN = re.compile(r"[.#]-?[_a-zA-Z][\w-]*")
+CLASS_ATTRIBUTE = re.compile(r"""\sclass\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE)
+ID_ATTRIBUTE = re.compile(r"""\sid\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE)
+STRING_LITERAL = re.compile(r"""'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*"|`(?:[^`\\]|\\.)*`""")
+WORD = re.compile(r"-?[_a-zA-Z][\w-]*")
+ANIMATION_NAME = re.compile(r"animation(?:-name)?\s*:([^;]*)")
+CRITICAL_BLOCK = re.compile(
+    r"(?P<indent>[ \t]*)(?:<style data-critical-css>.*?</noscript>"
+    r'|<link href="https://fonts\.googleapis\.com/css2[^"]*" rel="stylesheet" />\s*'
+    r'<link rel="stylesheet" href="[^"]*assets/css/styles[.\w]*\.css(?:\?[^"]*)?" />)',
+    re.DOTALL,
+)
+CRITICAL_CSS_CACHE_LOCK = threading.Lock()
+STYLESHEET_HREF = re.compile(r'href="(?P<href>[^"]*assets/css/styles[.\w]*\.css(?:\?[^"]*)?)"')
+
+
+def parse_css(css: str) -> list[tuple]:
+    """Split a comment-free stylesheet into ``("rule", selectors, declarations)``,
+    ``("group", prelude, children)``, ``("block", prelude, body)`` and
+    ``("statement", text)`` items."""
+    items: list[tuple] = []
+    position = 0
+    while position < len(css):
+        brace = css.find("{", position)
+        semicolon = css.find(";", position)
+        if brace == -1:
+            break
+        prelude = css[position:brace].strip()
+        if prelude.startswith("@") and semicolon != -1 and semicolon < brace:
+            items.append(("statement", css[position : semicolon + 1].strip()))
+            position = semicolon + 1
+            continue
+        depth = 1
+        end = brace + 1
+        while depth and end < len(css):
+            depth += {"{": 1, "}": -1}.get(css[end], 0)
+            end += 1
+        body = css[brace + 1 : end - 1]
+        if prelude.startswith(GROUPING_AT_RULES):
+            items.append(("group", prelude, parse_css(body)))
+        elif prelude.startswith("@"):
+            items.append(("block", prelude, body))
+        elif prelude:
+            items.append(("rule", prelude, body))
+        position = end
+    return items
+
+
+def selector_tokens(selector: str) -> list[str]:
+    """Class and id tokens a selector needs, ignoring pseudo-classes and attributes."""
+    bare = PSEUDO.sub("", ATTRIBUTE_SELECTOR.sub("", PSEUDO_FUNCTION.sub("", selector)))
+    return SELECTOR_TOKEN.findall(bare)
+
+
+def split_selectors(prelude: str) -> list[str]:
+    selectors: list[str] = []
+    depth = 0
+    start = 0
+    for index, char in enumerate(prelude):
+        depth += {"(": 1, "[": 1, ")": -1, "]": -1}.get(char, 0)
+        if char == "," and depth == 0:
+            selectors.append(prelude[start:index])
+            start = index + 1
+    selectors.append(prelude[start:])
+    return [" ".join(selector.split()) for selector in selectors if selector.strip()]
+
+
+def compact(text: str) -> str:
+    return " ".join(text.split()).rstrip(";").strip()
+
+
+def filter_rules(items: list[tuple], tokens: set[str]) -> list[str]:
+    """Serialize the rules from ``items`` whose selectors can match ``tokens``."""
+    kept: list[str] = []
+    for item in items:
+        if item[0] == "rule":
+            selectors = [s for s in split_selectors(item[1]) if all(t in tokens for t in selector_tokens(s))]
+            if selectors:
+                kept.append(f"{','.join(selectors)}{{{compact(item[2])}}}")
+        elif item[0] == "group":
+            children = filter_rules(item[2], tokens)
+            if children:
+                kept.append(f"{compact(item[1])}{{{''.join(children)}}}")
+    return kept
+
+
+def extract_critical_css(css: str, tokens: set[str]) -> str:
+    """The subset of ``css`` a page using ``tokens`` needs, plus the keyframes it animates with."""
+    items = parse_css(COMMENT.sub("", css))
+    rules = filter_rules(items, tokens)
+    animations = {word for match in ANIMATION_NAME.finditer("".join(rules)) for word in WORD.findall(match.group(1))}
+    for item in items:
+        if item[0] == "statement" and item[1].startswith("@charset"):
+            rules.insert(0, item[1])
+        elif item[0] == "block" and item[1].startswith("@keyframes") and item[1].split()[-1] in animations:
+            rules.append(f"{compact(item[1])}{{{compact(item[2])}}}")
+    return "".join(rules)
+
+
+def page_tokens(source: str) -> set[str]:
+    """``.class`` and ``#id`` tokens used by an HTML page."""
+    tokens: set[str] = set()
+    for match in CLASS_ATTRIBUTE.finditer(source):
+        tokens.update(f".{name}" for name in (match.group(1) or match.group(2) or "").split())
+    for match in ID_ATTRIBUTE.finditer(source):
+        tokens.add(f"#{(match.group(1) or match.group(2) or '').strip()}")
+    return tokens
+
+
+def script_tokens() -> set[str]:
+    """Every word in the string literals of the scripts that render shared page chrome."""
+    tokens: set[str] = set()
+    for path in SAFELIST_SCRIPTS:
+        for literal in STRING_LITERAL.findall(path.read_text(encoding="utf-8")):
+            for word in WORD.findall(literal):
+                tokens.update((f".{word}", f"#{word}"))
+    return tokens
+
+
+def load_cache() -> dict[str, list[str]]:
+    try:
+        payload = json.loads(CRITICAL_CSS_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(payload, dict) or payload.get("version") != CRITICAL_CSS_VERSION:
+        return {}
+    templates = payload.get("templates")
+    return {str(k): v for k, v in templates.items() if isinstance(v, list)} if isinstance(templates, dict) else {}
+
+
+def critical_css(template: str, pages: list[str]) -> str:
+    """Critical CSS for a template, given representative pages rendered from it."""
+    css = STYLESHEET_PATH.read_text(encoding="utf-8")
+    tokens = set().union(*(page_tokens(page) for page in pages)) | script_tokens()
+    key = hashlib.sha256(
+        json.dumps([CRITICAL_CSS_VERSION, css, sorted(tokens)]).encode("utf-8")
+    ).hexdigest()
+    entry = load_cache().get(template)
+    if entry and entry[0] == key:
+        return entry[1]
+    result = extract_critical_css(css, tokens)
+    # Generators running side by side under build_site.py share the cache file.
+    with CRITICAL_CSS_CACHE_LOCK:
+        cache = load_cache()
+        cache[template] = [key, result]
+        BUILD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        CRITICAL_CSS_CACHE_PATH.write_text(
+            json.dumps({"version": CRITICAL_CSS_VERSION, "templates": dict(sorted(cache.items()))}) + "\n",
+            encoding="utf-8",
+        )
+    return result
+
+
+def render_stylesheets(href: str, css: str | None = None, indent: str = "  ") -> str:
+    """Head markup loading the fonts and ``href``: blocking links, or ``css`` inlined with
+    the full stylesheets deferred."""
+    if css is None:
+        return STYLESHEET_LINKS.render(indent=indent, href=href)
+    return DEFERRED_STYLESHEETS.render(indent=indent, href=href, css=css)
+
+
+def inline_critical_css(source: str, css: str) -> str:
+    """Swap a page's blocking font and site stylesheet links (or a previous critical block)
+    for ``css`` inlined and the stylesheets deferred."""
+    match = CRITICAL_BLOCK.search(source)
+    if not match:
+        return source
+    href = STYLESHEET_HREF.search(match.group(0)).group("href")
+    block = render_stylesheets(href, css, match.group("indent"))
+    return source[: match.start()] + block + source[match.end() :]
@@ -11,6 +11,8 @@ from urllib.parse import urlparse
 
 MAX_SAVE_BYTES = 5 * 1024 * 1024
 MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+# Sibling suffix for each encoding, in order of preference.
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
 
 
 def _safe_relpath(raw: str) -> str:
@@ -113,6 +115,54 @@ class Handler(SimpleHTTPRequestHandler):
             self.send_header(header, value)
         super().end_headers()
 
+    def _accepted_encodings(self) -> set:
+        accepted = set()
+        for item in (self.headers.get("Accept-Encoding") or "").split(","):
+            name, _, params = item.partition(";")
+            weight = params.strip().removeprefix("q=")
+            try:
+                if params and float(weight) <= 0:
+                    continue
+            except ValueError:
+                pass
+            accepted.add(name.strip().lower())
+        return accepted
+
+    def _precompressed_file(self):
+        """The (encoding, path, source) of a fresh .br/.gz sibling the client accepts, if any."""
+        source = self.translate_path(self.path)
+        if not os.path.isfile(source):
+            return None
+        accepted = self._accepted_encodings()
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            candidate = source + suffix
+            if encoding not in accepted or not os.path.isfile(candidate):
+                continue
+            # A sibling older than its source is stale (e.g. the page was edited by hand).
+            if os.stat(candidate).st_mtime_ns >= os.stat(source).st_mtime_ns:
+                return encoding, candidate, source
+        return None
+
+    def send_head(self):
+        precompressed = self._precompressed_file()
+        if precompressed is None:
+            return super().send_head()
+        encoding, path, source = precompressed
+        handle = open(path, "rb")
+        try:
+            stat = os.fstat(handle.fileno())
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", self.guess_type(source))
+            self.send_header("Content-Encoding", encoding)
+            self.send_header("Content-Length", str(stat.st_size))
+            self.send_header("Vary", "Accept-Encoding")
+            self.send_header("Last-Modified", self.date_time_string(stat.st_mtime))
+            self.end_headers()
+            return handle
+        except Exception:
+            handle.close()
+            raise
+
     def _send_json(self, code: int, payload: dict) -> None:
         body = json.dumps(payload).encode("utf-8")
         self.send_response(code)
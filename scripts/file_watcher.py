@@ -0,0 +1,214 @@
+"""Debounced file watching for the generators' ``--watch`` modes.
+
+On Linux the watcher uses inotify through ``ctypes``, so it sleeps until the kernel
+reports a change. Elsewhere (or with ``polling=True``) it compares file stats at a
+fixed interval. Either way a burst of events, such as an editor's write-and-rename
+save, is collected until the files have been quiet for ``debounce`` seconds and is
+handed to the rebuild callback as one set of paths. Watches are not recursive: a
+directory covers the files directly inside it.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Iterable
+
+from build_output import ROOT
+
+
+DEBOUNCE_SECONDS = 0.05
+POLL_INTERVAL_SECONDS = 0.25
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class InotifyBackend:
+    """Kernel change notifications for the watched directories."""
+
+    name = "inotify"
+
+    def __init__(self, directories: set[Path]) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories: dict[int, Path] = {}
+        for directory in directories:
+            descriptor = libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if descriptor < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+            self.directories[descriptor] = directory
+
+    def poll(self, timeout: float | None) -> set[Path] | None:
+        """Paths changed within ``timeout`` seconds; ``None`` when the kernel queue overflowed."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed: set[Path] = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                descriptor, mask, _cookie, length = INOTIFY_EVENT.unpack_from(data, offset)
+                name = data[offset + INOTIFY_EVENT.size : offset + INOTIFY_EVENT.size + length].rstrip(b"\0")
+                offset += INOTIFY_EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                if descriptor in self.directories and name:
+                    changed.add(self.directories[descriptor] / os.fsdecode(name))
+
+    def refresh(self, paths: Iterable[Path]) -> None:
+        pass
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingBackend:
+    """Stat comparison for platforms without inotify."""
+
+    name = "polling"
+
+    def __init__(self, directories: set[Path], interval: float = POLL_INTERVAL_SECONDS) -> None:
+        self.directories = directories
+        self.interval = interval
+        self.stats = self.scan()
+
+    def scan(self) -> dict[Path, tuple[int, int]]:
+        stats: dict[Path, tuple[int, int]] = {}
+        for directory in self.directories:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                stats[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    def poll(self, timeout: float | None) -> set[Path] | None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            stats = self.scan()
+            changed = {path for path in stats.keys() | self.stats.keys() if stats.get(path) != self.stats.get(path)}
+            self.stats = stats
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+            remaining = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            time.sleep(max(0.0, remaining))
+
+    def refresh(self, paths: Iterable[Path]) -> None:
+        """Take the current stats of ``paths`` so the callback's own writes are not reported."""
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                self.stats.pop(path, None)
+                continue
+            self.stats[path] = (stat.st_mtime_ns, stat.st_size)
+
+    def close(self) -> None:
+        pass
+
+
+class FileWatcher:
+    """Report debounced batches of changes to a set of files and directories."""
+
+    def __init__(self, paths: Iterable[Path], debounce: float = DEBOUNCE_SECONDS, polling: bool = False) -> None:
+        self.paths = {path.resolve() for path in paths}
+        self.debounce = debounce
+        self.pending: set[Path] = set()
+        directories = {path if path.is_dir() else path.parent for path in self.paths}
+        self.backend: InotifyBackend | PollingBackend
+        if polling or not sys.platform.startswith("linux"):
+            self.backend = PollingBackend(directories)
+        else:
+            try:
+                self.backend = InotifyBackend(directories)
+            except (OSError, AttributeError) as exc:
+                print(f"Warning: inotify is unavailable ({exc}); polling for changes instead.", file=sys.stderr)
+                self.backend = PollingBackend(directories)
+
+    def relevant(self, changed: set[Path] | None) -> set[Path]:
+        """Watched paths among ``changed``, skipping hidden temporaries (atomic writes, editor swap files)."""
+        if changed is None:
+            return set(self.paths)
+        return {
+            path
+            for path in changed
+            if path in self.paths
+            or (path.parent in self.paths and not path.name.startswith(".") and not path.name.endswith("~"))
+        }
+
+    def wait(self) -> set[Path]:
+        """Block until a watched path changes, then until changes stop for ``debounce`` seconds."""
+        changed, self.pending = self.pending, set()
+        while not changed:
+            changed = self.relevant(self.backend.poll(None))
+        while True:
+            more = self.backend.poll(self.debounce)
+            if more == set():
+                return changed
+            changed |= self.relevant(more)
+
+    def ignore(self, paths: Iterable[Path]) -> None:
+        """Drop pending events for files the rebuild itself just wrote; keep any others."""
+        written = {path.resolve() for path in paths}
+        self.backend.refresh(written)
+        self.pending |= self.relevant(self.backend.poll(0)) - written
+
+    def close(self) -> None:
+        self.backend.close()
+
+
+def watch(
+    paths: Iterable[Path],
+    rebuild: Callable[[set[Path]], Iterable[Path]],
+    debounce: float = DEBOUNCE_SECONDS,
+    polling: bool = False,
+) -> None:
+    """Call ``rebuild`` with each batch of changed paths until interrupted.
+
+    ``rebuild`` returns the files it wrote, which are not reported back to it as changes.
+    A failing rebuild (say, a half-saved JSON file) is reported and the watch goes on.
+    """
+    watcher = FileWatcher(paths, debounce, polling)
+    print(f"Watching {len(watcher.paths)} paths ({watcher.backend.name}); press Ctrl+C to stop.")
+    try:
+        while True:
+            changed = watcher.wait()
+            started = time.perf_counter()
+            names = ", ".join(sorted(path.relative_to(ROOT).as_posix() for path in changed))
+            try:
+                written = list(rebuild(changed))
+            except Exception as exc:  # noqa: BLE001 - keep watching after a bad edit
+                print(f"Error: rebuilding after {names} failed: {exc}", file=sys.stderr)
+                continue
+            watcher.ignore(written)
+            print(f"Rebuilt after {names} in {(time.perf_counter() - started) * 1000:.0f} ms.")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
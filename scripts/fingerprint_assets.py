@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Content-hash fingerprinting for the shared stylesheet and scripts.
+
+Every file directly under ``assets/css`` and ``js/`` gets a copy named after its
+content (``js/header.js`` -> ``js/header.<hash>.js``) in the same directory, so
+relative ``url()`` references and the scripts' own root-path detection keep
+working. ``assets/asset-manifest.json`` maps each source to its copy, and a
+managed block in ``_headers`` serves the copies as immutable. The generators
+call ``fingerprint_assets()`` before rendering and resolve asset URLs through
+the manifest; running this script directly also prunes copies nothing links to.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+from functools import cache
+from pathlib import Path
+
+from build_output import ROOT, OutputWriter
+
+
+ASSET_MANIFEST_PATH = ROOT / "assets" / "asset-manifest.json"
+ASSET_MANIFEST_VERSION = 1
+FINGERPRINT_DIRS = (ROOT / "assets" / "css", ROOT / "js")
+FINGERPRINT_SUFFIXES = {".css", ".js"}
+FINGERPRINT_LENGTH = 12
+FINGERPRINTED_NAME = re.compile(rf"\.[0-9a-f]{{{FINGERPRINT_LENGTH}}}\.(?:css|js)$")
+HEADERS_PATH = ROOT / "_headers"
+HEADERS_START = "# BEGIN fingerprinted assets (generated by scripts/fingerprint_assets.py)"
+HEADERS_END = "# END fingerprinted assets"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# A stylesheet or script reference that carries a cache buster: either a manual
+# ``?v=NN`` query or an earlier fingerprint. Plain references are left alone, since
+# the scripts look some of them up by their unversioned path.
+ASSET_REFERENCE = re.compile(
+    r'(?P<attr>\s(?:src|href)=")(?P<prefix>/|(?:\.\./)*)'
+    r"(?P<stem>(?:assets/css|js)/[\w-]+(?:\.[\w-]+)*?)"
+    rf"(?P<fingerprint>\.[0-9a-f]{{{FINGERPRINT_LENGTH}}})?(?P<suffix>\.(?:css|js))"
+    r'(?P<query>\?v=[^"#]*)?"'
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Fingerprint assets/css and js/ files and prune copies no page links to."
+    )
+    parser.add_argument(
+        "--changes-file",
+        type=Path,
+        help="Where to write the JSON list of changed outputs "
+        "(default: .build-cache/changes-fingerprint-assets.json).",
+    )
+    return parser.parse_args()
+
+
+def source_assets() -> list[Path]:
+    return [
+        path
+        for directory in FINGERPRINT_DIRS
+        for path in sorted(directory.iterdir())
+        if path.is_file() and path.suffix in FINGERPRINT_SUFFIXES and not FINGERPRINTED_NAME.search(path.name)
+    ]
+
+
+def fingerprinted_copies() -> list[Path]:
+    return [
+        path
+        for directory in FINGERPRINT_DIRS
+        for path in sorted(directory.iterdir())
+        if path.is_file() and FINGERPRINTED_NAME.search(path.name)
+    ]
+
+
+def render_headers_block(assets: dict[str, str]) -> str:
+    rules = [f"/{path}\n  Cache-Control: {IMMUTABLE_CACHE_CONTROL}\n" for path in sorted(assets.values())]
+    return f"{HEADERS_START}\n" + "\n".join(rules) + f"\n{HEADERS_END}\n"
+
+
+def update_headers(source: str, assets: dict[str, str]) -> str:
+    """Replace (or append) the managed immutable-cache block in ``_headers``."""
+    block = render_headers_block(assets)
+    start = source.find(HEADERS_START)
+    end = source.find(HEADERS_END, start)
+    if start != -1 and end != -1:
+        return source[:start] + block + source[end + len(HEADERS_END) :].lstrip("\n")
+    return source.rstrip("\n") + "\n\n" + block
+
+
+@cache
+def load_asset_manifest() -> dict[str, str]:
+    try:
+        payload = json.loads(ASSET_MANIFEST_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(payload, dict) or payload.get("version") != ASSET_MANIFEST_VERSION:
+        return {}
+    assets = payload.get("assets")
+    return {str(k): str(v) for k, v in assets.items()} if isinstance(assets, dict) else {}
+
+
+def asset_url(path: str) -> str:
+    """Root-relative URL of the fingerprinted copy of ``path`` (``assets/css/styles.css``).
+
+    Falls back to the plain path when the manifest has no entry for it yet.
+    """
+    return f"/{load_asset_manifest().get(path, path)}"
+
+
+def fingerprint_assets(writer: OutputWriter) -> dict[str, str]:
+    """Write content-named copies, the asset manifest and the ``_headers`` block.
+
+    Returns the manifest mapping. Copies are never removed here, because pages from
+    another generator may still link to them; ``main()`` prunes unreferenced ones.
+    """
+    assets: dict[str, str] = {}
+    for path in source_assets():
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:FINGERPRINT_LENGTH]
+        copy = path.with_name(f"{path.stem}.{digest}{path.suffix}")
+        writer.write_bytes(copy, data)
+        assets[writer.rel_path(path)] = writer.rel_path(copy)
+
+    payload = {"version": ASSET_MANIFEST_VERSION, "assets": assets}
+    writer.write_text(ASSET_MANIFEST_PATH, json.dumps(payload, indent=2) + "\n")
+    writer.write_text(HEADERS_PATH, update_headers(HEADERS_PATH.read_text(encoding="utf-8"), assets))
+    load_asset_manifest.cache_clear()
+    return assets
+
+
+def rewrite_asset_urls(source: str, assets: dict[str, str]) -> str:
+    """Point cache-busted stylesheet and script references in ``source`` at their copies."""
+
+    def replace(match: re.Match[str]) -> str:
+        if not match.group("fingerprint") and not match.group("query"):
+            return match.group(0)
+        target = assets.get(f"{match.group('stem')}{match.group('suffix')}")
+        if target is None:
+            return match.group(0)
+        return f'{match.group("attr")}{match.group("prefix")}{target}"'
+
+    return ASSET_REFERENCE.sub(replace, source)
+
+
+def html_sources() -> dict[Path, str]:
+    """Every HTML page in the site, keyed by path."""
+    return {
+        path: path.read_text(encoding="utf-8", errors="replace")
+        for path in sorted(ROOT.rglob("*.html"))
+        if ".git" not in path.parts and ".build-cache" not in path.parts
+    }
+
+
+def referenced_copies(sources: dict[Path, str]) -> set[str]:
+    """Names of fingerprinted copies linked from any of the HTML ``sources``."""
+    names: set[str] = set()
+    for source in sources.values():
+        for match in ASSET_REFERENCE.finditer(source):
+            if match.group("fingerprint"):
+                names.add(f"{match.group('stem')}{match.group('fingerprint')}{match.group('suffix')}")
+    return names
+
+
+def prune_copies(writer: OutputWriter, assets: dict[str, str], sources: dict[Path, str] | None = None) -> None:
+    """Remove fingerprinted copies that are neither current nor linked from a page."""
+    keep = set(assets.values()) | referenced_copies(html_sources() if sources is None else sources)
+    for path in fingerprinted_copies():
+        if writer.rel_path(path) not in keep:
+            writer.remove(path)
+
+
+def main() -> None:
+    args = parse_args()
+    writer = OutputWriter("fingerprint-assets", report_path=args.changes_file)
+    assets = fingerprint_assets(writer)
+    prune_copies(writer, assets)
+    writer.save()
+    print(
+        f"Fingerprinted {len(assets)} assets "
+        f"({len(writer.changed)} changed, {len(writer.removed)} removed)."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""Responsive variants for local blog images.
+
+Local ``assets/images`` sources get resized WebP variants plus a JPEG (or PNG, when
+the source has transparency) fallback at a few widths. Variant names are derived
+from the source bytes and the encoder settings, so an existing file is never
+re-encoded, and source digests and dimensions are cached by stat in
+``.build-cache`` so unchanged sources are not even re-read.
+
+Pillow is optional. Without it no variants are produced, but intrinsic
+dimensions are still read from the image headers so pages can reserve space.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+from build_output import BUILD_CACHE_DIR, ROOT, OutputWriter
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - depends on the build environment
+    Image = None
+
+VARIANTS_ENABLED = Image is not None
+
+VARIANTS_DIR = ROOT / "assets" / "images" / "variants"
+VARIANT_CACHE_PATH = BUILD_CACHE_DIR / "image-variants.json"
+VARIANT_CACHE_VERSION = 1
+VARIANT_WIDTHS = (480, 800, 1200, 1600)
+VARIANT_SOURCE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp"}
+WEBP_QUALITY = 78
+JPEG_QUALITY = 82
+# Part of every variant name, so changing the widths or quality re-encodes everything.
+ENCODER_SETTINGS = f"webp:{WEBP_QUALITY};jpeg:{JPEG_QUALITY};widths:{VARIANT_WIDTHS}"
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+@dataclass(frozen=True)
+class ResponsiveImage:
+    """Intrinsic size of a local image plus its variant srcsets (empty without Pillow)."""
+
+    src: str
+    width: int
+    height: int
+    webp_srcset: str = ""
+    fallback_srcset: str = ""
+
+
+def local_image_path(url: str) -> Path | None:
+    """The file behind a root-relative ``/assets/images/...`` URL, ignoring any query."""
+    if not url.startswith("/assets/images/") or url.startswith("/assets/images/variants/"):
+        return None
+    path = ROOT / url.split("?", 1)[0].split("#", 1)[0].lstrip("/")
+    if path.suffix.lower() not in VARIANT_SOURCE_SUFFIXES | {".gif"} or not path.is_file():
+        return None
+    return path
+
+
+def read_image_size(path: Path) -> tuple[int, int] | None:
+    """Width and height from a PNG, GIF, WebP or JPEG header, without decoding pixels."""
+    with open(path, "rb") as handle:
+        head = handle.read(32)
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            chunk = head[12:16]
+            if chunk == b"VP8X":
+                return 1 + int.from_bytes(head[24:27], "little"), 1 + int.from_bytes(head[27:30], "little")
+            if chunk == b"VP8L":
+                bits = int.from_bytes(head[21:25], "little")
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b"VP8 ":
+                width, height = struct.unpack("<HH", head[26:30])
+                return width & 0x3FFF, height & 0x3FFF
+            return None
+        if head[:2] != b"\xff\xd8":
+            return None
+        handle.seek(2)
+        while True:
+            marker = handle.read(2)
+            while len(marker) == 2 and marker[0] == 0xFF and marker[1] == 0xFF:
+                marker = marker[1:] + handle.read(1)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                return None
+            if marker[1] == 0x01 or 0xD0 <= marker[1] <= 0xD8:
+                continue
+            length = handle.read(2)
+            if len(length) < 2:
+                return None
+            if marker[1] in JPEG_SOF_MARKERS:
+                frame = handle.read(5)
+                if len(frame) < 5:
+                    return None
+                height, width = struct.unpack(">xHH", frame)
+                return width, height
+            handle.seek(struct.unpack(">H", length)[0] - 2, 1)
+
+
+def variant_widths(width: int) -> list[int]:
+    """Target widths for a source ``width`` pixels wide; images are never upscaled."""
+    widths = [target for target in VARIANT_WIDTHS if target < width]
+    widths.append(min(width, VARIANT_WIDTHS[-1]))
+    return widths
+
+
+def encode_variants(source: Path, key: str, widths: list[int], writer: OutputWriter) -> str:
+    """Write any missing variants of ``source`` and return the fallback format's extension.
+
+    Each variant is written through ``writer``, so new files show up in its change report.
+    """
+    with Image.open(source) as image:
+        image.load()
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        fallback = "png" if has_alpha else "jpg"
+        for width in widths:
+            targets = [VARIANTS_DIR / f"{key}-{width}.webp", VARIANTS_DIR / f"{key}-{width}.{fallback}"]
+            if all(target.exists() for target in targets):
+                continue
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            resized = resized.convert("RGBA" if has_alpha else "RGB")
+            for target in targets:
+                if target.exists():
+                    continue
+                buffer = io.BytesIO()
+                if target.suffix == ".webp":
+                    resized.save(buffer, "WEBP", quality=WEBP_QUALITY, method=6)
+                elif target.suffix == ".png":
+                    resized.save(buffer, "PNG", optimize=True)
+                else:
+                    resized.save(buffer, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+                writer.write_bytes(target, buffer.getvalue())
+        return fallback
+
+
+def load_variant_cache() -> dict[str, list]:
+    try:
+        payload = json.loads(VARIANT_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(payload, dict) or payload.get("version") != VARIANT_CACHE_VERSION:
+        return {}
+    sources = payload.get("sources")
+    return {str(k): v for k, v in sources.items() if isinstance(v, list)} if isinstance(sources, dict) else {}
+
+
+def local_image_digests() -> dict[str, str]:
+    """Content digests of every variant source under assets/images, reusing cached ones by stat.
+
+    This is what lets a build notice a replaced image file behind an unchanged URL.
+    """
+    cache = load_variant_cache()
+    digests: dict[str, str] = {}
+    for path in sorted((ROOT / "assets" / "images").rglob("*")):
+        if not path.is_file() or VARIANTS_DIR in path.parents:
+            continue
+        if path.suffix.lower() not in VARIANT_SOURCE_SUFFIXES | {".gif"}:
+            continue
+        rel_path = path.relative_to(ROOT).as_posix()
+        stat = path.stat()
+        entry = cache.get(rel_path)
+        if entry and entry[:2] == [stat.st_size, stat.st_mtime_ns]:
+            digests[rel_path] = entry[2]
+        else:
+            digests[rel_path] = hashlib.sha256(path.read_bytes()).hexdigest()
+    return digests
+
+
+def build_responsive_images(urls: list[str], writer: OutputWriter) -> dict[str, ResponsiveImage]:
+    """Map each local image URL to its dimensions and, with Pillow, its variant srcsets."""
+    cache = load_variant_cache()
+    sources: dict[str, list] = {}
+    images: dict[str, ResponsiveImage] = {}
+    expected: set[str] = set()
+    for url in urls:
+        path = local_image_path(url)
+        if path is None:
+            continue
+        rel_path = path.relative_to(ROOT).as_posix()
+        stat = path.stat()
+        entry = sources.get(rel_path) or cache.get(rel_path)
+        if not entry or entry[:2] != [stat.st_size, stat.st_mtime_ns]:
+            size = read_image_size(path)
+            if size is None:
+                continue
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+            entry = [stat.st_size, stat.st_mtime_ns, digest, size[0], size[1]]
+        sources[rel_path] = entry
+        width, height = entry[3], entry[4]
+
+        if not VARIANTS_ENABLED or path.suffix.lower() not in VARIANT_SOURCE_SUFFIXES:
+            images[url] = ResponsiveImage(src=url, width=width, height=height)
+            continue
+        key = hashlib.sha256(f"{entry[2]}:{ENCODER_SETTINGS}".encode("utf-8")).hexdigest()[:20]
+        widths = variant_widths(width)
+        fallback = entry[5] if len(entry) > 5 else ""
+        if not fallback or not all(
+            (VARIANTS_DIR / f"{key}-{size}.{ext}").exists() for size in widths for ext in ("webp", fallback)
+        ):
+            fallback = encode_variants(path, key, widths, writer)
+        sources[rel_path] = entry = entry[:5] + [fallback]
+        names = {width: f"/assets/images/variants/{key}-{width}" for width in widths}
+        expected.update(f"{key}-{width}.{ext}" for width in widths for ext in ("webp", fallback))
+        images[url] = ResponsiveImage(
+            src=f"{names[widths[-1]]}.{fallback}",
+            width=width,
+            height=height,
+            webp_srcset=", ".join(f"{name}.webp {size}w" for size, name in names.items()),
+            fallback_srcset=", ".join(f"{name}.{fallback} {size}w" for size, name in names.items()),
+        )
+
+    # Only prune when variants could be produced; otherwise nothing would be "expected".
+    if VARIANTS_ENABLED and VARIANTS_DIR.exists():
+        for path in sorted(VARIANTS_DIR.iterdir()):
+            if path.is_file() and path.name not in expected:
+                writer.remove(path)
+
+    BUILD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    VARIANT_CACHE_PATH.write_text(
+        json.dumps({"version": VARIANT_CACHE_VERSION, "sources": dict(sorted(sources.items()))}, indent=2) + "\n",
+        encoding="utf-8",
+    )
+    return images
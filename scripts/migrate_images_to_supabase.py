@@ -16,6 +16,7 @@ Optional flags:
   --dry-run           Only print what would be uploaded.
   --delete-local      Delete local image files after successful upload.
   --manifest PATH     Write a JSON manifest (default: scripts/supabase_images_manifest.json).
+  --profile [TRACE]   Write a Chrome trace of where the upload spends its time.
 """
 
 from __future__ import annotations
@@ -34,6 +35,8 @@ import urllib.request
 import urllib.error
 from pathlib import Path
 
+from build_profile import add_profile_argument, profile_run, span
+
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 
@@ -65,7 +68,7 @@ def _sign_in_with_password(supabase_url: str, anon_key: str, email: str, passwor
     req.add_header("Content-Type", "application/json")
     req.add_header("Accept", "application/json")
     try:
-        with urllib.request.urlopen(req, timeout=20) as r:
+        with span("sign in", "network"), urllib.request.urlopen(req, timeout=20) as r:
             data = json.loads(r.read().decode("utf-8", errors="replace") or "{}")
     except urllib.error.HTTPError as e:
         body = e.read().decode("utf-8", errors="replace")
@@ -135,8 +138,9 @@ def _upload_via_edge_function(
     req.add_header("Accept", "application/json")
 
     try:
-        with urllib.request.urlopen(req, timeout=60) as r:
-            payload = json.loads(r.read().decode("utf-8", errors="replace") or "{}")
+        with span("upload", "network", path=file_path, bytes=len(body)):
+            with urllib.request.urlopen(req, timeout=60) as r:
+                payload = json.loads(r.read().decode("utf-8", errors="replace") or "{}")
     except urllib.error.HTTPError as e:
         body_txt = e.read().decode("utf-8", errors="replace")
         raise RuntimeError(
@@ -173,8 +177,9 @@ def _upload_via_storage_service_role(
     req.add_header("Accept", "application/json")
 
     try:
-        with urllib.request.urlopen(req, timeout=60) as r:
-            _ = r.read()  # Body is not needed; read to finish request.
+        with span("upload", "network", path=file_path, bytes=len(raw_bytes)):
+            with urllib.request.urlopen(req, timeout=60) as r:
+                _ = r.read()  # Body is not needed; read to finish request.
     except urllib.error.HTTPError as e:
         body_txt = e.read().decode("utf-8", errors="replace")
         raise RuntimeError(
@@ -201,8 +206,13 @@ def main() -> int:
         default=str(REPO_ROOT / "scripts" / "supabase_images_manifest.json"),
         help="Write a JSON manifest mapping local asset paths to public URLs.",
     )
+    add_profile_argument(parser, "migrate-images-to-supabase")
     args = parser.parse_args()
+    with profile_run("migrate-images-to-supabase", args.profile):
+        return migrate_images(args)
+
 
+def migrate_images(args: argparse.Namespace) -> int:
     cfg = _parse_supabase_config(REPO_ROOT / "js" / "supabase-config.js")
     supabase_url = str(cfg.get("url") or "").strip()
     anon_key = str(cfg.get("anonKey") or "").strip()
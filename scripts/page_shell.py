@@ -0,0 +1,163 @@
+"""Page shell fragments shared by the generator scripts.
+
+Templates are parsed once into literal chunks and ``{{ slot|filter }}`` slots, so a
+render only escapes and joins the per-page values. ``bind()`` folds values that are
+constant for a whole build (a generator marker, a root path) into the literals.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+from functools import partial
+from operator import itemgetter
+from typing import Callable
+
+
+SLOT = re.compile(r"\{\{\s*(\w+)(?:\s*\|\s*(\w+))?\s*\}\}")
+FILTERS: dict[str, Callable[[str], str]] = {
+    "raw": str,
+    "attr": partial(html.escape, quote=True),
+    "text": partial(html.escape, quote=False),
+}
+
+
+class PageTemplate:
+    """A template split into literals and slots; a render filters each distinct slot once.
+
+    ``render`` takes every slot as a keyword argument.
+    """
+
+    __slots__ = ("literals", "slots", "filters", "parts", "pick")
+
+    def __init__(self, source: str) -> None:
+        literals: list[str] = []
+        slots: list[tuple[str, str]] = []
+        position = 0
+        for match in SLOT.finditer(source):
+            name, filter_name = match.group(1), match.group(2) or "raw"
+            if filter_name not in FILTERS:
+                raise ValueError(f"Unknown template filter {filter_name!r} for slot {name!r}")
+            literals.append(source[position : match.start()])
+            slots.append((name, filter_name))
+            position = match.end()
+        literals.append(source[position:])
+        self._prepare(literals, slots)
+
+    def _prepare(self, literals: list[str], slots: list[tuple[str, str]]) -> None:
+        self.literals = literals
+        self.slots = slots
+        # Each (name, filter) pair is filtered once per render, however often it appears.
+        distinct = list(dict.fromkeys(slots))
+        self.filters = [(name, FILTERS[filter_name]) for name, filter_name in distinct]
+        # The literals at the even positions; a render fills the odd ones with slot values.
+        self.parts = [""] * (2 * len(literals) - 1)
+        self.parts[0::2] = literals
+        indexes = [distinct.index(slot) for slot in slots]
+        self.pick = itemgetter(*indexes) if len(indexes) > len(distinct) else None
+
+    def render(self, **values: str) -> str:
+        try:
+            filtered = [apply(values[name]) for name, apply in self.filters]
+        except KeyError as exc:
+            raise TypeError(f"render() missing template slot {exc.args[0]!r}") from None
+        parts = self.parts.copy()
+        parts[1::2] = self.pick(filtered) if self.pick else filtered
+        return "".join(parts)
+
+    def bind(self, **values: str) -> PageTemplate:
+        """Return a template with the given slots rendered into its literals."""
+        literals = [self.literals[0]]
+        slots: list[tuple[str, str]] = []
+        for (name, filter_name), literal in zip(self.slots, self.literals[1:]):
+            if name in values:
+                literals[-1] += FILTERS[filter_name](values[name]) + literal
+            else:
+                slots.append((name, filter_name))
+                literals.append(literal)
+        template = PageTemplate.__new__(PageTemplate)
+        template._prepare(literals, slots)
+        return template
+
+
+DESCRIPTION_META = '<meta name="description" content="{{ description|attr }}">'
+CANONICAL_LINK = '<link rel="canonical" href="{{ canonical|attr }}">'
+
+# Head of a generated page, up to (not including) </head>. ``extra_links`` and
+# ``image_tags`` are pre-rendered markup, each starting with a newline when present;
+# ``stylesheets`` is a rendered STYLESHEET_LINKS or DEFERRED_STYLESHEETS.
+HEAD = PageTemplate(
+    f"""<!DOCTYPE html>
+{{{{ marker }}}}
+<html lang="en">
+<head>
+  <meta charset="UTF-8" />
+  <title>{{{{ title|attr }}}}</title>
+  {DESCRIPTION_META}
+  <meta name="robots" content="index,follow">
+  <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+  {CANONICAL_LINK}{{{{ extra_links }}}}
+  <meta property="og:site_name" content="Juan R. Reynoso">
+  <meta property="og:title" content="{{{{ title|attr }}}}">
+  <meta property="og:description" content="{{{{ description|attr }}}}">
+  <meta property="og:url" content="{{{{ canonical|attr }}}}">
+  <meta property="og:type" content="{{{{ og_type|attr }}}}">
+  <meta name="twitter:card" content="summary_large_image">{{{{ image_tags }}}}
+  <meta http-equiv="Content-Security-Policy" content="default-src 'self'; base-uri 'self'; object-src 'none'; img-src 'self' data: blob: https://xxrllcpoklgavakmzhnb.supabase.co; media-src 'self' data: blob: https://xxrllcpoklgavakmzhnb.supabase.co; script-src 'self'; style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; font-src 'self' https://fonts.gstatic.com data:; connect-src 'self' https://xxrllcpoklgavakmzhnb.supabase.co; form-action 'self'">
+  <meta name="referrer" content="strict-origin-when-cross-origin">
+{{{{ stylesheets }}}}
+"""
+)
+
+FONTS_STYLESHEET = "https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap"
+STYLESHEET_LINKS = PageTemplate(
+    f"""{{{{ indent }}}}<link href="{FONTS_STYLESHEET}" rel="stylesheet" />
+{{{{ indent }}}}<link rel="stylesheet" href="{{{{ href|attr }}}}" />"""
+)
+# Critical CSS inlined, with the full stylesheets fetched as media="print" (so they do
+# not block rendering) until site-shell.js switches them on.
+DEFERRED_STYLESHEETS = PageTemplate(
+    f"""{{{{ indent }}}}<style data-critical-css>{{{{ css }}}}</style>
+{{{{ indent }}}}<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+{{{{ indent }}}}<link href="{FONTS_STYLESHEET}" rel="stylesheet" media="print" data-deferred-style />
+{{{{ indent }}}}<link rel="stylesheet" href="{{{{ href|attr }}}}" media="print" data-deferred-style />
+{{{{ indent }}}}<noscript><link href="{FONTS_STYLESHEET}" rel="stylesheet" /><link rel="stylesheet" href="{{{{ href|attr }}}}" /></noscript>"""
+)
+
+HEAD_LINK = PageTemplate('\n  <link rel="{{ rel|attr }}" href="{{ href|attr }}">')
+ALTERNATE_LINK = PageTemplate(
+    '\n  <link rel="alternate" type="{{ type|attr }}" title="{{ title|attr }}" href="{{ href|attr }}">'
+)
+IMAGE_META = PageTemplate(
+    '\n  <meta property="og:image" content="{{ image|attr }}">'
+    '\n  <meta name="twitter:image" content="{{ image|attr }}">'
+)
+
+FOOTER = PageTemplate(
+    """
+  <footer id="site-footer" data-root-path="{{ root_path|attr }}">
+    <div class="shell">
+      <div class="footer-row">
+        <div style="display: flex; align-items: center; gap: 8px;">
+          <span>© <span data-footer-year="1">2026</span> Juan R. Reynoso. All rights reserved.</span>
+        </div>
+        <div class="footer-links">
+          <a href="#top">Back to top</a>
+        </div>
+      </div>
+    </div>
+  </footer>
+"""
+)
+
+# Shared scripts at the end of a generated page; each ``*_src`` is a fingerprinted URL.
+PAGE_SCRIPTS = PageTemplate(
+    """  <script src="{{ admin_bootstrap_src|attr }}"></script>
+  <script src="{{ header_src|attr }}"></script>
+  <script src="{{ site_shell_src|attr }}"></script>
+  <script type="application/ld+json">{{ json_ld }}</script>
+"""
+)
+
+META_DESCRIPTION_TAG = PageTemplate(DESCRIPTION_META)
+CANONICAL_LINK_TAG = PageTemplate(CANONICAL_LINK)
@@ -3,24 +3,85 @@
 
 from __future__ import annotations
 
+import argparse
+import bisect
+import email.utils
+import gzip
+import hashlib
+import heapq
 import html
+import io
 import json
+import math
+import os
 import re
 import subprocess
-from dataclasses import dataclass
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
 from datetime import datetime, timezone
+from functools import cache
 from pathlib import Path
-from urllib.request import Request, urlopen
+from typing import Iterator, TextIO
+
+import page_shell
+from build_output import OutputRecord, OutputWriter, brotli, write_if_changed
+from build_profile import add_profile_argument, profile_run, span
+from content_store import EmptyStoreError, TableState, read_table
+from critical_css import critical_css, render_stylesheets
+from file_watcher import watch
+from fingerprint_assets import ASSET_MANIFEST_PATH, asset_url, fingerprint_assets
+from image_variants import VARIANTS_ENABLED, ResponsiveImage, build_responsive_images, local_image_digests
+from page_shell import ALTERNATE_LINK, FOOTER, HEAD, HEAD_LINK, IMAGE_META, PAGE_SCRIPTS, PageTemplate
+from search_index import SEARCH_INDEX_VERSION, SEARCH_MANIFEST_PATH, SearchDocument, markdown_text, update_search_index
 
 
 ROOT = Path(__file__).resolve().parents[1]
 BLOG_INDEX_PATH = ROOT / "pages" / "blog.html"
 BLOG_DETAIL_DIR = ROOT / "pages" / "blog"
-SUPABASE_CONFIG_PATH = ROOT / "js" / "supabase-config.js"
+BLOG_INDEX_PAGE_DIR = BLOG_DETAIL_DIR / "page"
+BLOG_INDEX_PAGE_SIZE = 12
 LOCAL_BLOG_POSTS_PATH = ROOT / "js" / "blog-local-posts.js"
+BUILD_CACHE_DIR = ROOT / ".build-cache"
+BUILD_MANIFEST_PATH = BUILD_CACHE_DIR / "prerender-blog.json"
+BUILD_MANIFEST_VERSION = 3
+RELATED_INDEX_PATH = BUILD_CACHE_DIR / "related-posts.json"
+RELATED_INDEX_VERSION = 1
+RELATED_POST_COUNT = 3
+RELATED_TERMS_PER_POST = 24
+RELATED_MAX_DOC_SHARE = 0.5
+RELATED_FIELD_WEIGHTS = (("title", 3), ("excerpt", 2), ("body", 1))
+RELATED_TERM = re.compile(r"[a-z0-9]+")
+RELATED_STOPWORDS = frozenset(
+    """
+    about after again also always among and another any are because been before being between both
+    but can could did does doing down during each even every few for from further had has have having
+    her here hers him his how into its itself just more most much must not now off once only other
+    our ours out over own same she should some such than that the their them then there these they
+    this those through too under until upon very was were what when where which while who whom why
+    will with would you your yours
+    """.split()
+)
 SITE_ORIGIN = "https://www.jreynoso.net"
 GENERATED_MARKER = "<!-- Generated by scripts/prerender_blog.py. Do not edit directly. -->"
 VALID_SLUG = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
+SITEMAP_URL_LIMIT = 50_000
+SITEMAP_XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+SITEMAP_FILE = re.compile(r"^sitemap(?:-index|-\d+)?\.xml(?:\.gz)?$")
+BLOG_SUMMARY = "Practical notes on operations, analytics, and building systems that drive execution."
+FEED_POST_COUNT = 20
+ATOM_FEED_PATH = "pages/blog/atom.xml"
+RSS_FEED_PATH = "pages/blog/rss.xml"
+JSON_FEED_PATH = "pages/blog/feed.json"
+ROOT_RELATIVE_URL = re.compile(r'(\s(?:src|href)=")/(?!/)')
+VERBATIM_HTML = re.compile(
+    r"<(pre|textarea|script|style)\b.*?</\1\s*>|<!--.*?-->|<[^>]*>", re.DOTALL | re.IGNORECASE
+)
+LINE_BREAK_RUN = re.compile(r"[ \t]*\n\s*")
+IMAGE_REFERENCE = re.compile(r"^!\[.*?\]\((.*)\)$", re.MULTILINE)
+CARD_IMAGE_SIZES = "(max-width: 640px) 100vw, 400px"
+ARTICLE_IMAGE_SIZES = "(max-width: 820px) 100vw, 780px"
 
 
 @dataclass(frozen=True)
@@ -36,13 +97,94 @@ class BlogPost:
     created_at: str
 
 
-def read_public_config() -> tuple[str, str]:
-    source = SUPABASE_CONFIG_PATH.read_text(encoding="utf-8")
-    url_match = re.search(r"\burl:\s*['\"]([^'\"]+)['\"]", source)
-    key_match = re.search(r"\banonKey:\s*['\"]([^'\"]+)['\"]", source)
-    if not url_match or not key_match:
-        raise RuntimeError("Supabase public URL or anon key was not found in js/supabase-config.js")
-    return url_match.group(1).rstrip("/"), key_match.group(1)
+@dataclass
+class BuildManifest:
+    """What the previous build produced: per-output input hashes and sitemap lastmod state."""
+
+    sources: str = ""
+    outputs: dict[str, str] = field(default_factory=dict)
+    lastmod: dict[str, list[str]] = field(default_factory=dict)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate crawlable blog pages, the blog index, sitemap.xml and robots.txt."
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Ignore the build manifest and re-render every output.",
+    )
+    parser.add_argument(
+        "--full-fetch",
+        action="store_true",
+        help="Ignore the blog_posts rows in the local content store and download every published row.",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Build from the blog_posts rows in the local content store without querying Supabase.",
+    )
+    parser.add_argument(
+        "--gzip-sitemaps",
+        action="store_true",
+        help="Gzip the numbered child sitemaps written once the URL count exceeds the protocol limit.",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=BLOG_INDEX_PAGE_SIZE,
+        help=f"Posts per blog index page (default: {BLOG_INDEX_PAGE_SIZE}).",
+    )
+    parser.add_argument(
+        "--changes-file",
+        type=Path,
+        help="Where to write the JSON list of changed and removed outputs "
+        "(default: .build-cache/changes-prerender-blog.json).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Render blog posts in N worker processes; 0 uses every CPU (default: 1).",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="Strip indentation and blank lines from generated HTML (pre, script and style bodies are kept).",
+    )
+    parser.add_argument(
+        "--critical-css",
+        action="store_true",
+        help="Inline the styles.css rules each page template uses and load the full stylesheets without blocking.",
+    )
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="Write .gz and, with the brotli package installed, .br siblings next to text outputs.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After building, keep running and rebuild when js/blog-local-posts.js or a sitemap page changes.",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="With --watch, poll file stats instead of using inotify.",
+    )
+    add_profile_argument(parser, "prerender-blog")
+    args = parser.parse_args(argv)
+    if args.watch and args.profile:
+        parser.error("--watch cannot be combined with --profile")
+    if args.offline and args.full_fetch:
+        parser.error("--offline cannot be combined with --full-fetch")
+    if args.page_size < 1:
+        parser.error("--page-size must be at least 1")
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 or more")
+    args.jobs = args.jobs or os.cpu_count() or 1
+    return args
 
 
 def parse_blog_posts(payload: object, source: str) -> list[BlogPost]:
@@ -74,31 +216,187 @@ def parse_blog_posts(payload: object, source: str) -> list[BlogPost]:
     return posts
 
 
-def fetch_public_blog_posts() -> list[BlogPost]:
-    supabase_url, anon_key = read_public_config()
-    endpoint = (
-        f"{supabase_url}/rest/v1/blog_posts"
-        "?select=id,slug,title,excerpt,body,cover_image_url,is_published,published_at,updated_at,created_at"
-        "&is_published=eq.true"
-        "&order=published_at.desc,id.desc"
-    )
-    request = Request(
-        endpoint,
-        headers={
-            "apikey": anon_key,
-            "Authorization": f"Bearer {anon_key}",
-            "Accept": "application/json",
-        },
-    )
-    with urlopen(request, timeout=20) as response:
-        payload = json.load(response)
-    return parse_blog_posts(payload, "Supabase")
-
-
-def load_local_blog_posts() -> list[BlogPost]:
-    if not LOCAL_BLOG_POSTS_PATH.exists():
+class JsLiteralError(ValueError):
+    """Raised when a script uses something other than plain literal data."""
+
+
+class JsLiteralParser:
+    """Read a JavaScript object/array literal into Python values without evaluating code.
+
+    Supports what hand-written data files use: objects with bare or quoted keys,
+    arrays, single/double-quoted and backtick strings without substitutions,
+    ``+`` concatenation of strings, numbers, booleans, null/undefined, comments
+    and trailing commas.
+    """
+
+    ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "0": "\0"}
+    NUMBER = re.compile(r"-?(?:0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)")
+    IDENTIFIER = re.compile(r"[A-Za-z_$][\w$]*")
+    KEYWORDS = {"true": True, "false": False, "null": None, "undefined": None}
+    STRING_CHUNKS = {
+        "'": re.compile(r"[^'\\\n]*"),
+        '"': re.compile(r'[^"\\\n]*'),
+        "`": re.compile(r"[^`\\\n$]*"),
+    }
+
+    def __init__(self, source: str, position: int = 0) -> None:
+        self.source = source
+        self.position = position
+
+    def error(self, message: str) -> JsLiteralError:
+        line = self.source.count("\n", 0, self.position) + 1
+        return JsLiteralError(f"{message} at line {line}")
+
+    def skip_space(self) -> None:
+        source = self.source
+        while self.position < len(source):
+            char = source[self.position]
+            if char.isspace():
+                self.position += 1
+            elif source.startswith("//", self.position):
+                end = source.find("\n", self.position)
+                self.position = len(source) if end == -1 else end + 1
+            elif source.startswith("/*", self.position):
+                end = source.find("*/", self.position + 2)
+                if end == -1:
+                    raise self.error("Unterminated comment")
+                self.position = end + 2
+            else:
+                return
+
+    def peek(self) -> str:
+        self.skip_space()
+        return self.source[self.position : self.position + 1]
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self.error(f"Expected {char!r}")
+        self.position += 1
+
+    def parse_value(self) -> object:
+        char = self.peek()
+        if char == "{":
+            return self.parse_object()
+        if char == "[":
+            return self.parse_array()
+        if char in {"'", '"', "`"}:
+            value = self.parse_string()
+            while self.peek() == "+":
+                self.position += 1
+                if self.peek() not in {"'", '"', "`"}:
+                    raise self.error("Only string literals can be concatenated")
+                value += self.parse_string()
+            return value
+        number = self.NUMBER.match(self.source, self.position)
+        if number:
+            self.position = number.end()
+            text = number.group(0)
+            if text.lstrip("-")[:2].lower() == "0x":
+                return int(text, 16)
+            value = float(text)
+            return int(value) if value.is_integer() else value
+        word = self.IDENTIFIER.match(self.source, self.position)
+        if word and word.group(0) in self.KEYWORDS:
+            self.position = word.end()
+            return self.KEYWORDS[word.group(0)]
+        raise self.error("Unsupported expression")
+
+    def parse_object(self) -> dict:
+        self.expect("{")
+        result: dict = {}
+        while self.peek() != "}":
+            char = self.peek()
+            if char in {"'", '"'}:
+                key = self.parse_string()
+            else:
+                word = self.IDENTIFIER.match(self.source, self.position) or self.NUMBER.match(
+                    self.source, self.position
+                )
+                if not word:
+                    raise self.error("Unsupported object key")
+                key = word.group(0)
+                self.position = word.end()
+            self.expect(":")
+            result[key] = self.parse_value()
+            if self.peek() != ",":
+                break
+            self.position += 1
+        self.expect("}")
+        return result
+
+    def parse_array(self) -> list:
+        self.expect("[")
+        result: list = []
+        while self.peek() != "]":
+            result.append(self.parse_value())
+            if self.peek() != ",":
+                break
+            self.position += 1
+        self.expect("]")
+        return result
+
+    def parse_string(self) -> str:
+        source = self.source
+        quote_char = source[self.position]
+        self.position += 1
+        parts: list[str] = []
+        while True:
+            end = self.STRING_CHUNKS[quote_char].match(source, self.position).end()
+            parts.append(source[self.position : end])
+            if end >= len(source):
+                raise self.error("Unterminated string")
+            char = source[end]
+            if char == "$":
+                if source.startswith("${", end):
+                    raise self.error("Template substitutions are not literal data")
+                parts.append(char)
+                self.position = end + 1
+                continue
+            if char == quote_char:
+                self.position = end + 1
+                return "".join(parts)
+            if char == "\n":
+                if quote_char != "`":
+                    raise self.error("Unterminated string")
+                parts.append(char)
+                self.position = end + 1
+                continue
+            self.position = end + 2
+            escaped = source[end + 1 : end + 2]
+            if escaped in self.ESCAPES:
+                parts.append(self.ESCAPES[escaped])
+            elif escaped == "x":
+                parts.append(chr(int(source[self.position : self.position + 2], 16)))
+                self.position += 2
+            elif escaped == "u" and source.startswith("{", self.position):
+                close = source.index("}", self.position)
+                parts.append(chr(int(source[self.position + 1 : close], 16)))
+                self.position = close + 1
+            elif escaped == "u":
+                parts.append(chr(int(source[self.position : self.position + 4], 16)))
+                self.position += 4
+            elif escaped in {"\n", "\r"}:
+                if escaped == "\r" and source.startswith("\n", self.position):
+                    self.position += 1
+            else:
+                parts.append(escaped)
+
+
+LOCAL_POSTS_ASSIGNMENT = re.compile(r"\bwindow\.__LOCAL_BLOG_POSTS__\s*=")
+LOCAL_POSTS_CACHE: dict[tuple[Path, int, int], list] = {}
+
+
+def read_local_posts_literal(source: str) -> list:
+    match = LOCAL_POSTS_ASSIGNMENT.search(source)
+    if not match:
         return []
+    value = JsLiteralParser(source, match.end()).parse_value()
+    if not isinstance(value, list):
+        raise JsLiteralError("window.__LOCAL_BLOG_POSTS__ is not an array literal")
+    return value
+
 
+def read_local_posts_with_node(path: Path) -> list:
     loader = r"""
 const fs = require('fs');
 const vm = require('vm');
@@ -109,21 +407,41 @@ process.stdout.write(JSON.stringify(sandbox.window.__LOCAL_BLOG_POSTS__ || []));
 """
     try:
         result = subprocess.run(
-            ["node", "-e", loader, str(LOCAL_BLOG_POSTS_PATH)],
+            ["node", "-e", loader, str(path)],
             check=True,
             capture_output=True,
             text=True,
             timeout=10,
         )
     except (FileNotFoundError, subprocess.SubprocessError) as exc:
-        raise RuntimeError("Node.js is required to read js/blog-local-posts.js") from exc
+        raise RuntimeError("Node.js is required to read non-literal data in js/blog-local-posts.js") from exc
+    return json.loads(result.stdout)
 
-    return parse_blog_posts(json.loads(result.stdout), "js/blog-local-posts.js")
 
+def load_local_blog_posts() -> list[BlogPost]:
+    if not LOCAL_BLOG_POSTS_PATH.exists():
+        return []
 
-def load_published_blog_posts() -> list[BlogPost]:
+    stat = LOCAL_BLOG_POSTS_PATH.stat()
+    cache_key = (LOCAL_BLOG_POSTS_PATH, stat.st_mtime_ns, stat.st_size)
+    payload = LOCAL_POSTS_CACHE.get(cache_key)
+    if payload is None:
+        try:
+            payload = read_local_posts_literal(LOCAL_BLOG_POSTS_PATH.read_text(encoding="utf-8"))
+        except ValueError:
+            # Computed values need a real JavaScript engine; plain data never gets here.
+            payload = read_local_posts_with_node(LOCAL_BLOG_POSTS_PATH)
+        LOCAL_POSTS_CACHE.clear()
+        LOCAL_POSTS_CACHE[cache_key] = payload
+
+    return parse_blog_posts(payload, "js/blog-local-posts.js")
+
+
+def load_published_blog_posts(remote_posts: list[BlogPost] | None = None) -> list[BlogPost]:
     by_slug = {post.slug: post for post in load_local_blog_posts()}
-    for post in fetch_public_blog_posts():
+    if remote_posts is None:
+        remote_posts = parse_blog_posts(read_table("blog_posts")[1], "Supabase")
+    for post in remote_posts:
         by_slug[post.slug] = post
 
     def sort_key(post: BlogPost) -> tuple[datetime, int]:
@@ -160,51 +478,236 @@ def absolute_asset_url(raw: str) -> str:
     return f"{SITE_ORIGIN}{url}"
 
 
+LIST_MARKERS = ("- ", "* ", "+ ")
+
+
+def escape_text(text: str) -> str:
+    return (
+        text.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace("\t", "&nbsp;&nbsp;&nbsp;&nbsp;")
+    )
+
+
+def match_paired_delimiters(text: str, delimiter: str) -> list[tuple[int, int]]:
+    """Find ``++x++`` / ``**x**`` spans whose content is non-empty and free of the marker and newlines."""
+    marker = delimiter[0]
+    spans: list[tuple[int, int]] = []
+    newline = -1
+    start = text.find(delimiter)
+    while start != -1:
+        content = start + 2
+        if newline < content:
+            newline = text.find("\n", content)
+            if newline == -1:
+                newline = len(text)
+        close = text.find(marker, content)
+        if content < close < newline and text.startswith(delimiter, close):
+            spans.append((start, close))
+            start = text.find(delimiter, close + 2)
+        else:
+            start = text.find(delimiter, start + 1)
+    return spans
+
+
+def match_emphasis(text: str, strong_stars: set[int]) -> list[tuple[int, int]]:
+    """Pair the single ``*`` markers left over once ``**`` spans have claimed theirs."""
+    stars = []
+    position = text.find("*")
+    while position != -1:
+        if position not in strong_stars:
+            stars.append(position)
+        position = text.find("*", position + 1)
+
+    def is_star(index: int) -> bool:
+        return 0 <= index < len(text) and text[index] == "*" and index not in strong_stars
+
+    spans: list[tuple[int, int]] = []
+    newline = -1
+    index = 0
+    while index + 1 < len(stars):
+        opener, closer = stars[index], stars[index + 1]
+        if newline < opener:
+            newline = text.find("\n", opener)
+            if newline == -1:
+                newline = len(text)
+        if (
+            not is_star(opener - 1)
+            and closer > opener + 1
+            and closer < newline
+            and not is_star(closer + 1)
+        ):
+            spans.append((opener, closer))
+            index += 2
+        else:
+            index += 1
+    return spans
+
+
 def escape_inline(text: str) -> str:
-    safe = html.escape(str(text or ""), quote=False)
-    safe = safe.replace("\t", "&nbsp;&nbsp;&nbsp;&nbsp;")
-    safe = re.sub(r"\+\+([^+\n][^+\n]*?)\+\+", r"<u>\1</u>", safe)
-    safe = re.sub(r"\*\*([^*\n][^*\n]*?)\*\*", r"<strong>\1</strong>", safe)
-    safe = re.sub(r"(^|[^*])\*([^*\n][^*\n]*?)\*(?!\*)", r"\1<em>\2</em>", safe)
-    return safe
+    """Escape text and apply ``++underline++``, ``**strong**`` and ``*em*`` in one scan.
+
+    Escaping never introduces ``*``, ``+`` or newlines, so delimiters are matched
+    directly on the escaped text with the same precedence as the editor preview
+    (underline, then strong, then emphasis) and the output is assembled in a
+    single left-to-right pass over the match positions.
+    """
+    text = escape_text(str(text or ""))
+    events: dict[int, tuple[str, int]] = {}
+    if "++" in text:
+        for start, close in match_paired_delimiters(text, "++"):
+            events[start] = ("<u>", 2)
+            events[close] = ("</u>", 2)
+    if "*" in text:
+        strong_stars: set[int] = set()
+        if "**" in text:
+            for start, close in match_paired_delimiters(text, "**"):
+                events[start] = ("<strong>", 2)
+                events[close] = ("</strong>", 2)
+                strong_stars.update((start, start + 1, close, close + 1))
+        for start, close in match_emphasis(text, strong_stars):
+            events[start] = ("<em>", 1)
+            events[close] = ("</em>", 1)
+
+    if not events:
+        return text
+    parts: list[str] = []
+    position = 0
+    for at in sorted(events):
+        tag, width = events[at]
+        parts.append(text[position:at])
+        parts.append(tag)
+        position = at + width
+    parts.append(text[position:])
+    return "".join(parts)
+
+
+def list_item(line: str) -> tuple[str, str] | None:
+    stripped = line.lstrip()
+    if stripped[:2] in LIST_MARKERS:
+        return "ul", stripped[2:].strip()
+    digits = len(stripped) - len(stripped.lstrip("0123456789"))
+    if 0 < digits <= 9 and stripped[digits : digits + 2] in {". ", ") "}:
+        return "ol", stripped[digits + 2 :].strip()
+    return None
+
+
+def render_img(
+    url: str,
+    alt: str,
+    loading: str,
+    sizes: str,
+    images: dict[str, ResponsiveImage] | None = None,
+) -> str:
+    """An ``<img>`` for ``url`` with an already escaped ``alt``.
+
+    Local images also get their intrinsic size, and a WebP ``<picture>`` source plus
+    a resized fallback ``srcset`` once variants exist for them.
+    """
+    image = images.get(url) if images else None
+    if image is None:
+        return f'<img src="{html.escape(url, quote=True)}" alt="{alt}" loading="{loading}">'
+    size_attrs = f'width="{image.width}" height="{image.height}"'
+    if not image.webp_srcset:
+        return f'<img src="{html.escape(url, quote=True)}" alt="{alt}" {size_attrs} loading="{loading}">'
+    return (
+        f'<picture><source type="image/webp" srcset="{html.escape(image.webp_srcset, quote=True)}" '
+        f'sizes="{sizes}"><img src="{html.escape(image.src, quote=True)}" '
+        f'srcset="{html.escape(image.fallback_srcset, quote=True)}" sizes="{sizes}" '
+        f'alt="{alt}" {size_attrs} loading="{loading}"></picture>'
+    )
+
+
+def render_image_block(block: str, images: dict[str, ResponsiveImage] | None = None) -> str | None:
+    if "\n" in block or not block.startswith("![") or not block.endswith(")"):
+        return None
+    separator = block.find("](", 2)
+    if separator == -1:
+        return None
+    src = normalize_asset_url(block[separator + 2 : -1])
+    if not src:
+        return ""
+    alt = html.escape(block[2:separator].strip() or "Article illustration", quote=True)
+    return f"""<figure class="blog-inline-image">
+            {render_img(src, alt, "lazy", ARTICLE_IMAGE_SIZES, images)}
+          </figure>"""
+
+
+def render_block(block: str, images: dict[str, ResponsiveImage] | None = None) -> str:
+    image_html = render_image_block(block, images)
+    if image_html is not None:
+        return image_html
 
+    if block.startswith("## "):
+        return f"<h2>{escape_inline(block[3:].strip() or 'Section')}</h2>"
 
-def render_body(raw_body: str) -> str:
+    if block.startswith("### "):
+        return f"<h3>{escape_inline(block[4:].strip() or 'Subsection')}</h3>"
+
+    lines = block.split("\n")
+    items = [list_item(line) for line in lines]
+    if all(items) and len({kind for kind, _text in items}) == 1:
+        tag = items[0][0]
+        rows = "".join(f"<li>{escape_inline(text)}</li>" for _kind, text in items)
+        return f"<{tag}>{rows}</{tag}>"
+
+    if all(line.lstrip().startswith(">") for line in lines):
+        quoted = (line.lstrip()[1:].removeprefix(" ") for line in lines)
+        return f"<blockquote><p>{'<br>'.join(escape_inline(line) for line in quoted)}</p></blockquote>"
+
+    return f"<p>{'<br>'.join(escape_inline(line) for line in lines)}</p>"
+
+
+def render_code_block(lines: list[str], info: str) -> str:
+    language = re.sub(r"[^\w+-]", "", info.split(" ", 1)[0])
+    class_attr = f' class="language-{language}"' if language else ""
+    code = html.escape("\n".join(lines), quote=False)
+    return f"<pre><code{class_attr}>{code}</code></pre>"
+
+
+def render_body(raw_body: str, images: dict[str, ResponsiveImage] | None = None) -> str:
+    """Render the post body markup in a single scan over its lines.
+
+    Blocks are separated by blank lines. A block is an image, a ``##``/``###``
+    heading, a list, a ``>`` quote or a paragraph; fenced code blocks may
+    contain blank lines and are emitted verbatim. A line opens a fence only
+    when its info string has no backticks and a bare closing fence follows, so
+    inline code at the start of a paragraph stays part of that paragraph.
+    """
     raw = str(raw_body or "").replace("\r\n", "\n").replace("\r", "\n").strip()
     if not raw:
         return '<p class="blog-note">No content yet.</p>'
 
-    blocks = [block.strip() for block in re.split(r"\n{2,}", raw) if block.strip()]
     rendered: list[str] = []
-
-    for block in blocks:
-        img_match = re.fullmatch(r"!\[(.*?)\]\((.*?)\)", block)
-        if img_match:
-            alt = html.escape(img_match.group(1).strip() or "Article illustration", quote=True)
-            src = html.escape(normalize_asset_url(img_match.group(2)), quote=True)
-            if not src:
-                continue
-            rendered.append(
-                f"""
-          <figure class="blog-inline-image">
-            <img src="{src}" alt="{alt}" loading="lazy">
-          </figure>
-        """.strip()
-            )
+    block: list[str] = []
+    lines = raw.split("\n")
+    closing_fences = [number for number, line in enumerate(lines) if line.strip() == "```"]
+
+    def flush() -> None:
+        text = "\n".join(block).strip()
+        block.clear()
+        if text:
+            rendered.append(render_block(text, images))
+
+    number = 0
+    while number < len(lines):
+        line = lines[number]
+        number += 1
+        if not line:
+            flush()
             continue
+        fence = line.strip()
+        if not block and fence.startswith("```") and "`" not in fence[3:]:
+            close = bisect.bisect_left(closing_fences, number)
+            if close < len(closing_fences):
+                rendered.append(render_code_block(lines[number : closing_fences[close]], fence[3:].strip()))
+                number = closing_fences[close] + 1
+                continue
+        block.append(line)
+    flush()
 
-        if block.startswith("## "):
-            rendered.append(f"<h2>{escape_inline(block[3:].strip() or 'Section')}</h2>")
-            continue
-
-        if block.startswith("### "):
-            rendered.append(f"<h3>{escape_inline(block[4:].strip() or 'Subsection')}</h3>")
-            continue
-
-        paragraph = "<br>".join(escape_inline(part) for part in block.split("\n"))
-        rendered.append(f"<p>{paragraph}</p>")
-
-    return "\n".join(rendered)
+    return "\n".join(item for item in rendered if item)
 
 
 def format_date_label(raw: str) -> str:
@@ -217,6 +720,16 @@ def format_date_label(raw: str) -> str:
     return dt.strftime("%B %-d, %Y")
 
 
+def parse_timestamp(raw: str) -> datetime | None:
+    if not raw:
+        return None
+    try:
+        value = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
 def iso_to_date(raw: str) -> str:
     if not raw:
         return ""
@@ -241,59 +754,127 @@ def article_url(post: BlogPost) -> str:
     return f"{SITE_ORIGIN}/pages/blog/{post.slug}.html"
 
 
-def index_url() -> str:
-    return f"{SITE_ORIGIN}/pages/blog.html"
+def index_path(page: int = 1) -> str:
+    """Repository-relative path of a blog index page; page 1 stays at pages/blog.html."""
+    return "pages/blog.html" if page == 1 else f"pages/blog/page/{page}.html"
 
 
-def render_head(title: str, description: str, canonical: str, og_type: str, image: str = "") -> str:
-    image_tags = ""
-    if image:
-        image = absolute_asset_url(image)
-        image_tags = (
-            f'\n  <meta property="og:image" content="{html.escape(image, quote=True)}">'
-            f'\n  <meta name="twitter:image" content="{html.escape(image, quote=True)}">'
-        )
-    return f"""<!DOCTYPE html>
-{GENERATED_MARKER}
-<html lang="en">
-<head>
-  <meta charset="UTF-8" />
-  <title>{html.escape(title, quote=True)}</title>
-  <meta name="description" content="{html.escape(description, quote=True)}">
-  <meta name="robots" content="index,follow">
-  <meta name="viewport" content="width=device-width, initial-scale=1.0" />
-  <link rel="canonical" href="{html.escape(canonical, quote=True)}">
-  <meta property="og:site_name" content="Juan R. Reynoso">
-  <meta property="og:title" content="{html.escape(title, quote=True)}">
-  <meta property="og:description" content="{html.escape(description, quote=True)}">
-  <meta property="og:url" content="{html.escape(canonical, quote=True)}">
-  <meta property="og:type" content="{html.escape(og_type, quote=True)}">
-  <meta name="twitter:card" content="summary_large_image">{image_tags}
-  <meta http-equiv="Content-Security-Policy" content="default-src 'self'; base-uri 'self'; object-src 'none'; img-src 'self' data: blob: https://xxrllcpoklgavakmzhnb.supabase.co; media-src 'self' data: blob: https://xxrllcpoklgavakmzhnb.supabase.co; script-src 'self'; style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; font-src 'self' https://fonts.gstatic.com data:; connect-src 'self' https://xxrllcpoklgavakmzhnb.supabase.co; form-action 'self'">
-  <meta name="referrer" content="strict-origin-when-cross-origin">
-  <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap" rel="stylesheet" />
-  <link rel="stylesheet" href="/assets/css/styles.css?v=53" />
-"""
+def index_url(page: int = 1) -> str:
+    return f"{SITE_ORIGIN}/{index_path(page)}"
+
+
+def paginate_posts(posts: list[BlogPost], page_size: int) -> list[list[BlogPost]]:
+    """Split posts into index pages, always returning at least one (possibly empty) page."""
+    return [posts[start : start + page_size] for start in range(0, len(posts), page_size)] or [[]]
+
+
+FEED_LINKS = "".join(
+    ALTERNATE_LINK.render(type=feed_type, title="Juan R. Reynoso | Blog", href=f"/{path}")
+    for feed_type, path in (
+        ("application/atom+xml", ATOM_FEED_PATH),
+        ("application/rss+xml", RSS_FEED_PATH),
+        ("application/feed+json", JSON_FEED_PATH),
+    )
+)
+
+
+# Inlined critical CSS per page template ("blog-index", "blog-post"); empty means the
+# stylesheets are linked as usual. Set through configure_critical_css().
+CRITICAL_CSS: dict[str, str] = {}
+
+
+def configure_critical_css(styles: dict[str, str]) -> None:
+    """Use ``styles`` for page heads in this process; also the worker pool initializer."""
+    CRITICAL_CSS.clear()
+    CRITICAL_CSS.update(styles)
+    blog_head.cache_clear()
+
+
+@cache
+def blog_head(template: str) -> PageTemplate:
+    """The page head for ``template`` with this build's marker and stylesheets folded in.
 
+    Built on first use, after ``main()`` has refreshed the asset manifest.
+    """
+    stylesheets = render_stylesheets(asset_url("assets/css/styles.css"), CRITICAL_CSS.get(template))
+    return HEAD.bind(marker=GENERATED_MARKER, stylesheets=stylesheets)
 
+
+@cache
+def blog_scripts() -> PageTemplate:
+    return PAGE_SCRIPTS.bind(
+        admin_bootstrap_src=asset_url("js/admin-bootstrap.js"),
+        header_src=asset_url("js/header.js"),
+        site_shell_src=asset_url("js/site-shell.js"),
+    )
+
+
+def render_head(
+    title: str,
+    description: str,
+    canonical: str,
+    og_type: str,
+    image: str = "",
+    links: list[tuple[str, str]] | None = None,
+    template: str = "blog-post",
+) -> str:
+    image_tags = IMAGE_META.render(image=absolute_asset_url(image)) if image else ""
+    return blog_head(template).render(
+        title=title,
+        description=description,
+        canonical=canonical,
+        og_type=og_type,
+        extra_links=FEED_LINKS + "".join(HEAD_LINK.render(rel=rel, href=href) for rel, href in links or []),
+        image_tags=image_tags,
+    )
+
+
+@cache
 def render_site_footer(root_path: str) -> str:
+    return FOOTER.render(root_path=root_path)
+
+
+def render_pagination(page: int, page_count: int) -> str:
+    if page_count <= 1:
+        return ""
+    newer = (
+        f'<a class="blog-pagination-link" rel="prev" href="/{index_path(page - 1)}">← Newer posts</a>'
+        if page > 1
+        else ""
+    )
+    older = (
+        f'<a class="blog-pagination-link" rel="next" href="/{index_path(page + 1)}">Older posts →</a>'
+        if page < page_count
+        else ""
+    )
     return f"""
-  <footer id="site-footer" data-root-path="{html.escape(root_path, quote=True)}">
-    <div class="shell">
-      <div class="footer-row">
-        <div style="display: flex; align-items: center; gap: 8px;">
-          <span>© <span data-footer-year="1">2026</span> Juan R. Reynoso. All rights reserved.</span>
-        </div>
-        <div class="footer-links">
-          <a href="#top">Back to top</a>
-        </div>
-      </div>
-    </div>
-  </footer>
+      <nav class="blog-pagination" aria-label="Blog pages">
+        {newer}
+        <span class="blog-pagination-status">Page {page} of {page_count}</span>
+        {older}
+      </nav>
 """
 
 
-def render_blog_index(posts: list[BlogPost]) -> str:
+# Searches the index in data/search (posts and projects) in place of the post listing.
+SEARCH_FORM = """
+      <form class="blog-search" role="search" action="/pages/blog.html" data-site-search="blog-search-results"
+        data-site-search-replaces="#blog-posts-grid, .blog-pagination">
+        <input class="blog-search-input" type="search" name="q" autocomplete="off"
+          placeholder="Search posts and projects" aria-label="Search posts and projects">
+      </form>
+      <div id="blog-search-results" class="blog-search-results" aria-live="polite" hidden></div>
+"""
+
+
+def render_blog_index(
+    posts: list[BlogPost],
+    page: int = 1,
+    page_count: int = 1,
+    offset: int = 0,
+    images: dict[str, ResponsiveImage] | None = None,
+) -> str:
+    """Render one blog index page; ``posts`` is that page's slice and ``offset`` its start."""
     cards = []
     for post in posts:
         title = html.escape(post.title, quote=True)
@@ -304,7 +885,7 @@ def render_blog_index(posts: list[BlogPost]) -> str:
         if image:
             cover_html = f"""
             <a class="blog-cover" href="/pages/blog/{html.escape(post.slug, quote=True)}.html">
-              <img src="{html.escape(image, quote=True)}" alt="{title}" loading="lazy">
+              {render_img(image, title, "lazy", CARD_IMAGE_SIZES, images)}
             </a>
 """
         cards.append(
@@ -321,15 +902,13 @@ def render_blog_index(posts: list[BlogPost]) -> str:
 """
         )
 
-    summary = (
-        "Practical notes on operations, analytics, and building systems that drive execution."
-    )
+    summary = BLOG_SUMMARY
     schema_posts = []
     for post in posts:
         schema_posts.append(
             {
                 "@type": "ListItem",
-                "position": len(schema_posts) + 1,
+                "position": offset + len(schema_posts) + 1,
                 "url": article_url(post),
                 "name": post.title,
             }
@@ -341,7 +920,7 @@ def render_blog_index(posts: list[BlogPost]) -> str:
             "@type": "CollectionPage",
             "name": "Blog",
             "description": summary,
-            "url": index_url(),
+            "url": index_url(page),
             "mainEntity": {
                 "@type": "ItemList",
                 "itemListElement": schema_posts,
@@ -349,14 +928,23 @@ def render_blog_index(posts: list[BlogPost]) -> str:
         },
         ensure_ascii=False,
         indent=2,
-    )
+    ).replace("</", "<\\/")
 
     cards_html = "".join(cards) or '<div class="blog-empty">No posts published yet.</div>'
-
-    return f"""{render_head('Blog | Juan R. Reynoso', summary, index_url(), 'website')}
+    title = "Blog | Juan R. Reynoso" if page == 1 else f"Blog – Page {page} | Juan R. Reynoso"
+    links = []
+    if page > 1:
+        links.append(("prev", index_url(page - 1)))
+    if page < page_count:
+        links.append(("next", index_url(page + 1)))
+    # Page 1 sits in /pages, later pages two levels further down in /pages/blog/page.
+    header_variant = "inner" if page == 1 else "inner-nested-deep"
+    root_path = "../" if page == 1 else "../../../"
+
+    return f"""{render_head(title, summary, index_url(page), 'website', links=links, template='blog-index')}
 </head>
 <body class="blog-page">
-  <header id="site-header" data-variant="inner" data-active="blog"></header>
+  <header id="site-header" data-variant="{header_variant}" data-active="blog"></header>
 
   <main id="top">
     <div class="shell">
@@ -366,43 +954,162 @@ def render_blog_index(posts: list[BlogPost]) -> str:
           {html.escape(summary)}
         </p>
       </div>
-
+{SEARCH_FORM}
       <div id="blog-posts-grid" class="blog-grid">
 {cards_html}
       </div>
-
+{render_pagination(page, page_count)}
       <div style="height: 60px;"></div>
     </div>
   </main>
 
-{render_site_footer('../')}
+{render_site_footer(root_path)}
 
-  <script src="/js/admin-bootstrap.js?v=7"></script>
-  <script src="/js/header.js?v=17"></script>
-  <script src="/js/site-shell.js?v=9"></script>
-  <script type="application/ld+json">{schema_json.replace('</', '<\\/')}</script>
-</body>
+  <script src="{html.escape(asset_url('js/site-search.js'), quote=True)}"></script>
+{blog_scripts().render(json_ld=schema_json)}</body>
 </html>
 """
 
 
-def render_blog_post(post: BlogPost, posts: list[BlogPost]) -> str:
+def post_terms(post: BlogPost) -> dict[str, int]:
+    """Weighted term counts over the title, excerpt and body of a post."""
+    counts: dict[str, int] = {}
+    for name, weight in RELATED_FIELD_WEIGHTS:
+        for term in RELATED_TERM.findall(getattr(post, name).lower()):
+            if len(term) < 3 or term.isdigit() or term in RELATED_STOPWORDS:
+                continue
+            counts[term] = counts.get(term, 0) + weight
+    return counts
+
+
+def score_related(terms: list[dict[str, int]]) -> list[list[int]]:
+    """Top related indexes for each document by TF-IDF cosine similarity.
+
+    Each vector keeps only its strongest terms, and candidates are scored through an
+    inverted index, so a post is only compared with posts that share one of them.
+    Once the archive is past a handful of posts, terms used by more than half of it are
+    dropped: they barely move the score but would make every post a candidate for every
+    other. Ties go to the lower index, which is the newer post.
+    """
+    doc_freq: dict[str, int] = {}
+    for counts in terms:
+        for term in counts:
+            doc_freq[term] = doc_freq.get(term, 0) + 1
+    total = len(terms)
+    max_doc_freq = total * RELATED_MAX_DOC_SHARE if total > 10 else total
+
+    vectors: list[list[tuple[str, float]]] = []
+    postings: dict[str, list[tuple[int, float]]] = {}
+    for index, counts in enumerate(terms):
+        weights = [
+            (term, (1 + math.log(count)) * (math.log((1 + total) / (1 + doc_freq[term])) + 1))
+            for term, count in counts.items()
+            if doc_freq[term] <= max_doc_freq
+        ]
+        weights = heapq.nsmallest(RELATED_TERMS_PER_POST, weights, key=lambda item: (-item[1], item[0]))
+        norm = math.sqrt(sum(weight * weight for _term, weight in weights)) or 1.0
+        vector = [(term, weight / norm) for term, weight in weights]
+        vectors.append(vector)
+        for term, weight in vector:
+            postings.setdefault(term, []).append((index, weight))
+
+    ranked: list[list[int]] = []
+    for index, vector in enumerate(vectors):
+        scores: dict[int, float] = {}
+        for term, weight in vector:
+            for other, other_weight in postings[term]:
+                if other != index:
+                    scores[other] = scores.get(other, 0.0) + weight * other_weight
+        best = heapq.nsmallest(RELATED_POST_COUNT, scores.items(), key=lambda item: (-item[1], item[0]))
+        ranked.append([other for other, _score in best])
+    return ranked
+
+
+def build_related_index(posts: list[BlogPost]) -> dict[str, list[BlogPost]]:
+    """Map each slug to its related posts, topped up with the newest posts when short.
+
+    Term counts are cached per post content hash and the ranked lists per corpus hash in
+    .build-cache, so a build only re-tokenizes posts that changed and skips scoring
+    entirely when no post did.
+    """
+    cached_terms: dict[str, list] = {}
+    cached_related: dict[str, list[str]] = {}
+    cached_corpus = ""
+    try:
+        payload = json.loads(RELATED_INDEX_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        payload = None
+    if isinstance(payload, dict) and payload.get("version") == RELATED_INDEX_VERSION:
+        cached_terms = payload.get("terms") if isinstance(payload.get("terms"), dict) else {}
+        cached_related = payload.get("related") if isinstance(payload.get("related"), dict) else {}
+        cached_corpus = str(payload.get("corpus") or "")
+
+    hashes: list[str] = []
+    terms: dict[str, list] = {}
+    for post in posts:
+        digest = content_hash([post.title, post.excerpt, post.body])
+        cached = cached_terms.get(post.slug)
+        if isinstance(cached, list) and len(cached) == 2 and cached[0] == digest:
+            terms[post.slug] = cached
+        else:
+            terms[post.slug] = [digest, post_terms(post)]
+        hashes.append(f"{post.slug}:{digest}")
+    corpus = content_hash(hashes)
+
+    if corpus == cached_corpus and all(post.slug in cached_related for post in posts):
+        related = {post.slug: list(cached_related[post.slug]) for post in posts}
+    else:
+        ranked = score_related([terms[post.slug][1] for post in posts])
+        related = {post.slug: [posts[other].slug for other in ranked[index]] for index, post in enumerate(posts)}
+        BUILD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        RELATED_INDEX_PATH.write_text(
+            json.dumps(
+                {"version": RELATED_INDEX_VERSION, "corpus": corpus, "terms": terms, "related": related},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ),
+            encoding="utf-8",
+        )
+
+    by_slug = {post.slug: post for post in posts}
+    newest = posts[: RELATED_POST_COUNT + 1]
+    index: dict[str, list[BlogPost]] = {}
+    for post in posts:
+        chosen = [by_slug[slug] for slug in related[post.slug] if slug in by_slug]
+        for item in newest:
+            if len(chosen) >= RELATED_POST_COUNT:
+                break
+            if item.slug != post.slug and item not in chosen:
+                chosen.append(item)
+        index[post.slug] = chosen
+    return index
+
+
+def related_summaries(related: list[BlogPost]) -> list[BlogPost]:
+    """Related posts stripped of their bodies, which the related cards never show."""
+    return [replace(item, body="") for item in related]
+
+
+def render_blog_post(
+    post: BlogPost,
+    related: list[BlogPost],
+    images: dict[str, ResponsiveImage] | None = None,
+) -> str:
     title = post.title
     excerpt = post.excerpt or ""
     description = excerpt or title
     canonical = article_url(post)
     image = normalize_asset_url(post.cover_image_url)
-    body_html = render_body(post.body)
+    body_html = render_body(post.body, images)
     date_label = format_date_label(post.published_at or post.updated_at or post.created_at)
     date_published = iso_to_date(post.published_at or post.created_at)
     date_modified = iso_to_date(post.updated_at or post.published_at or post.created_at)
     read_minutes = reading_minutes(post)
 
-    related = [p for p in posts if p.slug != post.slug]
     related_html = ""
     if related:
         related_cards = []
-        for item in related[:3]:
+        for item in related:
             related_cards.append(
                 f"""
             <article class="blog-related-card">
@@ -440,13 +1147,13 @@ def render_blog_post(post: BlogPost, posts: list[BlogPost]) -> str:
         },
         ensure_ascii=False,
         indent=2,
-    )
+    ).replace("</", "<\\/")
 
     cover_html = ""
     if image:
         cover_html = f"""
           <figure class="blog-post-media-slot">
-            <img src="{html.escape(image, quote=True)}" alt="{html.escape(f'Cover image for {title}', quote=True)}" loading="eager">
+            {render_img(image, html.escape(f'Cover image for {title}', quote=True), "eager", ARTICLE_IMAGE_SIZES, images)}
           </figure>
 """
 
@@ -483,22 +1190,19 @@ def render_blog_post(post: BlogPost, posts: list[BlogPost]) -> str:
 
 {render_site_footer('../../')}
 
-  <script src="/js/admin-bootstrap.js?v=7"></script>
-  <script src="/js/header.js?v=17"></script>
-  <script src="/js/site-shell.js?v=9"></script>
-  <script type="application/ld+json">{schema_json.replace('</', '<\\/')}</script>
-</body>
+{blog_scripts().render(json_ld=schema_json)}</body>
 </html>
 """
 
 
-def collect_public_urls(posts: list[BlogPost]) -> list[tuple[str, str]]:
+def collect_public_urls(posts: list[BlogPost], page_count: int = 1) -> list[tuple[str, str]]:
     urls: list[tuple[str, str]] = [
         (f"{SITE_ORIGIN}/", "index.html"),
         (f"{SITE_ORIGIN}/pages/about.html", "pages/about.html"),
         (f"{SITE_ORIGIN}/pages/projects.html", "pages/projects.html"),
-        (f"{SITE_ORIGIN}/pages/blog.html", "pages/blog.html"),
     ]
+    for page in range(1, page_count + 1):
+        urls.append((index_url(page), index_path(page)))
 
     project_dir = ROOT / "pages" / "projects"
     if project_dir.exists():
@@ -513,51 +1217,327 @@ def collect_public_urls(posts: list[BlogPost]) -> list[tuple[str, str]]:
     return urls
 
 
-def render_sitemap(posts: list[BlogPost]) -> str:
-    rows = []
-    for url, rel_path in collect_public_urls(posts):
-        source_path = ROOT / rel_path
-        lastmod = ""
-        if source_path.exists():
-            lastmod = datetime.fromtimestamp(source_path.stat().st_mtime, tz=timezone.utc).date().isoformat()
-        if rel_path.startswith("pages/blog/") and posts:
-            post = next((item for item in posts if f"pages/blog/{item.slug}.html" == rel_path), None)
-            if post and post.updated_at:
-                lastmod = iso_to_date(post.updated_at) or lastmod
-        rows.append(
-            f"  <url>\n    <loc>{html.escape(url)}</loc>"
-            + (f"\n    <lastmod>{html.escape(lastmod)}</lastmod>" if lastmod else "")
-            + "\n  </url>"
-        )
+def file_digest(path: Path) -> str:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return ""
 
-    return (
-        '<?xml version="1.0" encoding="UTF-8"?>\n'
-        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-        + "\n".join(rows)
-        + "\n</urlset>\n"
-    )
+
+def static_page_digests() -> dict[str, str]:
+    """Content hashes of the hand-maintained pages listed in the sitemap."""
+    return {
+        rel_path: file_digest(ROOT / rel_path)
+        for _url, rel_path in collect_public_urls([])
+        if rel_path != index_path()
+    }
+
+
+def previous_sitemap_lastmods() -> dict[str, str]:
+    """Lastmod values from the sitemap files on disk, used when no build state survived."""
+    lastmods: dict[str, str] = {}
+    pattern = re.compile(r"<loc>([^<]+)</loc>\s*<lastmod>([^<]+)</lastmod>")
+    for path in sorted(ROOT.glob("sitemap*.xml*")):
+        if not SITEMAP_FILE.match(path.name) or path.name == "sitemap-index.xml":
+            continue
+        try:
+            raw = path.read_bytes()
+            source = (gzip.decompress(raw) if path.suffix == ".gz" else raw).decode("utf-8")
+        except (OSError, ValueError):
+            continue
+        for loc, lastmod in pattern.findall(source):
+            lastmods[html.unescape(loc)] = lastmod
+    return lastmods
+
+
+def sitemap_entries(
+    posts: list[BlogPost],
+    digests: dict[str, str],
+    known: dict[str, list[str]],
+    page_count: int = 1,
+) -> tuple[list[tuple[str, str]], dict[str, list[str]]]:
+    """Return (url, lastmod) rows plus the lastmod state to persist for the next build.
+
+    Posts use their updated_at. Every other page keeps its recorded lastmod until its
+    content hash changes, so fresh checkouts with reset mtimes do not look like edits.
+    """
+    posts_by_path = {f"pages/blog/{post.slug}.html": post for post in posts}
+    today = datetime.now(timezone.utc).date().isoformat()
+    seeded: dict[str, str] | None = None
+    entries: list[tuple[str, str]] = []
+    state: dict[str, list[str]] = {}
+    for url, rel_path in collect_public_urls(posts, page_count):
+        post = posts_by_path.get(rel_path)
+        lastmod = iso_to_date(post.updated_at) if post and post.updated_at else ""
+        if not lastmod:
+            digest = digests.get(rel_path, "")
+            recorded = known.get(rel_path)
+            if recorded and recorded[0] == digest:
+                lastmod = recorded[1]
+            elif digest:
+                if recorded is None:
+                    if seeded is None:
+                        seeded = previous_sitemap_lastmods()
+                    lastmod = seeded.get(url) or today
+                else:
+                    lastmod = today
+            state[rel_path] = [digest, lastmod]
+        entries.append((url, lastmod))
+    return entries, state
+
+
+def sitemap_paths(count: int, compress: bool) -> list[str]:
+    """The sitemap files for ``count`` URLs; the first one is what robots.txt points to."""
+    if count <= SITEMAP_URL_LIMIT:
+        return ["sitemap.xml"]
+    suffix = ".xml.gz" if compress else ".xml"
+    chunks = -(-count // SITEMAP_URL_LIMIT)
+    return ["sitemap-index.xml"] + [f"sitemap-{number}{suffix}" for number in range(1, chunks + 1)]
+
+
+@contextmanager
+def open_streaming_output(writer: OutputWriter, path: Path) -> Iterator[TextIO]:
+    """Stream text through the output writer, which keeps the file only if it changed.
+
+    ``.gz`` targets are compressed on the fly with a fixed header timestamp so
+    unchanged content produces identical bytes.
+    """
+    with writer.stream(path) as raw:
+        if path.suffix == ".gz":
+            with gzip.GzipFile(filename=path.stem, mode="wb", fileobj=raw, mtime=0) as compressed:
+                with io.TextIOWrapper(compressed, encoding="utf-8", newline="\n") as handle:
+                    yield handle
+        else:
+            with io.TextIOWrapper(raw, encoding="utf-8", newline="\n") as handle:
+                yield handle
+
+
+def write_urlset(writer: OutputWriter, path: Path, entries: list[tuple[str, str]]) -> None:
+    with open_streaming_output(writer, path) as out:
+        out.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_XMLNS}">\n')
+        for url, lastmod in entries:
+            out.write(f"  <url>\n    <loc>{html.escape(url)}</loc>")
+            if lastmod:
+                out.write(f"\n    <lastmod>{html.escape(lastmod)}</lastmod>")
+            out.write("\n  </url>\n")
+        out.write("</urlset>\n")
+
+
+def write_sitemaps(writer: OutputWriter, entries: list[tuple[str, str]], paths: list[str]) -> None:
+    if len(paths) == 1:
+        write_urlset(writer, ROOT / paths[0], entries)
+        return
+
+    children = []
+    for number, rel_path in enumerate(paths[1:]):
+        chunk = entries[number * SITEMAP_URL_LIMIT : (number + 1) * SITEMAP_URL_LIMIT]
+        write_urlset(writer, ROOT / rel_path, chunk)
+        children.append((f"{SITE_ORIGIN}/{rel_path}", max((lastmod for _url, lastmod in chunk), default="")))
+
+    with open_streaming_output(writer, ROOT / paths[0]) as out:
+        out.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_XMLNS}">\n')
+        for url, lastmod in children:
+            out.write(f"  <sitemap>\n    <loc>{html.escape(url)}</loc>")
+            if lastmod:
+                out.write(f"\n    <lastmod>{html.escape(lastmod)}</lastmod>")
+            out.write("\n  </sitemap>\n")
+        out.write("</sitemapindex>\n")
+
+
+def remove_stale_sitemaps(writer: OutputWriter, paths: list[str]) -> None:
+    expected = set(paths)
+    for path in sorted(ROOT.glob("sitemap*")):
+        if SITEMAP_FILE.match(path.name) and path.name not in expected:
+            writer.remove(path)
+
+
+def post_timestamps(post: BlogPost) -> tuple[datetime, datetime]:
+    """(published, updated) for feeds, falling back through the post's other dates."""
+    epoch = datetime.fromtimestamp(0, timezone.utc)
+    published = parse_timestamp(post.published_at) or parse_timestamp(post.created_at) or epoch
+    updated = parse_timestamp(post.updated_at) or published
+    return published, max(published, updated)
+
+
+def rfc3339(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def feed_content(post: BlogPost) -> str:
+    """Full post HTML with root-relative links made absolute for feed readers."""
+    return ROOT_RELATIVE_URL.sub(rf"\1{SITE_ORIGIN}/", render_body(post.body))
+
+
+def feed_updated(posts: list[BlogPost]) -> datetime:
+    return max((post_timestamps(post)[1] for post in posts), default=datetime.fromtimestamp(0, timezone.utc))
+
+
+def write_atom_feed(writer: OutputWriter, posts: list[BlogPost]) -> None:
+    escape = html.escape
+    with open_streaming_output(writer, ROOT / ATOM_FEED_PATH) as out:
+        out.write(
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+            "  <title>Juan R. Reynoso | Blog</title>\n"
+            f"  <subtitle>{escape(BLOG_SUMMARY)}</subtitle>\n"
+            f'  <link rel="self" href="{SITE_ORIGIN}/{ATOM_FEED_PATH}"/>\n'
+            f'  <link rel="alternate" type="text/html" href="{index_url()}"/>\n'
+            f"  <id>{index_url()}</id>\n"
+            f"  <updated>{rfc3339(feed_updated(posts))}</updated>\n"
+            "  <author><name>Juan R. Reynoso</name></author>\n"
+        )
+        for post in posts:
+            published, updated = post_timestamps(post)
+            out.write(
+                "  <entry>\n"
+                f"    <title>{escape(post.title)}</title>\n"
+                f'    <link rel="alternate" type="text/html" href="{escape(article_url(post))}"/>\n'
+                f"    <id>{escape(article_url(post))}</id>\n"
+                f"    <published>{rfc3339(published)}</published>\n"
+                f"    <updated>{rfc3339(updated)}</updated>\n"
+            )
+            if post.excerpt:
+                out.write(f"    <summary>{escape(post.excerpt)}</summary>\n")
+            out.write(f'    <content type="html">{escape(feed_content(post))}</content>\n  </entry>\n')
+        out.write("</feed>\n")
+
+
+def write_rss_feed(writer: OutputWriter, posts: list[BlogPost]) -> None:
+    escape = html.escape
+    with open_streaming_output(writer, ROOT / RSS_FEED_PATH) as out:
+        out.write(
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom" '
+            'xmlns:content="http://purl.org/rss/1.0/modules/content/">\n'
+            "  <channel>\n"
+            "    <title>Juan R. Reynoso | Blog</title>\n"
+            f"    <link>{index_url()}</link>\n"
+            f"    <description>{escape(BLOG_SUMMARY)}</description>\n"
+            "    <language>en</language>\n"
+            f'    <atom:link href="{SITE_ORIGIN}/{RSS_FEED_PATH}" rel="self" type="application/rss+xml"/>\n'
+            f"    <lastBuildDate>{email.utils.format_datetime(feed_updated(posts))}</lastBuildDate>\n"
+        )
+        for post in posts:
+            published, _updated = post_timestamps(post)
+            out.write(
+                "    <item>\n"
+                f"      <title>{escape(post.title)}</title>\n"
+                f"      <link>{escape(article_url(post))}</link>\n"
+                f'      <guid isPermaLink="true">{escape(article_url(post))}</guid>\n'
+                f"      <pubDate>{email.utils.format_datetime(published)}</pubDate>\n"
+                f"      <description>{escape(post.excerpt or post.title)}</description>\n"
+                f"      <content:encoded>{escape(feed_content(post))}</content:encoded>\n"
+                "    </item>\n"
+            )
+        out.write("  </channel>\n</rss>\n")
 
 
-def render_robots() -> str:
+def write_json_feed(writer: OutputWriter, posts: list[BlogPost]) -> None:
+    items = []
+    for post in posts:
+        published, updated = post_timestamps(post)
+        item = {
+            "id": article_url(post),
+            "url": article_url(post),
+            "title": post.title,
+            "summary": post.excerpt,
+            "content_html": feed_content(post),
+            "date_published": rfc3339(published),
+            "date_modified": rfc3339(updated),
+        }
+        if post.cover_image_url:
+            item["image"] = absolute_asset_url(post.cover_image_url)
+        items.append(item)
+    feed = {
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": "Juan R. Reynoso | Blog",
+        "home_page_url": index_url(),
+        "feed_url": f"{SITE_ORIGIN}/{JSON_FEED_PATH}",
+        "description": BLOG_SUMMARY,
+        "language": "en",
+        "authors": [{"name": "Juan R. Reynoso"}],
+        "items": items,
+    }
+    with open_streaming_output(writer, ROOT / JSON_FEED_PATH) as out:
+        json.dump(feed, out, ensure_ascii=False, indent=2)
+        out.write("\n")
+
+
+def write_feeds(writer: OutputWriter, posts: list[BlogPost]) -> None:
+    """Atom, RSS 2.0 and JSON Feed for ``posts`` (at most FEED_POST_COUNT of them)."""
+    write_atom_feed(writer, posts)
+    write_rss_feed(writer, posts)
+    write_json_feed(writer, posts)
+
+
+def render_robots(sitemap_path: str = "sitemap.xml") -> str:
     return f"""User-agent: *
 Allow: /
 Disallow: /admin/
 
-Sitemap: {SITE_ORIGIN}/sitemap.xml
+Sitemap: {SITE_ORIGIN}/{sitemap_path}
 """
 
 
-def write_file(path: Path, content: str) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    content = re.sub(r"[ \t]+(?=\n)", "", content)
-    path.write_text(content, encoding="utf-8")
+def strip_trailing_whitespace(content: str) -> str:
+    """Drop spaces and tabs before every newline (the final line is left as is)."""
+    lines = content.split("\n")
+    last = lines.pop()
+    return "\n".join([line.rstrip(" \t") for line in lines] + [last])
+
+
+def minify_html(content: str) -> str:
+    """Collapse every whitespace run that spans a line break outside tags to one newline.
+
+    Tags, comments and the bodies of ``<pre>``, ``<textarea>``, ``<script>`` (JSON-LD
+    included) and ``<style>`` are copied verbatim, so only indentation and blank lines
+    go and the rendered page is unchanged.
+    """
+    chunks = []
+    position = 0
+    for match in VERBATIM_HTML.finditer(content):
+        chunks.append(LINE_BREAK_RUN.sub("\n", content[position : match.start()]))
+        chunks.append(match.group(0))
+        position = match.end()
+    chunks.append(LINE_BREAK_RUN.sub("\n", content[position:]))
+    return "".join(chunks)
+
+
+def write_file(writer: OutputWriter, path: Path, content: str, minify: bool = False) -> bool:
+    content = strip_trailing_whitespace(content)
+    if minify:
+        with span("minify", "regex", path=path):
+            content = minify_html(content)
+    return writer.write_text(path, content)
+
 
+# (rel_path, post, related summaries, images, previous record, minify, precompress)
+PostJob = tuple[str, BlogPost, list[BlogPost], dict[str, ResponsiveImage], OutputRecord | None, bool, bool]
 
-def remove_stale_generated_posts(posts: list[BlogPost]) -> None:
-    expected = {f"{post.slug}.html" for post in posts}
-    if not BLOG_DETAIL_DIR.exists():
+
+def write_blog_post(job: PostJob) -> tuple[str, OutputRecord | None, bool]:
+    """Render and write one post page; module-level so worker processes can run it.
+
+    Workers cannot share the output writer, so the file's previous record travels with
+    the job (along with the minify and precompress flags) and the new one comes back
+    for the parent to store.
+    """
+    rel_path, post, related, images, record, minify, precompress = job
+    with span("render post", "render", path=rel_path):
+        content = strip_trailing_whitespace(render_blog_post(post, related, images))
+    if minify:
+        with span("minify", "regex", path=rel_path):
+            content = minify_html(content)
+    data = content.encode("utf-8")
+    record, changed = write_if_changed(ROOT / rel_path, data, record, precompress=precompress)
+    return rel_path, record, changed
+
+
+def remove_stale_generated_pages(writer: OutputWriter, directory: Path, expected: set[str]) -> None:
+    """Delete generated HTML files in ``directory`` that are no longer part of the build."""
+    if not directory.exists():
         return
-    for path in BLOG_DETAIL_DIR.glob("*.html"):
+    for path in sorted(directory.glob("*.html")):
         if path.name in expected:
             continue
         try:
@@ -565,19 +1545,321 @@ def remove_stale_generated_posts(posts: list[BlogPost]) -> None:
         except OSError:
             continue
         if GENERATED_MARKER in source:
-            path.unlink()
+            writer.remove(path)
+
+
+def remove_stale_generated_posts(writer: OutputWriter, posts: list[BlogPost], page_count: int = 1) -> None:
+    remove_stale_generated_pages(writer, BLOG_DETAIL_DIR, {f"{post.slug}.html" for post in posts})
+    remove_stale_generated_pages(
+        writer, BLOG_INDEX_PAGE_DIR, {f"{page}.html" for page in range(2, page_count + 1)}
+    )
+
+
+def critical_css_samples() -> dict[str, list[str]]:
+    """Representative pages for each template, rendered from a post that uses every block type."""
+    sample = BlogPost(
+        id=0,
+        slug="critical-css-sample",
+        title="Sample post",
+        excerpt="Sample excerpt.",
+        body=(
+            "Intro with **bold**, *emphasis* and `code`.\n\n## Section\n\n### Subsection\n\n"
+            "- First\n- Second\n\n1. One\n2. Two\n\n> Quoted\n\n"
+            "![Illustration](/assets/images/sample.png)\n\n```python\nprint('sample')\n```"
+        ),
+        cover_image_url="/assets/images/sample.png",
+        published_at="2026-01-01T00:00:00Z",
+        updated_at="2026-01-01T00:00:00Z",
+        created_at="2026-01-01T00:00:00Z",
+    )
+    return {
+        "blog-index": [render_blog_index([sample, sample], 2, 3, 1), render_blog_index([])],
+        "blog-post": [render_blog_post(sample, [sample])],
+    }
+
+
+def template_version() -> str:
+    """Fingerprint of the renderer, page shell and asset manifest; editing any invalidates every output."""
+    digest = hashlib.sha256()
+    for path in (Path(__file__), Path(page_shell.__file__), ASSET_MANIFEST_PATH):
+        digest.update(path.read_bytes() if path.exists() else b"")
+    return digest.hexdigest()
+
+
+def content_hash(payload: object) -> str:
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def load_build_manifest() -> BuildManifest:
+    try:
+        payload = json.loads(BUILD_MANIFEST_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return BuildManifest()
+    if not isinstance(payload, dict) or payload.get("version") != BUILD_MANIFEST_VERSION:
+        return BuildManifest()
+    outputs = payload.get("outputs")
+    lastmod = payload.get("lastmod")
+    return BuildManifest(
+        sources=str(payload.get("sources") or ""),
+        outputs={str(k): str(v) for k, v in outputs.items()} if isinstance(outputs, dict) else {},
+        lastmod={
+            str(k): [str(item) for item in v]
+            for k, v in (lastmod.items() if isinstance(lastmod, dict) else [])
+            if isinstance(v, list) and len(v) == 2
+        },
+    )
+
 
+def save_build_manifest(manifest: BuildManifest) -> None:
+    payload = {
+        "version": BUILD_MANIFEST_VERSION,
+        "sources": manifest.sources,
+        "outputs": dict(sorted(manifest.outputs.items())),
+        "lastmod": dict(sorted(manifest.lastmod.items())),
+    }
+    BUILD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    BUILD_MANIFEST_PATH.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+
+def sources_fingerprint(
+    remote: TableState,
+    static_digests: dict[str, str],
+    version: str,
+    options: dict[str, object],
+) -> str:
+    """Cheap summary of everything a build reads, used to skip runs where nothing moved."""
+    local_source = LOCAL_BLOG_POSTS_PATH.read_bytes() if LOCAL_BLOG_POSTS_PATH.exists() else b""
+    return content_hash(
+        {
+            "template": version,
+            "options": options,
+            "remote": [remote.count, remote.watermark, remote.digest],
+            "local": hashlib.sha256(local_source).hexdigest(),
+            "pages": static_digests,
+        }
+    )
 
-def main() -> None:
-    posts = load_published_blog_posts()
 
-    remove_stale_generated_posts(posts)
-    write_file(BLOG_INDEX_PATH, render_blog_index(posts))
+def post_card_inputs(post: BlogPost) -> dict[str, str]:
+    return {
+        "slug": post.slug,
+        "title": post.title,
+        "excerpt": post.excerpt,
+        "cover_image_url": post.cover_image_url,
+        "published_at": post.published_at,
+        "updated_at": post.updated_at,
+        "created_at": post.created_at,
+    }
+
+
+def post_image_urls(post: BlogPost, include_body: bool = True) -> list[str]:
+    """Normalized URLs of a post's cover and, optionally, its inline body images."""
+    urls = [normalize_asset_url(post.cover_image_url)] if post.cover_image_url else []
+    if include_body:
+        body = post.body.replace("\r\n", "\n")
+        urls.extend(normalize_asset_url(match.strip()) for match in IMAGE_REFERENCE.findall(body))
+    return [url for url in urls if url]
+
+
+def search_documents(posts: list[BlogPost]) -> list[SearchDocument]:
+    return [
+        SearchDocument(
+            key=f"blog/{post.slug}",
+            url=f"/pages/blog/{post.slug}.html",
+            title=post.title,
+            snippet=post.excerpt,
+            text=f"{post.excerpt}\n{markdown_text(post.body)}",
+        )
+        for post in posts
+    ]
+
+
+def used_images(
+    urls: list[str],
+    images: dict[str, ResponsiveImage],
+) -> dict[str, ResponsiveImage]:
+    return {url: images[url] for url in urls if url in images}
+
+
+def build_inputs(
+    posts: list[BlogPost],
+    pages: list[list[BlogPost]],
+    related: dict[str, list[BlogPost]],
+    images: dict[str, ResponsiveImage],
+) -> dict[str, object]:
+    """Map every generated HTML page to the inputs its rendered content depends on."""
+    inputs: dict[str, object] = {}
     for post in posts:
-        write_file(BLOG_DETAIL_DIR / f"{post.slug}.html", render_blog_post(post, posts))
-    write_file(ROOT / "sitemap.xml", render_sitemap(posts))
-    write_file(ROOT / "robots.txt", render_robots())
+        inputs[f"pages/blog/{post.slug}.html"] = {
+            "post": asdict(post),
+            "related": [post_card_inputs(item) for item in related[post.slug]],
+            "images": {url: asdict(info) for url, info in used_images(post_image_urls(post), images).items()},
+        }
+    offset = 0
+    for number, page_posts in enumerate(pages, start=1):
+        covers = [url for post in page_posts for url in post_image_urls(post, include_body=False)]
+        inputs[index_path(number)] = {
+            "page": [number, len(pages), offset],
+            "posts": [post_card_inputs(post) for post in page_posts],
+            "images": {url: asdict(info) for url, info in used_images(covers, images).items()},
+        }
+        offset += len(page_posts)
+    return inputs
+
+
+def run(args: argparse.Namespace, assets: dict[str, str] | None = None) -> int:
+    """Render the blog; ``build_site.py`` passes ``assets`` once it has fingerprinted them."""
+    writer = OutputWriter("prerender-blog", report_path=args.changes_file, precompress=args.precompress)
+    if args.precompress and brotli is None:
+        print("Warning: the brotli package is not installed; writing .gz siblings only.", file=sys.stderr)
+    if assets is None:
+        with span("fingerprint assets"):
+            fingerprint_assets(writer)
+    version = template_version()
+    with span("sync content"):
+        remote, rows = read_table("blog_posts", args.offline, args.full_fetch)
+    with span("hash static pages"):
+        static_digests = static_page_digests()
+    options = {
+        "gzip_sitemaps": args.gzip_sitemaps,
+        "page_size": args.page_size,
+        "images": content_hash([local_image_digests(), VARIANTS_ENABLED]),
+        "minify": args.minify,
+        "precompress": [args.precompress, brotli is not None],
+        "critical_css": args.critical_css,
+        "search_index": SEARCH_INDEX_VERSION,
+    }
+    # Part of the per-output digests only when enabled, so default builds keep theirs.
+    output_options = (
+        {key: options[key] for key in ("minify", "precompress", "critical_css")}
+        if args.minify or args.precompress or args.critical_css
+        else {}
+    )
+    sources = sources_fingerprint(remote, static_digests, version, options)
+    previous = BuildManifest() if args.force else load_build_manifest()
+    if sources == previous.sources and all((ROOT / rel_path).exists() for rel_path in previous.outputs):
+        writer.save()
+        print("Blog output is already current.")
+        return 0
+
+    with span("load posts"):
+        posts = load_published_blog_posts(parse_blog_posts(rows, "Supabase"))
+    by_slug = {post.slug: post for post in posts}
+    pages = paginate_posts(posts, args.page_size)
+    index_pages = {index_path(number): number for number in range(1, len(pages) + 1)}
+    manifest = BuildManifest(sources=sources)
+    rendered = 0
+
+    def is_current(rel_path: str, inputs: object, paths: list[str]) -> bool:
+        digest = content_hash({"template": version, "inputs": inputs, **output_options})
+        manifest.outputs[rel_path] = digest
+        return previous.outputs.get(rel_path) == digest and all((ROOT / path).exists() for path in paths)
+
+    if args.critical_css:
+        with span("critical css"):
+            configure_critical_css(
+                {template: critical_css(template, samples) for template, samples in critical_css_samples().items()}
+            )
+    remove_stale_generated_posts(writer, posts, len(pages))
+    post_jobs: list[PostJob] = []
+    with span("related index"):
+        related = build_related_index(posts)
+    with span("responsive images"):
+        images = build_responsive_images(sorted({url for post in posts for url in post_image_urls(post)}), writer)
+    with span("check outputs"):
+        for rel_path, inputs in build_inputs(posts, pages, related, images).items():
+            if is_current(rel_path, inputs, [rel_path]):
+                continue
+            if rel_path in index_pages:
+                number = index_pages[rel_path]
+                offset = (number - 1) * args.page_size
+                with span("render index page", "render", path=rel_path):
+                    page_html = render_blog_index(pages[number - 1], number, len(pages), offset, images)
+                write_file(writer, ROOT / rel_path, page_html, args.minify)
+                rendered += 1
+                continue
+            post = by_slug[Path(rel_path).stem]
+            record = writer.record_for(ROOT / rel_path)
+            post_images = used_images(post_image_urls(post), images)
+            related_posts = related_summaries(related[post.slug])
+            post_jobs.append((rel_path, post, related_posts, post_images, record, args.minify, args.precompress))
+
+    with span("post pages", posts=len(post_jobs), jobs=args.jobs):
+        if args.jobs > 1 and len(post_jobs) > 1:
+            workers = min(args.jobs, len(post_jobs))
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=configure_critical_css, initargs=(dict(CRITICAL_CSS),)
+            ) as pool:
+                chunksize = max(1, len(post_jobs) // (workers * 4))
+                results = list(pool.map(write_blog_post, post_jobs, chunksize=chunksize))
+        else:
+            results = [write_blog_post(job) for job in post_jobs]
+    for rel_path, record, changed in results:
+        writer.record(ROOT / rel_path, record, changed)
+    rendered += len(results)
+
+    entries, manifest.lastmod = sitemap_entries(
+        posts, {**static_digests, **manifest.outputs}, previous.lastmod, len(pages)
+    )
+    sitemap_files = sitemap_paths(len(entries), args.gzip_sitemaps)
+    remove_stale_sitemaps(writer, sitemap_files)
+    if not is_current(sitemap_files[0], [entries, sitemap_files], sitemap_files):
+        with span("sitemaps", urls=len(entries)):
+            write_sitemaps(writer, entries, sitemap_files)
+        rendered += len(sitemap_files)
+    feed_posts = posts[:FEED_POST_COUNT]
+    feed_files = [ATOM_FEED_PATH, RSS_FEED_PATH, JSON_FEED_PATH]
+    if not is_current(ATOM_FEED_PATH, [asdict(post) for post in feed_posts], feed_files):
+        with span("feeds"):
+            write_feeds(writer, feed_posts)
+        rendered += len(feed_files)
+    if not is_current("robots.txt", sitemap_files[0], ["robots.txt"]):
+        write_file(writer, ROOT / "robots.txt", render_robots(sitemap_files[0]))
+        rendered += 1
+    documents = search_documents(posts)
+    search_path = writer.rel_path(SEARCH_MANIFEST_PATH)
+    if not is_current(search_path, [asdict(document) for document in documents], [search_path]):
+        with span("search index", documents=len(documents)):
+            update_search_index("blog", documents, writer)
+
+    save_build_manifest(manifest)
+    writer.save()
+    print(
+        f"Pre-rendered {rendered} blog outputs for {len(posts)} published posts "
+        f"({len(writer.changed)} changed, {len(writer.removed)} removed)."
+    )
+    return 0
+
+
+def watch_blog(args: argparse.Namespace) -> None:
+    """Rebuild from the content store, offline, whenever the local posts or a sitemap page changes.
+
+    The build manifest limits each rebuild to the outputs whose inputs moved.
+    """
+    rebuild_args = argparse.Namespace(**{**vars(args), "force": False, "full_fetch": False, "offline": True})
+    paths = [LOCAL_BLOG_POSTS_PATH] + [ROOT / rel_path for rel_path in static_page_digests()]
+
+    def rebuild(_changed: set[Path]) -> list[Path]:
+        run(rebuild_args)
+        # Blog outputs live outside the watched paths, so there is nothing to ignore.
+        return []
+
+    watch(paths, rebuild, polling=args.poll)
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        with profile_run("prerender-blog", args.profile):
+            code = run(args)
+    except EmptyStoreError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    if args.watch and code == 0:
+        watch_blog(args)
+    return code
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
@@ -1,27 +1,91 @@
 #!/usr/bin/env python3
-"""Pre-render the project index and project metadata from public project data."""
+"""Pre-render the project index, project metadata and case-study sections from public project data."""
 
 from __future__ import annotations
 
 import argparse
+import hashlib
 import html
 import json
+import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
-from urllib.parse import quote, urlparse
-from urllib.request import Request, urlopen
+from urllib.parse import urlparse
+
+import page_shell
+from build_output import BUILD_CACHE_DIR, OutputRecord, OutputWriter, write_if_changed
+from build_profile import add_profile_argument, profile_run, span
+from content_store import EmptyStoreError, sync_tables, table_rows, table_state
+from critical_css import CRITICAL_CSS_VERSION, SAFELIST_SCRIPTS, STYLESHEET_PATH, critical_css, inline_critical_css
+from file_watcher import watch
+from fingerprint_assets import FINGERPRINT_LENGTH, fingerprint_assets, load_asset_manifest, rewrite_asset_urls
+from page_shell import CANONICAL_LINK_TAG, META_DESCRIPTION_TAG
+from search_index import SearchDocument, update_search_index
+from supabase_config import read_public_config
 
 
 ROOT = Path(__file__).resolve().parents[1]
 PROJECTS_PAGE = ROOT / "pages" / "projects.html"
 PROJECT_DETAILS_DIR = ROOT / "pages" / "projects"
 CASE_STUDIES_PATH = ROOT / "data" / "project-case-studies.json"
-SUPABASE_CONFIG_PATH = ROOT / "js" / "supabase-config.js"
+SNAPSHOT_DIR = ROOT / "data"
+SNAPSHOT_GLOB = "projects-snapshot.*.json"
+SNAPSHOT_ELEMENT = re.compile(
+    r'<script\s+type="application/json"\s+data-projects-fallback="1"(?:\s+data-src="([^"]*)")?\s*>([\s\S]*?)</script>'
+)
+# What the card renderers (render_card and js/projects-page.js) read from a snapshot row.
+CARD_FIELDS = ("id", "title", "description", "href", "image_url", "updated_at")
+CARD_CASE_STUDY_FIELDS = ("summary", "problem", "impact", "tools")
+CARD_TOOL_COUNT = 3
+PROJECT_TEMPLATE_NAME = "project-template.html"
+INPUT_CACHE_PATH = BUILD_CACHE_DIR / "prerender-projects.json"
+INPUT_CACHE_VERSION = 1
 SITE_ORIGIN = "https://jreynoso.net"
 STATIC_START = "<!-- PROJECTS_STATIC_START -->"
 STATIC_END = "<!-- PROJECTS_STATIC_END -->"
 GENERIC_PROJECT_IMAGE = "../assets/images/projects/project-placeholder.svg"
+HTML_SUFFIX = re.compile(r"\.html$", re.IGNORECASE)
+PROJECT_PAGE_PATH = re.compile(r"(?:^|/)projects/([a-z0-9][a-z0-9-]*\.html)$", re.IGNORECASE)
+# Hrefs with none of these (no scheme, netloc, params or control characters) split into
+# path, query and fragment exactly as urlparse() would split them.
+URLPARSE_NEEDED = re.compile(r"[\x00-\x20:;]|^//")
+# The tags scan_page_metadata() acts on, and the rest of a tag after its name.
+METADATA_TOKEN = re.compile(
+    r"<(?:!--|(/?)(head|body|title|meta|link|section|h1|script|style)(?![a-zA-Z0-9-]))", re.IGNORECASE
+)
+TAG_REST = re.compile(r"((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>")
+RAW_TEXT_END = {name: re.compile(rf"</{name}", re.IGNORECASE) for name in ("script", "style")}
+HERO_PARAGRAPH = re.compile(r"\s*<p(?:\s[^>]*)?>", re.IGNORECASE)
+PARAGRAPH_END = re.compile(r"</p>", re.IGNORECASE)
+HERO_SECTION_ATTRS = re.compile(r'\s+class="hero"', re.IGNORECASE)
+SEO_DESCRIPTION_ATTR = re.compile(r'\sdata-seo-description="([^"]+)"', re.IGNORECASE)
+DESCRIPTION_META_ATTRS = re.compile(r'\s+name="description"\s+content="[^"]*"\s*/?', re.IGNORECASE)
+CANONICAL_LINK_ATTRS = re.compile(r'\s+rel="canonical"\s+href="[^"]*"\s*/?', re.IGNORECASE)
+CASE_STUDY_START = "<!-- PROJECT_CASE_STUDY_START -->"
+CASE_STUDY_END = "<!-- PROJECT_CASE_STUDY_END -->"
+CASE_STUDY_BLOCK = re.compile(
+    r"(?:\n\n)?[ \t]*" + re.escape(CASE_STUDY_START) + r"[\s\S]*?" + re.escape(CASE_STUDY_END)
+)
+CASE_STUDY_SCRIPT = re.compile(r'<script\s+src="[^"]*js/project-case-study[.\w]*\.js(?:\?[^"]*)?"')
+HERO_SECTION = re.compile(r'^([ \t]*)<section\s+class="hero"\s*>', re.MULTILINE)
+SECTION_TAG = re.compile(r"<(/?)section\b[^>]*>", re.IGNORECASE)
+EVIDENCE_SECTIONS = tuple(
+    re.compile(rf'<section\b(?P<attrs>[^>]*\sclass="(?:[^"]*\s)?{name}(?:\s[^"]*)?"[^>]*)>')
+    for name in ("project-screenshots", "project-media-showcase")
+)
+ID_ATTR = re.compile(r'\sid="([^"]*)"')
+# (label, case-study keys, modifier) in the order js/project-case-study.js renders them.
+CASE_STUDY_STEPS = (
+    ("Problem", ("problem",), "case-study-step-problem"),
+    ("Approach", ("approach",), "case-study-step-approach"),
+    ("Finding / solution", ("solution",), "case-study-step-solution"),
+    ("Analytics / capabilities", ("analytics",), "case-study-step-analytics"),
+    ("Operational use", ("operational_use", "operationalUse"), "case-study-step-operational-use"),
+    ("Operational / business impact", ("impact",), "case-study-step-impact"),
+)
 
 FEATURED_PROJECT_SLUGS = (
     "techloc-fleet-service-control",
@@ -100,35 +164,72 @@ CONCEPT_COVER_SLUGS = {
 }
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Generate crawlable project cards and project metadata."
     )
     parser.add_argument(
         "--offline",
         action="store_true",
-        help="Use the embedded project snapshot instead of querying Supabase.",
+        help="Use the projects rows in the local content store (or, without any, the project snapshot "
+        "pages/projects.html points at) instead of querying Supabase.",
+    )
+    parser.add_argument(
+        "--trim-snapshot",
+        action="store_true",
+        help="Keep only the fields the project cards use in the fallback snapshot. Offline builds then "
+        "index only those fields of case studies that come from Supabase rather than the repository.",
     )
     parser.add_argument(
         "--check",
         action="store_true",
         help="Exit non-zero when generated output differs from committed files.",
     )
-    return parser.parse_args()
-
-
-def read_public_config() -> tuple[str, str, str]:
-    source = SUPABASE_CONFIG_PATH.read_text(encoding="utf-8")
-    url_match = re.search(r"\burl:\s*['\"]([^'\"]+)['\"]", source)
-    key_match = re.search(r"\banonKey:\s*['\"]([^'\"]+)['\"]", source)
-    bucket_match = re.search(r"\bassetsBucket:\s*['\"]([^'\"]+)['\"]", source)
-    if not url_match or not key_match:
-        raise RuntimeError("Supabase public URL or anon key was not found in js/supabase-config.js")
-    return (
-        url_match.group(1).rstrip("/"),
-        key_match.group(1),
-        bucket_match.group(1) if bucket_match else "resume-cms",
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="With --check, stop at the first stale output instead of listing them all.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Render and compare project detail pages in N worker processes; 0 uses every CPU (default: 1).",
+    )
+    parser.add_argument(
+        "--critical-css",
+        action="store_true",
+        help="Inline the styles.css rules the project pages use and load the full stylesheets without blocking.",
     )
+    parser.add_argument(
+        "--changes-file",
+        type=Path,
+        help="Where to write the JSON list of changed outputs "
+        "(default: .build-cache/changes-prerender-projects.json).",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After rendering, keep running and re-render the pages affected by each edit to "
+        "data/project-case-studies.json, pages/projects.html or a project detail page.",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="With --watch, poll file stats instead of using inotify.",
+    )
+    add_profile_argument(parser, "prerender-projects")
+    args = parser.parse_args(argv)
+    if args.watch and args.check:
+        parser.error("--watch cannot be combined with --check")
+    if args.watch and args.profile:
+        parser.error("--watch cannot be combined with --profile")
+    if args.fail_fast and not args.check:
+        parser.error("--fail-fast requires --check")
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 or more")
+    args.jobs = args.jobs or os.cpu_count() or 1
+    return args
 
 
 def load_case_studies() -> dict[str, dict]:
@@ -138,94 +239,88 @@ def load_case_studies() -> dict[str, dict]:
 
 
 def load_embedded_projects(page_source: str) -> list[dict]:
-    match = re.search(
-        r'<script\s+type="application/json"\s+data-projects-fallback="1">([\s\S]*?)</script>',
-        page_source,
-    )
+    """The fallback snapshot projects.html points at, or carries inline (as older builds wrote it)."""
+    match = SNAPSHOT_ELEMENT.search(page_source)
     if not match:
         return []
-    payload = json.loads(match.group(1))
+    if match.group(1):
+        try:
+            source = (PROJECTS_PAGE.parent / html.unescape(match.group(1))).read_text(encoding="utf-8")
+        except OSError:
+            return []
+    else:
+        source = match.group(2)
+    payload = json.loads(source)
     return payload if isinstance(payload, list) else []
 
 
-def fetch_public_projects(supabase_url: str, anon_key: str) -> list[dict]:
-    query = quote("sort_order.asc,id.asc", safe=".,")
-    url = (
-        f"{supabase_url}/rest/v1/projects"
-        f"?select=*&is_published=eq.true&order={query}"
-    )
-    request = Request(
-        url,
-        headers={
-            "apikey": anon_key,
-            "Authorization": f"Bearer {anon_key}",
-            "Accept": "application/json",
-        },
-    )
-    with urlopen(request, timeout=20) as response:
-        payload = json.load(response)
-    if not isinstance(payload, list):
-        raise RuntimeError("Supabase projects response was not a list")
-    return [item for item in payload if isinstance(item, dict)]
-
-
 def href_to_slug(raw_href: object) -> str:
     href = str(raw_href or "").strip().split("#", 1)[0].split("?", 1)[0]
     filename = href.rstrip("/").rsplit("/", 1)[-1]
-    return re.sub(r"\.html$", "", filename, flags=re.IGNORECASE)
+    return HTML_SUFFIX.sub("", filename)
 
 
-def normalize_project_href(raw_href: object) -> str:
+def project_href(raw_href: object) -> tuple[str, str]:
+    """The ``projects/<file>.html`` href (query and fragment kept) and its slug; empty when unusable."""
     href = str(raw_href or "").strip()
     if not href:
-        return ""
-    parsed = urlparse(href)
-    path = parsed.path
-    match = re.search(r"(?:^|/)projects/([a-z0-9][a-z0-9-]*\.html)$", path, re.IGNORECASE)
+        return "", ""
+    if URLPARSE_NEEDED.search(href):
+        parsed = urlparse(href)
+        path, query, fragment = parsed.path, parsed.query, parsed.fragment
+    else:
+        rest, _, fragment = href.partition("#")
+        path, _, query = rest.partition("?")
+    match = PROJECT_PAGE_PATH.search(path)
     if not match:
-        return ""
-    suffix = f"?{parsed.query}" if parsed.query else ""
-    suffix += f"#{parsed.fragment}" if parsed.fragment else ""
-    return f"projects/{match.group(1)}{suffix}"
+        return "", ""
+    suffix = f"?{query}" if query else ""
+    suffix += f"#{fragment}" if fragment else ""
+    return f"projects/{match.group(1)}{suffix}", match.group(1)[: -len(".html")]
 
 
 def merge_projects(remote_projects: list[dict], case_studies: dict[str, dict]) -> list[dict]:
-    merged = [dict(item) for item in remote_projects]
+    """Overlay the local projects on the remote rows, attach case studies and put featured projects first.
+
+    Each row is normalized once: its record keeps the project with its href and slug,
+    and the slug index the local projects are matched through is built in the same
+    pass. Only rows a local project overlays are normalized again, for the new href.
+    The merge is linear in the number of rows plus local projects.
+    """
+    # [project, normalized href or "", slug]; the project dicts carry no extra keys
+    # because the snapshot embeds them as they are.
+    records: list[list] = []
+    by_slug: dict[str, int] = {}
+    for item in remote_projects:
+        project = dict(item)
+        raw_href = project.get("href")
+        by_slug.setdefault(href_to_slug(raw_href), len(records))
+        records.append([project, *project_href(raw_href)])
     for local_project in LOCAL_PROJECTS:
         local_slug = href_to_slug(local_project["href"])
-        existing_index = next(
-            (
-                index
-                for index, item in enumerate(merged)
-                if href_to_slug(item.get("href")) == local_slug
-            ),
-            None,
-        )
+        existing_index = by_slug.get(local_slug)
         if existing_index is None:
-            merged.append(dict(local_project))
+            by_slug[local_slug] = len(records)
+            records.append([dict(local_project), *project_href(local_project["href"])])
         else:
-            merged[existing_index].update(local_project)
+            record = records[existing_index]
+            record[0].update(local_project)
+            record[1:] = project_href(record[0].get("href"))
 
-    normalized = []
-    for project in merged:
-        href = normalize_project_href(project.get("href"))
+    featured_rank = {slug: index for index, slug in enumerate(FEATURED_PROJECT_SLUGS)}
+    normalized: list[tuple[int, dict]] = []
+    for project, href, slug in records:
         if not href:
             continue
         project["href"] = href
-        slug = href_to_slug(href)
         if slug in case_studies:
             case_study = case_studies[slug]
             project["case_study"] = case_study
             if str(case_study.get("summary") or "").strip():
                 project["description"] = str(case_study["summary"]).strip()
-        normalized.append(project)
-    featured_rank = {slug: index for index, slug in enumerate(FEATURED_PROJECT_SLUGS)}
-    normalized.sort(
-        key=lambda project: featured_rank.get(
-            href_to_slug(project.get("href")), len(FEATURED_PROJECT_SLUGS)
-        )
-    )
-    return normalized
+        normalized.append((featured_rank.get(slug, len(FEATURED_PROJECT_SLUGS)), project))
+    normalized.sort(key=lambda item: item[0])
+    return [project for _rank, project in normalized]
 
 
 def normalize_asset_url(raw_url: object, supabase_url: str, bucket: str) -> str:
@@ -244,8 +339,8 @@ def normalize_asset_url(raw_url: object, supabase_url: str, bucket: str) -> str:
 
 def render_card(project: dict, supabase_url: str, bucket: str) -> str:
     title = str(project.get("title") or "Untitled project").strip()
-    href = normalize_project_href(project.get("href")) or "#"
-    slug = href_to_slug(href)
+    href, slug = project_href(project.get("href"))
+    href = href or "#"
     case_study = project.get("case_study")
     case_study = case_study if isinstance(case_study, dict) else None
     description = str(
@@ -284,7 +379,7 @@ def render_card(project: dict, supabase_url: str, bucket: str) -> str:
         if impact:
             preview_rows += f'<p><span>Value</span>{html.escape(impact)}</p>'
         tags = "".join(
-            f"<span>{html.escape(str(tool))}</span>" for tool in tools[:3] if str(tool).strip()
+            f"<span>{html.escape(str(tool))}</span>" for tool in tools[:CARD_TOOL_COUNT] if str(tool).strip()
         )
         tags_html = (
             f'<div class="project-card-tags" aria-label="Tools and domains">{tags}</div>'
@@ -311,13 +406,36 @@ def render_card(project: dict, supabase_url: str, bucket: str) -> str:
     )
 
 
-def safe_json(payload: object) -> str:
-    return (
-        json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
-        .replace("<", "\\u003c")
-        .replace(">", "\\u003e")
-        .replace("&", "\\u0026")
-    )
+def snapshot_rows(projects: list[dict], trim: bool) -> list[dict]:
+    """The rows the fallback snapshot carries: all of them, or only what the cards read."""
+    if not trim:
+        return projects
+    rows = []
+    for project in projects:
+        row = {key: project[key] for key in CARD_FIELDS if project.get(key) not in (None, "")}
+        case_study = project.get("case_study")
+        if isinstance(case_study, dict):
+            row["case_study"] = {key: case_study[key] for key in CARD_CASE_STUDY_FIELDS if case_study.get(key)}
+            if isinstance(row["case_study"].get("tools"), list):
+                row["case_study"]["tools"] = row["case_study"]["tools"][:CARD_TOOL_COUNT]
+        rows.append(row)
+    return rows
+
+
+def project_snapshot(projects: list[dict], trim: bool) -> tuple[Path, str]:
+    """The snapshot file, named after its content so it can be cached as immutable, and its JSON."""
+    payload = json.dumps(snapshot_rows(projects, trim), ensure_ascii=False, separators=(",", ":")) + "\n"
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:FINGERPRINT_LENGTH]
+    return SNAPSHOT_DIR / f"projects-snapshot.{digest}.json", payload
+
+
+def write_project_snapshot(writer: OutputWriter, projects: list[dict], trim: bool) -> Path:
+    path, payload = project_snapshot(projects, trim)
+    write_or_check(writer, path, payload)
+    for stale in sorted(SNAPSHOT_DIR.glob(SNAPSHOT_GLOB)):
+        if stale != path:
+            writer.remove(stale)
+    return path
 
 
 def replace_static_projects(
@@ -325,7 +443,13 @@ def replace_static_projects(
     projects: list[dict],
     supabase_url: str,
     bucket: str,
+    snapshot_path: Path,
 ) -> str:
+    """Swap in the pre-rendered cards and point the fallback element at the snapshot file.
+
+    ``js/projects-page.js`` fetches the snapshot only when it has to render cards itself,
+    so visitors no longer download every row inline with the page.
+    """
     cards = "\n                ".join(
         render_card(project, supabase_url, bucket) for project in projects
     )
@@ -337,17 +461,11 @@ def replace_static_projects(
         raise RuntimeError("Project static markers were not found in pages/projects.html")
     page_source = block_pattern.sub(lambda _match: static_content, page_source, count=1)
 
-    snapshot = safe_json(projects)
-    snapshot_pattern = re.compile(
-        r'(<script\s+type="application/json"\s+data-projects-fallback="1">)[\s\S]*?(</script>)'
-    )
-    if not snapshot_pattern.search(page_source):
+    if not SNAPSHOT_ELEMENT.search(page_source):
         raise RuntimeError("Project fallback JSON element was not found in pages/projects.html")
-    return snapshot_pattern.sub(
-        lambda match: f"{match.group(1)}{snapshot}{match.group(2)}",
-        page_source,
-        count=1,
-    )
+    href = html.escape(Path("..", snapshot_path.relative_to(ROOT)).as_posix(), quote=True)
+    element = f'<script type="application/json" data-projects-fallback="1" data-src="{href}"></script>'
+    return SNAPSHOT_ELEMENT.sub(lambda _match: element, page_source, count=1)
 
 
 def text_content(fragment: str) -> str:
@@ -355,106 +473,578 @@ def text_content(fragment: str) -> str:
     return " ".join(html.unescape(without_tags).split())
 
 
-def upsert_head_metadata(source: str, description: str, canonical_url: str) -> str:
-    escaped_description = html.escape(description, quote=True)
-    description_tag = f'<meta name="description" content="{escaped_description}">' 
-    canonical_tag = f'<link rel="canonical" href="{html.escape(canonical_url, quote=True)}">'
+@dataclass(frozen=True)
+class PageMetadata:
+    """What one scan of a page found; spans are ``(start, end)`` offsets into its source."""
 
-    description_pattern = re.compile(r'<meta\s+name="description"\s+content="[^"]*"\s*/?>', re.IGNORECASE)
-    canonical_pattern = re.compile(r'<link\s+rel="canonical"\s+href="[^"]*"\s*/?>', re.IGNORECASE)
+    title_end: int | None = None
+    description: tuple[int, int] | None = None
+    canonical: tuple[int, int] | None = None
+    hero_title: str | None = None
+    hero_summary: str | None = None
+    seo_description: str | None = None
 
-    if description_pattern.search(source):
-        source = description_pattern.sub(description_tag, source, count=1)
-    else:
-        source = re.sub(r"(\s*</title>)", rf"\1\n  {description_tag}", source, count=1)
 
-    if canonical_pattern.search(source):
-        source = canonical_pattern.sub(canonical_tag, source, count=1)
-    else:
-        source = source.replace(description_tag, f"{description_tag}\n  {canonical_tag}", 1)
-    return source
+def scan_page_metadata(source: str) -> PageMetadata:
+    """Locate the head tags and the hero's title, summary and SEO description in one pass.
+
+    A single regex skips to the next tag the scan cares about (comments and script and
+    style bodies are stepped over), and the scan ends once the head is closed and the
+    hero is resolved, so the rest of a long page is never read. The description and
+    canonical tags are looked for inside ``<head>`` only; the hero summary is the ``<p>``
+    right after the first ``<h1>`` that follows ``<section class="hero">``.
+    """
+    found: dict[str, object] = {}
+    hero = ""  # "", "section", "h1", then "done"
+    hero_start = 0
+    in_head = True
+    position = 0
+    while hero != "done" or (in_head and not ("description" in found and "canonical" in found)):
+        match = METADATA_TOKEN.search(source, position)
+        if not match:
+            break
+        if not match.group(2):
+            end = source.find("-->", match.end())
+            position = len(source) if end < 0 else end + 3
+            continue
+        rest = TAG_REST.match(source, match.end())
+        if not rest:
+            position = match.end()
+            continue
+        position = rest.end()
+        name, closing, attrs = match.group(2).lower(), bool(match.group(1)), rest.group(1)
+        if closing:
+            if name == "title" and "title_end" not in found and source[match.start() : position] == "</title>":
+                found["title_end"] = position
+            elif name == "head":
+                in_head = False
+            elif name == "h1" and hero == "h1":
+                found["hero_title"] = text_content(source[hero_start : match.start()])
+                # Only whitespace may separate the heading from its summary paragraph.
+                paragraph = HERO_PARAGRAPH.match(source, position)
+                end = PARAGRAPH_END.search(source, paragraph.end()) if paragraph else None
+                if end:
+                    found["hero_summary"] = source[paragraph.end() : end.start()]
+                hero = "done"
+            continue
+        if name in RAW_TEXT_END:
+            end = RAW_TEXT_END[name].search(source, position)
+            position = end.start() if end else len(source)
+        elif name == "body":
+            in_head = False
+        elif in_head and name == "meta" and "description" not in found and DESCRIPTION_META_ATTRS.fullmatch(attrs):
+            found["description"] = (match.start(), position)
+        elif in_head and name == "link" and "canonical" not in found and CANONICAL_LINK_ATTRS.fullmatch(attrs):
+            found["canonical"] = (match.start(), position)
+        elif name == "section" and not hero and HERO_SECTION_ATTRS.match(attrs):
+            seo_match = SEO_DESCRIPTION_ATTR.search(attrs)
+            found["seo_description"] = seo_match.group(1) if seo_match else None
+            hero = "section"
+        elif name == "h1" and hero == "section":
+            hero, hero_start = "h1", position
+    return PageMetadata(**found)
+
+
+def splice(source: str, edits: list[tuple[int, int, str]]) -> str:
+    """Replace each ``(start, end)`` span with its text; equal offsets keep their list order."""
+    parts: list[str] = []
+    position = 0
+    for start, end, text in sorted(edits, key=lambda edit: edit[:2]):
+        parts.append(source[position:start])
+        parts.append(text)
+        position = end
+    parts.append(source[position:])
+    return "".join(parts)
+
+
+def upsert_head_metadata(
+    source: str,
+    description: str,
+    canonical_url: str,
+    metadata: PageMetadata | None = None,
+) -> str:
+    """Replace the description and canonical tags, or add them after ``</title>``."""
+    metadata = metadata or scan_page_metadata(source)
+    description_tag = META_DESCRIPTION_TAG.render(description=description)
+    canonical_tag = CANONICAL_LINK_TAG.render(canonical=canonical_url)
+    edits: list[tuple[int, int, str]] = []
+    anchor = None
+    if metadata.description:
+        edits.append((*metadata.description, description_tag))
+        anchor = metadata.description[1]
+    elif metadata.title_end is not None:
+        edits.append((metadata.title_end, metadata.title_end, f"\n  {description_tag}"))
+        anchor = metadata.title_end
+    if metadata.canonical:
+        edits.append((*metadata.canonical, canonical_tag))
+    elif anchor is not None:
+        edits.append((anchor, anchor, f"\n  {canonical_tag}"))
+    return splice(source, edits)
 
 
 def update_detail_metadata(path: Path, source: str) -> str:
-    hero_match = re.search(
-        r'<section\s+class="hero"[^>]*>[\s\S]*?<h1[^>]*>[\s\S]*?</h1>\s*<p[^>]*>([\s\S]*?)</p>',
-        source,
-        re.IGNORECASE,
-    )
-    if not hero_match:
+    metadata = scan_page_metadata(source)
+    if metadata.hero_summary is None:
         raise RuntimeError(f"Could not find a hero summary in {path.relative_to(ROOT)}")
-    seo_description_match = re.search(
-        r'<section\s+class="hero"[^>]*\sdata-seo-description="([^"]+)"',
-        source,
-        re.IGNORECASE,
-    )
     description = (
-        html.unescape(seo_description_match.group(1)).strip()
-        if seo_description_match
-        else text_content(hero_match.group(1))
+        html.unescape(metadata.seo_description).strip()
+        if metadata.seo_description
+        else text_content(metadata.hero_summary)
     )
     canonical = f"{SITE_ORIGIN}/pages/projects/{path.name}"
-    return upsert_head_metadata(source, description, canonical)
+    return upsert_head_metadata(source, description, canonical, metadata)
 
 
-def write_or_check(path: Path, content: str, check: bool, stale: list[str]) -> None:
-    current = path.read_text(encoding="utf-8")
-    if current == content:
-        return
-    if check:
-        stale.append(str(path.relative_to(ROOT)))
-        return
-    path.write_text(content, encoding="utf-8")
-    print(f"Updated: {path.relative_to(ROOT)}")
+def case_study_value(case_study: dict, *keys: str) -> str:
+    for key in keys:
+        value = str(case_study.get(key) or "").strip()
+        if value:
+            return value
+    return ""
 
 
-def main() -> int:
-    args = parse_args()
-    page_source = PROJECTS_PAGE.read_text(encoding="utf-8")
-    supabase_url, anon_key, bucket = read_public_config()
-    case_studies = load_case_studies()
+def render_case_study_section(case_study: dict, evidence_id: str | None, indent: str) -> str:
+    """The case-study section ``js/project-case-study.js`` would insert after the hero."""
+    lines = [
+        '<section class="project-section project-case-study" aria-labelledby="project-case-study-title">',
+        '  <div class="case-study-heading">',
+        "    <div>",
+        '      <div class="case-study-eyebrow">Professional case study</div>',
+        '      <h2 class="standard-h2" id="project-case-study-title">Problem to Operational Value</h2>',
+        "    </div>",
+        "  </div>",
+    ]
+    context = case_study_value(case_study, "context")
+    if context:
+        lines += [
+            '  <div class="case-study-context">',
+            '    <div class="case-study-step-label">Business / operational context</div>',
+            f'    <p class="case-study-context-text">{html.escape(context)}</p>',
+            "  </div>",
+        ]
+    steps = []
+    for label, keys, modifier in CASE_STUDY_STEPS:
+        value = case_study_value(case_study, *keys)
+        if not value:
+            continue
+        if modifier == "case-study-step-impact":
+            label = case_study_value(case_study, "impact_label") or label
+        steps += [
+            f'    <article class="case-study-step {modifier}">',
+            f'      <div class="case-study-step-label">{html.escape(label)}</div>',
+            f'      <p class="case-study-step-text">{html.escape(value)}</p>',
+            "    </article>",
+        ]
+    if steps:
+        lines += ['  <div class="case-study-flow">', *steps, "  </div>"]
+    footer = []
+    tools = case_study.get("tools") if isinstance(case_study.get("tools"), list) else []
+    tags = "".join(f"<span>{html.escape(str(tool).strip())}</span>" for tool in tools if str(tool or "").strip())
+    if tags:
+        footer.append(f'    <div class="case-study-tools" aria-label="Tools and technologies">{tags}</div>')
+    evidence = case_study.get("evidence")
+    if evidence_id and isinstance(evidence, list) and evidence:
+        footer.append(
+            f'    <a class="case-study-evidence-link" href="#{html.escape(evidence_id, quote=True)}">'
+            "View visual evidence ↓</a>"
+        )
+    if footer:
+        lines += ['  <div class="case-study-footer">', *footer, "  </div>"]
+    lines.append("</section>")
+    return "\n".join(f"{indent}{line}" for line in lines)
 
-    if args.offline:
-        projects = load_embedded_projects(page_source)
-    else:
+
+def update_case_study_section(path: Path, source: str, case_study: dict | None) -> str:
+    """Render the page's case study between markers after its hero, replacing an earlier one.
+
+    Only pages that load ``js/project-case-study.js`` get the section (the investigation
+    pages lay out their case study by hand). The evidence link targets the screenshots
+    or media section, which is given the script's ``project-evidence`` id if it has none.
+    """
+    source = CASE_STUDY_BLOCK.sub("", source, count=1)
+    if not case_study or not CASE_STUDY_SCRIPT.search(source):
+        return source
+    hero = HERO_SECTION.search(source)
+    if not hero:
+        raise RuntimeError(f"Could not find the hero section in {path.relative_to(ROOT)}")
+    depth = 1
+    hero_end = len(source)
+    for tag in SECTION_TAG.finditer(source, hero.end()):
+        depth += -1 if tag.group(1) else 1
+        if not depth:
+            hero_end = tag.end()
+            break
+    edits: list[tuple[int, int, str]] = []
+    evidence_id = None
+    for pattern in EVIDENCE_SECTIONS:
+        target = pattern.search(source)
+        if not target:
+            continue
+        id_match = ID_ATTR.search(target.group("attrs"))
+        evidence_id = id_match.group(1) if id_match and id_match.group(1) else "project-evidence"
+        if not id_match:
+            edits.append((target.end("attrs"), target.end("attrs"), f' id="{evidence_id}"'))
+        break
+    indent = hero.group(1)
+    section = render_case_study_section(case_study, evidence_id, indent)
+    edits.append((hero_end, hero_end, f"\n\n{indent}{CASE_STUDY_START}\n{section}\n{indent}{CASE_STUDY_END}"))
+    return splice(source, edits)
+
+
+def case_study_text(value: object) -> list[str]:
+    if isinstance(value, dict):
+        # ``source`` only lists the page sections a field was taken from.
+        return [text for key, item in value.items() if key != "source" for text in case_study_text(item)]
+    if isinstance(value, list):
+        return [text for item in value for text in case_study_text(item)]
+    text = str(value or "").strip()
+    return [text] if text else []
+
+
+def search_documents(projects: list[dict]) -> list[SearchDocument]:
+    documents = []
+    for project in projects:
+        href = str(project["href"]).split("#", 1)[0].split("?", 1)[0]
+        description = str(project.get("description") or "").strip()
+        documents.append(
+            SearchDocument(
+                key=f"projects/{href_to_slug(href)}",
+                url=f"/pages/{href}",
+                title=str(project.get("title") or "").strip(),
+                snippet=description,
+                text="\n".join([description, *case_study_text(project.get("case_study"))]),
+            )
+        )
+    return documents
+
+
+def write_or_check(writer: OutputWriter, path: Path, content: str) -> None:
+    if writer.write_text(path, content) and not writer.check:
+        print(f"Updated: {path.relative_to(ROOT)}")
+
+
+def load_projects(offline: bool) -> list[dict]:
+    """Published project rows from the content store, synced first unless ``offline``.
+
+    A store that has never held the projects falls back to the snapshot
+    pages/projects.html points at, so a fresh checkout still builds offline.
+    """
+    if not offline:
         try:
-            projects = fetch_public_projects(supabase_url, anon_key)
+            sync_tables(["projects"])
         except Exception as exc:
-            projects = load_embedded_projects(page_source)
-            if not projects:
-                raise RuntimeError(f"Could not fetch projects and no embedded snapshot exists: {exc}") from exc
-            print(f"Warning: Supabase fetch failed; using embedded snapshot: {exc}", file=sys.stderr)
-
-    projects = merge_projects(projects, case_studies)
+            print(
+                f"Warning: syncing projects from Supabase failed; building from local rows: {exc}",
+                file=sys.stderr,
+            )
+    if table_state("projects") is not None:
+        return table_rows("projects")
+    projects = load_embedded_projects(PROJECTS_PAGE.read_text(encoding="utf-8"))
     if not projects:
-        raise RuntimeError("No published projects were available for pre-rendering")
+        raise EmptyStoreError("projects")
+    print("Warning: the content store has no projects rows; using the project snapshot.", file=sys.stderr)
+    return projects
+
 
-    page_source = replace_static_projects(page_source, projects, supabase_url, bucket)
+def render_projects_page(
+    projects: list[dict],
+    assets: dict[str, str],
+    inline_css: bool,
+    snapshot_path: Path,
+) -> str:
+    config = read_public_config()
+    page_source = PROJECTS_PAGE.read_text(encoding="utf-8")
+    page_source = replace_static_projects(page_source, projects, config.url, config.assets_bucket, snapshot_path)
     page_source = upsert_head_metadata(
         page_source,
         "Professional case studies in technical operations, fleet maintenance, inventory control, and operational analytics.",
         f"{SITE_ORIGIN}/pages/projects.html",
     )
+    page_source = rewrite_asset_urls(page_source, assets)
+    if inline_css:
+        page_source = inline_critical_css(page_source, critical_css("projects-index", [page_source]))
+    return page_source
+
+
+def detail_pages() -> list[Path]:
+    return [path for path in sorted(PROJECT_DETAILS_DIR.glob("*.html")) if path.name != PROJECT_TEMPLATE_NAME]
+
+
+def render_detail_page(path: Path, assets: dict[str, str], case_study: dict | None) -> str:
+    """A detail page with its case study, refreshed head metadata and asset URLs, before any critical CSS."""
+    source = update_detail_metadata(path, path.read_text(encoding="utf-8"))
+    return rewrite_asset_urls(update_case_study_section(path, source, case_study), assets)
+
+
+def detail_critical_css(details: dict[Path, str]) -> str:
+    """One critical subset for every detail page (they share a layout); ``details`` overrides disk."""
+    return critical_css(
+        "project-detail", [details.get(path) or path.read_text(encoding="utf-8") for path in detail_pages()]
+    )
+
+
+def write_detail_page(writer: OutputWriter, path: Path, updated: str, detail_css: str | None) -> None:
+    write_or_check(writer, path, inline_critical_css(updated, detail_css) if detail_css is not None else updated)
+
+
+def renderer_version(inline_css: bool) -> str:
+    """Fingerprint of this script and the page shell, plus the critical CSS sources when inlining."""
+    digest = hashlib.sha256()
+    paths = [Path(__file__), Path(page_shell.__file__)]
+    if inline_css:
+        digest.update(f"critical-css {CRITICAL_CSS_VERSION}".encode("utf-8"))
+        paths += [STYLESHEET_PATH, *SAFELIST_SCRIPTS]
+    for path in paths:
+        digest.update(path.read_bytes() if path.exists() else b"")
+    return digest.hexdigest()
+
+
+def content_hash(payload: object) -> str:
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def disk_digest(path: Path, record: OutputRecord | None) -> str:
+    """SHA-256 of ``path``, taken from its output record while the file's stat still matches it."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return ""
+    if record and record[1:] == [stat.st_size, stat.st_mtime_ns]:
+        return record[0]
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def detail_css_key(version: str, assets: dict[str, str], digests: dict[Path, str]) -> str:
+    return content_hash([version, assets, sorted((path.name, digest) for path, digest in digests.items())])
+
 
-    stale: list[str] = []
-    write_or_check(PROJECTS_PAGE, page_source, args.check, stale)
+def load_input_cache() -> dict:
+    try:
+        payload = json.loads(INPUT_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(payload, dict) or payload.get("version") != INPUT_CACHE_VERSION:
+        return {}
+    return payload
 
-    for path in sorted(PROJECT_DETAILS_DIR.glob("*.html")):
-        if path.name == "project-template.html":
+
+def save_input_cache(pages: dict[str, str], detail_css: list[str] | None) -> None:
+    payload = {"version": INPUT_CACHE_VERSION, "pages": dict(sorted(pages.items())), "detail_css": detail_css}
+    BUILD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    INPUT_CACHE_PATH.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+
+# (rel_path, page already rendered in the parent or None, case study, asset map, critical CSS, previous record, check)
+DetailJob = tuple[str, str | None, dict | None, dict[str, str], str | None, OutputRecord | None, bool]
+
+
+def write_detail_job(job: DetailJob) -> tuple[str, OutputRecord | None, bool]:
+    """Render (unless the parent already did) and write or compare one detail page.
+
+    Module-level so worker processes can run it; like the blog's post jobs, the page's
+    previous record travels with the job and the new one comes back to the parent.
+    """
+    rel_path, updated, case_study, assets, detail_css, record, check = job
+    path = ROOT / rel_path
+    if updated is None:
+        with span("render detail page", "render", path=path):
+            updated = render_detail_page(path, assets, case_study)
+    if detail_css is not None:
+        updated = inline_critical_css(updated, detail_css)
+    record, changed = write_if_changed(path, updated.encode("utf-8"), record, check)
+    return rel_path, record, changed
+
+
+def write_detail_pages(writer: OutputWriter, jobs: list[DetailJob], workers: int, fail_fast: bool) -> list[str]:
+    """Run ``jobs`` (in a process pool when ``workers`` > 1), record their results and
+    return the rel_paths of the pages that were actually written or compared.
+
+    With ``fail_fast`` the first stale page ends the run and queued jobs are cancelled;
+    their pages are left out of the result, so they are not cached as current.
+    """
+    results: dict[str, tuple[OutputRecord | None, bool]] = {}
+    if workers > 1 and len(jobs) > 1:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(jobs)))
+        try:
+            for future in as_completed([pool.submit(write_detail_job, job) for job in jobs]):
+                rel_path, record, changed = future.result()
+                results[rel_path] = record, changed
+                if changed and fail_fast:
+                    break
+        finally:
+            pool.shutdown(cancel_futures=True)
+    else:
+        for job in jobs:
+            rel_path, record, changed = write_detail_job(job)
+            results[rel_path] = record, changed
+            if changed and fail_fast:
+                break
+    # Recorded in job order, so the change report does not depend on which worker finished first.
+    processed = [job[0] for job in jobs if job[0] in results]
+    for rel_path in processed:
+        record, changed = results[rel_path]
+        if writer.record(ROOT / rel_path, record, changed) and not writer.check:
+            print(f"Updated: {rel_path}")
+    return processed
+
+
+def report_stale(writer: OutputWriter) -> int:
+    writer.save()
+    print("Project pre-render output is stale:", file=sys.stderr)
+    for item in writer.changed:
+        print(f"- {item}", file=sys.stderr)
+    return 1
+
+
+def run(
+    args: argparse.Namespace,
+    projects: list[dict] | None = None,
+    assets: dict[str, str] | None = None,
+) -> int:
+    """Render the project pages; ``build_site.py`` passes in rows and assets it already has.
+
+    ``.build-cache/prerender-projects.json`` keeps an input hash per page from the last
+    run that left it current: its bytes on disk plus everything it is rendered from. A
+    page whose hash still matches is skipped without being rendered, in check mode too.
+    """
+    rows = projects
+    if rows is None:
+        with span("load projects"):
+            rows = load_projects(args.offline)
+    case_studies = load_case_studies()
+    with span("merge projects"):
+        projects = merge_projects(rows, case_studies)
+    if not projects:
+        raise RuntimeError("No published projects were available for pre-rendering")
+
+    writer = OutputWriter("prerender-projects", check=args.check, report_path=args.changes_file)
+    if assets is None:
+        with span("fingerprint assets"):
+            assets = fingerprint_assets(writer)
+    version = renderer_version(args.critical_css)
+    cache = load_input_cache()
+    cached_pages = cache.get("pages") if isinstance(cache.get("pages"), dict) else {}
+    fresh: dict[str, str] = {}
+
+    with span("project snapshot"):
+        snapshot_path = write_project_snapshot(writer, projects, args.trim_snapshot)
+    page_path = writer.rel_path(PROJECTS_PAGE)
+    page_inputs = [version, assets, projects, writer.rel_path(snapshot_path)]
+    page_digest = disk_digest(PROJECTS_PAGE, writer.record_for(PROJECTS_PAGE))
+    if cached_pages.get(page_path) != content_hash([page_digest, page_inputs]):
+        with span("render projects page", "render"):
+            page = render_projects_page(projects, assets, args.critical_css, snapshot_path)
+        write_or_check(writer, PROJECTS_PAGE, page)
+        if args.fail_fast and writer.changed:
+            return report_stale(writer)
+        page_digest = (writer.record_for(PROJECTS_PAGE) or [""])[0]
+    if page_digest:
+        fresh[page_path] = content_hash([page_digest, page_inputs])
+
+    pages = detail_pages()
+    with span("hash detail pages", pages=len(pages)):
+        digests = {path: disk_digest(path, writer.record_for(path)) for path in pages}
+    details: dict[Path, str] = {}
+    detail_css = None
+    css_entry = None
+    if args.critical_css:
+        cached_css = cache.get("detail_css")
+        if isinstance(cached_css, list) and cached_css[:1] == [detail_css_key(version, assets, digests)]:
+            detail_css = cached_css[1]
+        else:
+            # The shared subset depends on every page, so a miss renders them all here.
+            for path in pages:
+                with span("render detail page", "render", path=path):
+                    details[path] = render_detail_page(path, assets, case_studies.get(path.stem))
+            with span("critical css"):
+                detail_css = detail_critical_css(details)
+    shared = content_hash([version, assets, detail_css])
+
+    def inputs_for(path: Path, digest: str) -> str:
+        return content_hash([digest, case_studies.get(path.stem), shared])
+
+    jobs: list[DetailJob] = []
+    current: dict[Path, str] = {}
+    for path in pages:
+        if cached_pages.get(writer.rel_path(path)) == inputs_for(path, digests[path]):
+            current[path] = digests[path]
             continue
-        source = path.read_text(encoding="utf-8")
-        updated = update_detail_metadata(path, source)
-        write_or_check(path, updated, args.check, stale)
-
-    if stale:
-        print("Project pre-render output is stale:", file=sys.stderr)
-        for item in stale:
-            print(f"- {item}", file=sys.stderr)
-        return 1
+        case_study = case_studies.get(path.stem)
+        record = writer.record_for(path)
+        jobs.append((writer.rel_path(path), details.get(path), case_study, assets, detail_css, record, args.check))
+    with span("detail pages", pages=len(jobs), jobs=args.jobs):
+        processed = write_detail_pages(writer, jobs, args.jobs, args.fail_fast)
+    for rel_path in processed:
+        record = writer.record_for(ROOT / rel_path)
+        if record:
+            current[ROOT / rel_path] = record[0]
+    fresh.update({writer.rel_path(path): inputs_for(path, digest) for path, digest in current.items()})
+    if args.critical_css and len(current) == len(pages):
+        css_entry = [detail_css_key(version, assets, current), detail_css]
+    save_input_cache(fresh, css_entry)
+    if args.fail_fast and writer.changed:
+        return report_stale(writer)
+
+    with span("search index", documents=len(projects)):
+        update_search_index("projects", search_documents(projects), writer)
+
+    if args.check and writer.changed:
+        return report_stale(writer)
+    writer.save()
 
     print(f"Pre-rendered {len(projects)} published projects.")
     return 0
 
 
+def watch_projects(args: argparse.Namespace) -> None:
+    """Re-render only what each edit affects, from the rows, asset map and detail CSS the build left behind."""
+    rows = load_projects(offline=True)
+    assets = load_asset_manifest()
+    cached_css = load_input_cache().get("detail_css")
+    state = {"detail_css": cached_css[1] if args.critical_css and isinstance(cached_css, list) else None}
+
+    def rebuild(changed: set[Path]) -> list[Path]:
+        writer = OutputWriter("prerender-projects", report_path=args.changes_file)
+        case_studies = load_case_studies()
+        if CASE_STUDIES_PATH in changed or PROJECTS_PAGE in changed:
+            projects = merge_projects(rows, case_studies)
+            snapshot_path = write_project_snapshot(writer, projects, args.trim_snapshot)
+            page = render_projects_page(projects, assets, args.critical_css, snapshot_path)
+            write_or_check(writer, PROJECTS_PAGE, page)
+            update_search_index("projects", search_documents(projects), writer)
+        # Detail pages render their case study, so an edit to the data touches all of them.
+        pages = [path for path in detail_pages() if path in changed or CASE_STUDIES_PATH in changed]
+        details = {path: render_detail_page(path, assets, case_studies.get(path.stem)) for path in pages}
+        if details and args.critical_css:
+            css = detail_critical_css(details)
+            if css != state["detail_css"]:
+                # The shared subset moved, so every detail page needs the new one inlined.
+                details = {
+                    path: details.get(path) or render_detail_page(path, assets, case_studies.get(path.stem))
+                    for path in detail_pages()
+                }
+                state["detail_css"] = css
+        for path, updated in details.items():
+            write_detail_page(writer, path, updated, state["detail_css"])
+        writer.save()
+        return [ROOT / rel_path for rel_path in writer.changed]
+
+    watch([CASE_STUDIES_PATH, PROJECTS_PAGE, PROJECT_DETAILS_DIR], rebuild, polling=args.poll)
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        with profile_run("prerender-projects", args.profile):
+            code = run(args)
+    except EmptyStoreError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    if args.watch and code == 0:
+        watch_projects(args)
+    return code
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,263 @@
+"""Static, sharded full-text search index for blog posts and project case studies.
+
+Terms are accent-folded, lowercased ``[a-z0-9]`` runs. Each shard under
+``data/search`` holds the terms sharing a two-character prefix, mapping each term
+to delta-encoded ``[document, [positions]]`` postings, so ``js/site-search.js``
+fetches only the shards a query touches (one per query term, and one for a
+type-ahead prefix). Document metadata lives in fixed-size chunks fetched only for
+the results shown, and ``index.json`` lists the shards, the stopwords and the
+document lengths BM25 ranking needs.
+
+Each generator owns one source (``blog``, ``projects``) and updates it in place:
+only documents whose digest changed are re-tokenized, and only the shards their
+old or new terms fall into are rewritten. Document numbers are stable, so other
+shards and the other source's postings are never touched. The terms a source last
+indexed are cached in ``.build-cache``; without that cache every shard is scanned
+once to drop the source's outdated postings.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+
+from build_output import BUILD_CACHE_DIR, ROOT, OutputWriter
+
+
+SEARCH_DIR = ROOT / "data" / "search"
+SEARCH_MANIFEST_PATH = SEARCH_DIR / "index.json"
+SEARCH_INDEX_VERSION = 1
+DOCUMENT_CHUNK_SIZE = 256
+PREFIX_LENGTH = 2
+MAX_POSITIONS = 16
+SNIPPET_LENGTH = 180
+SEARCH_STOPWORDS = frozenset(
+    """a an and are as at be but by for from has have in into is it its of on or that the
+    their this to was were which will with""".split()
+)
+SEARCH_TERM = re.compile(r"[a-z0-9]+")
+MARKDOWN_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+SEARCH_INDEX_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class SearchDocument:
+    """One searchable page; ``key`` is ``<source>/<slug>`` and ``text`` follows the title."""
+
+    key: str
+    url: str
+    title: str
+    snippet: str
+    text: str
+
+
+def search_terms(text: str) -> list[str]:
+    """Accent-folded, lowercased word tokens; the browser loader tokenizes queries the same way."""
+    folded = unicodedata.normalize("NFKD", text)
+    folded = "".join(char for char in folded if not unicodedata.combining(char)).lower()
+    return SEARCH_TERM.findall(folded)
+
+
+def markdown_text(body: str) -> str:
+    """Body text with link and image targets dropped, so URLs do not become terms."""
+    return MARKDOWN_LINK.sub(r"\1", body)
+
+
+def document_digest(document: SearchDocument) -> str:
+    payload = json.dumps([document.url, document.title, document.snippet, document.text])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def document_postings(document: SearchDocument) -> tuple[dict[str, list[int]], int, int]:
+    """Term positions (capped per term) plus the token counts of the whole document and its title."""
+    title_tokens = search_terms(document.title)
+    tokens = title_tokens + search_terms(document.text)
+    postings: dict[str, list[int]] = {}
+    for position, term in enumerate(tokens):
+        if len(term) < PREFIX_LENGTH or term in SEARCH_STOPWORDS:
+            continue
+        positions = postings.setdefault(term, [])
+        if len(positions) < MAX_POSITIONS:
+            positions.append(position)
+    return postings, len(tokens), len(title_tokens)
+
+
+def encode_postings(postings: list[tuple[int, list[int]]]) -> list:
+    encoded: list = []
+    previous = 0
+    for number, positions in sorted(postings):
+        encoded.append(number - previous)
+        encoded.append([positions[0]] + [b - a for a, b in zip(positions, positions[1:])])
+        previous = number
+    return encoded
+
+
+def decode_postings(encoded: list) -> list[tuple[int, list[int]]]:
+    postings: list[tuple[int, list[int]]] = []
+    number = 0
+    for delta, deltas in zip(encoded[::2], encoded[1::2]):
+        number += delta
+        positions: list[int] = []
+        for step in deltas:
+            positions.append((positions[-1] if positions else 0) + step)
+        postings.append((number, positions))
+    return postings
+
+
+def shard_path(prefix: str) -> Path:
+    return SEARCH_DIR / f"terms-{prefix}.json"
+
+
+def chunk_path(chunk: int) -> Path:
+    return SEARCH_DIR / f"docs-{chunk}.json"
+
+
+def read_json(path: Path, default: object) -> object:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return default
+
+
+def load_search_manifest() -> dict:
+    manifest = read_json(SEARCH_MANIFEST_PATH, {})
+    if not isinstance(manifest, dict) or manifest.get("version") != SEARCH_INDEX_VERSION:
+        return {}
+    return manifest
+
+
+def load_documents(manifest: dict) -> list[list | None]:
+    """Every document slot from the committed chunks; ``None`` marks a free number."""
+    entries: list[list | None] = []
+    for chunk in range(int(manifest.get("chunks", 0))):
+        payload = read_json(chunk_path(chunk), [])
+        entries.extend(payload if isinstance(payload, list) else [])
+    lengths = manifest.get("lengths", [])
+    if len(lengths) != len(entries):
+        return []
+    return [
+        entry[:4] + length + entry[4:] if entry and length else None for entry, length in zip(entries, lengths)
+    ]
+
+
+def load_source_cache(source: str) -> dict[str, dict[str, list[int]]]:
+    payload = read_json(BUILD_CACHE_DIR / f"search-{source}.json", {})
+    if not isinstance(payload, dict) or payload.get("version") != SEARCH_INDEX_VERSION:
+        return {}
+    documents = payload.get("documents")
+    return documents if isinstance(documents, dict) else {}
+
+
+def update_search_index(source: str, documents: list[SearchDocument], writer: OutputWriter) -> int:
+    """Bring ``source``'s documents in the index up to date; returns how many changed."""
+    # build_site.py may run both generators at once, and they share these files.
+    with SEARCH_INDEX_LOCK:
+        manifest = load_search_manifest()
+        slots = load_documents(manifest)
+        numbers = {entry[0]: number for number, entry in enumerate(slots) if entry}
+        cached = load_source_cache(source)
+        prefix = f"{source}/"
+        wanted = {document.key: document for document in documents}
+
+        dirty: set[int] = set()
+        touched: set[str] = set()
+        scan_all = False
+        new_terms: dict[int, dict[str, list[int]]] = {}
+        terms_by_key: dict[str, dict[str, list[int]]] = {}
+        for key, number in numbers.items():
+            if not key.startswith(prefix):
+                continue
+            document = wanted.get(key)
+            if document is not None and slots[number][-1] == document_digest(document) and key in cached:
+                terms_by_key[key] = cached[key]
+                continue
+            dirty.add(number)
+            if key in cached:
+                touched.update(term[:PREFIX_LENGTH] for term in cached[key])
+            else:
+                scan_all = True
+            if document is None:
+                slots[number] = None
+
+        free = [number for number, entry in enumerate(slots) if entry is None]
+        free.reverse()
+        for key, document in wanted.items():
+            number = numbers.get(key)
+            if number is not None and number not in dirty:
+                continue
+            if number is None:
+                number = free.pop() if free else len(slots)
+                if number == len(slots):
+                    slots.append(None)
+                dirty.add(number)
+            postings, length, title_length = document_postings(document)
+            snippet = " ".join(document.snippet.split())[:SNIPPET_LENGTH]
+            slots[number] = [key, document.url, document.title, snippet, length, title_length, document_digest(document)]
+            new_terms[number] = postings
+            terms_by_key[key] = postings
+            touched.update(term[:PREFIX_LENGTH] for term in postings)
+
+        shards = set(manifest.get("shards", []))
+        if scan_all:
+            touched |= shards
+        for shard in sorted(touched):
+            terms = read_json(shard_path(shard), {}) if shard in shards else {}
+            updated: dict[str, list] = {}
+            for term, encoded in (terms if isinstance(terms, dict) else {}).items():
+                kept = [posting for posting in decode_postings(encoded) if posting[0] not in dirty]
+                if kept:
+                    updated[term] = kept
+            for number, postings in new_terms.items():
+                for term, positions in postings.items():
+                    if term.startswith(shard):
+                        updated.setdefault(term, []).append((number, positions))
+            path = shard_path(shard)
+            if updated:
+                payload = {term: encode_postings(updated[term]) for term in sorted(updated)}
+                writer.write_text(path, json.dumps(payload, separators=(",", ":")) + "\n")
+                shards.add(shard)
+            elif shard in shards:
+                if path.exists():
+                    writer.remove(path)
+                shards.discard(shard)
+
+        while slots and slots[-1] is None:
+            slots.pop()
+        chunk_count = -(-len(slots) // DOCUMENT_CHUNK_SIZE)
+        for chunk in range(chunk_count):
+            entries = [
+                entry[:4] + entry[6:] if entry else None
+                for entry in slots[chunk * DOCUMENT_CHUNK_SIZE : (chunk + 1) * DOCUMENT_CHUNK_SIZE]
+            ]
+            writer.write_text(chunk_path(chunk), json.dumps(entries, ensure_ascii=False, separators=(",", ":")) + "\n")
+        for chunk in range(chunk_count, int(manifest.get("chunks", 0))):
+            if chunk_path(chunk).exists():
+                writer.remove(chunk_path(chunk))
+
+        live = [entry for entry in slots if entry]
+        payload = {
+            "version": SEARCH_INDEX_VERSION,
+            "prefix_length": PREFIX_LENGTH,
+            "chunk_size": DOCUMENT_CHUNK_SIZE,
+            "chunks": chunk_count,
+            "documents": len(live),
+            "average_length": round(sum(entry[4] for entry in live) / len(live), 2) if live else 0,
+            "stopwords": sorted(SEARCH_STOPWORDS),
+            "shards": sorted(shards),
+            # ``[tokens, title tokens]`` per document number, for BM25 before any chunk is fetched.
+            "lengths": [entry[4:6] if entry else 0 for entry in slots],
+        }
+        writer.write_text(SEARCH_MANIFEST_PATH, json.dumps(payload, separators=(",", ":")) + "\n")
+
+        if not writer.check:
+            BUILD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            (BUILD_CACHE_DIR / f"search-{source}.json").write_text(
+                json.dumps({"version": SEARCH_INDEX_VERSION, "documents": terms_by_key}, separators=(",", ":")) + "\n",
+                encoding="utf-8",
+            )
+        return len(new_terms) + sum(1 for number in dirty if number not in new_terms)
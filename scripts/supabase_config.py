@@ -0,0 +1,39 @@
+"""Public Supabase settings shared by the site build scripts.
+
+``js/supabase-config.js`` is parsed once per process, so scripts that run together
+under ``build_site.py`` share one copy instead of each re-reading the file.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import cache
+
+from build_output import ROOT
+
+
+SUPABASE_CONFIG_PATH = ROOT / "js" / "supabase-config.js"
+DEFAULT_ASSETS_BUCKET = "resume-cms"
+
+
+@dataclass(frozen=True)
+class SupabaseConfig:
+    url: str
+    anon_key: str
+    assets_bucket: str = DEFAULT_ASSETS_BUCKET
+
+
+@cache
+def read_public_config() -> SupabaseConfig:
+    source = SUPABASE_CONFIG_PATH.read_text(encoding="utf-8")
+    url_match = re.search(r"\burl:\s*['\"]([^'\"]+)['\"]", source)
+    key_match = re.search(r"\banonKey:\s*['\"]([^'\"]+)['\"]", source)
+    bucket_match = re.search(r"\bassetsBucket:\s*['\"]([^'\"]+)['\"]", source)
+    if not url_match or not key_match:
+        raise RuntimeError("Supabase public URL or anon key was not found in js/supabase-config.js")
+    return SupabaseConfig(
+        url=url_match.group(1).rstrip("/"),
+        anon_key=key_match.group(1),
+        assets_bucket=bucket_match.group(1) if bucket_match else DEFAULT_ASSETS_BUCKET,
+    )
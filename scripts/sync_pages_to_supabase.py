@@ -19,6 +19,10 @@ Options:
   --source-url-base  Fetch HTML from a deployed site (for example GitHub Pages) instead of local files.
                     Use a trailing slash, e.g. https://example.com/Resume/
   --paths       Limit the sync to specific relative paths (defaults to all public HTML files).
+  --all         Upload every page, including pages whose HTML already matches cms_pages.
+  --offline     With --dry-run, compare against the cms_pages rows in the local content store
+                instead of syncing them from Supabase first.
+  --profile     Write a Chrome trace of where the sync spends its time (fetches, upserts).
 """
 
 from __future__ import annotations
@@ -35,6 +39,9 @@ import urllib.request
 from pathlib import Path
 from urllib.parse import urljoin, urlparse, urlencode
 
+from build_profile import add_profile_argument, profile_run, span
+from content_store import CONTENT_TABLES, sync_tables, table_rows
+
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 
@@ -61,7 +68,7 @@ def _sign_in_with_password(supabase_url: str, anon_key: str, email: str, passwor
     req.add_header("Content-Type", "application/json")
     req.add_header("Accept", "application/json")
     try:
-        with urllib.request.urlopen(req, timeout=25) as r:
+        with span("sign in", "network"), urllib.request.urlopen(req, timeout=25) as r:
             data = json.loads(r.read().decode("utf-8", errors="replace") or "{}")
     except urllib.error.HTTPError as e:
         body = e.read().decode("utf-8", errors="replace")
@@ -90,10 +97,11 @@ def _upsert_pages_via_rest(
     req.add_header("Accept", "application/json")
 
     try:
-        with urllib.request.urlopen(req, timeout=60) as r:
-            _ = r.read()
-            if r.status < 200 or r.status >= 300:
-                raise RuntimeError(f"Upsert failed (HTTP {r.status})")
+        with span("upsert pages", "network", pages=len(rows), bytes=len(payload)):
+            with urllib.request.urlopen(req, timeout=60) as r:
+                _ = r.read()
+                if r.status < 200 or r.status >= 300:
+                    raise RuntimeError(f"Upsert failed (HTTP {r.status})")
     except urllib.error.HTTPError as e:
         body = e.read().decode("utf-8", errors="replace")
         raise RuntimeError(f"Upsert failed (HTTP {e.code}): {body[:400]}") from None
@@ -142,6 +150,13 @@ def _safe_rel_html_path(raw: str) -> str:
     return clean
 
 
+def _drop_unchanged(rows: list[dict], published: dict[str, str], table: str) -> list[dict]:
+    changed = [row for row in rows if published.get(row["path"]) != row["html"]]
+    if len(changed) < len(rows):
+        print(f"Skipping {len(rows) - len(changed)} page(s) that already match {table}; use --all to upload them anyway.")
+    return changed
+
+
 def _fetch_html(source_url_base: str, rel_path: str) -> str:
     base = (source_url_base or "").strip()
     if not base:
@@ -162,11 +177,28 @@ def _fetch_html(source_url_base: str, rel_path: str) -> str:
     req = urllib.request.Request(url, method="GET")
     req.add_header("Accept", "text/html,*/*")
     req.add_header("User-Agent", "ResumeCMS/1.0 (sync_pages_to_supabase.py)")
-    with urllib.request.urlopen(req, timeout=30) as r:
+    with span("fetch page", "network", path=rel_path), urllib.request.urlopen(req, timeout=30) as r:
         raw = r.read()
     return raw.decode("utf-8", errors="replace")
 
 
+def _published_pages(table: str, offline: bool) -> dict[str, str]:
+    """HTML per path already in ``table``, read from the local content store (synced first unless ``offline``)."""
+    if table not in CONTENT_TABLES:
+        return {}
+    if not offline:
+        try:
+            sync_tables([table])
+        except Exception as e:  # noqa: BLE001
+            # A stale mirror could hide remote edits, so every page is uploaded instead.
+            print(
+                f"WARNING: Could not sync {table} into the content store; syncing every page: {e}",
+                file=sys.stderr,
+            )
+            return {}
+    return {str(row.get("path") or ""): str(row.get("html") or "") for row in table_rows(table)}
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("--dry-run", action="store_true", help="Only print what would be synced.")
@@ -181,8 +213,25 @@ def main() -> int:
         default=[],
         help="Optional list of relative .html paths to sync (example: index.html pages/about.html). Defaults to all public HTML files.",
     )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Upload every page, even those whose HTML already matches the cms_pages rows in the content store.",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="With --dry-run, compare against the cms_pages rows already in the content store without querying Supabase.",
+    )
+    add_profile_argument(parser, "sync-pages-to-supabase")
     args = parser.parse_args()
+    if args.offline and not args.dry_run:
+        parser.error("--offline requires --dry-run")
+    with profile_run("sync-pages-to-supabase", args.profile):
+        return sync_pages(args)
+
 
+def sync_pages(args: argparse.Namespace) -> int:
     cfg = _parse_supabase_config(REPO_ROOT / "js" / "supabase-config.js")
     supabase_url = str(cfg.get("url") or "").strip()
     anon_key = str(cfg.get("anonKey") or "").strip()
@@ -220,9 +269,15 @@ def main() -> int:
             if not file_path.exists():
                 print(f"ERROR: Missing local file: {rel}", file=sys.stderr)
                 return 2
-            html = file_path.read_text(encoding="utf-8", errors="replace")
+            with span("read page", "disk", path=file_path):
+                html = file_path.read_text(encoding="utf-8", errors="replace")
             rows.append({"path": rel, "html": html})
 
+    # Pages fetched from --source-url-base have no HTML yet in a dry run, so there is nothing to compare.
+    published = {} if args.all or (source_url_base and args.dry_run) else _published_pages(table, args.offline)
+    if published and not source_url_base:
+        rows = _drop_unchanged(rows, published, table)
+
     if args.dry_run:
         for row in rows:
             src = source_url_base if source_url_base else "local"
@@ -240,6 +295,12 @@ def main() -> int:
                 print(f"ERROR: Fetch failed for {path}: {e}", file=sys.stderr)
                 return 2
             rows[i - 1] = {"path": path, "html": html}
+        if published:
+            rows = _drop_unchanged(rows, published, table)
+
+    if not rows:
+        print(f"Nothing to sync: every page already matches {table}.")
+        return 0
 
     service_role_key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY") or ""
     bearer = service_role_key.strip()
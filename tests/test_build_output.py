@@ -0,0 +1,154 @@
+"""Tests for the write-if-changed output layer in build_output."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import build_output  # noqa: E402
+from build_output import OutputWriter, atomic_output, write_if_changed  # noqa: E402
+
+
+PAGE = b"<p>" + b"x" * build_output.PRECOMPRESS_MIN_BYTES + b"</p>\n"
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch) -> Path:
+    monkeypatch.setattr(build_output, "ROOT", tmp_path)
+    monkeypatch.setattr(build_output, "BUILD_CACHE_DIR", tmp_path / ".build-cache")
+    return tmp_path
+
+
+def test_check_mode_writes_nothing_and_returns_no_record(root) -> None:
+    path = root / "page.html"
+    assert write_if_changed(path, PAGE, None, check=True, precompress=True) == (None, True)
+    assert not path.exists()
+    assert list(root.iterdir()) == []
+
+    path.write_bytes(b"old")
+    assert write_if_changed(path, PAGE, None, check=True) == (None, True)
+    assert path.read_bytes() == b"old"
+
+
+def test_matching_record_skips_the_write(root, monkeypatch) -> None:
+    path = root / "page.html"
+    record, changed = write_if_changed(path, PAGE, None)
+    assert changed and path.read_bytes() == PAGE
+    mtime_ns = path.stat().st_mtime_ns
+
+    # The record matches the file's stat, so the file is neither read nor rewritten.
+    monkeypatch.setattr(build_output, "matches_content", lambda path, data: pytest.fail("file was read"))
+    monkeypatch.setattr(build_output, "atomic_output", lambda path: pytest.fail("file was written"))
+    assert write_if_changed(path, PAGE, record) == (record, False)
+    assert path.stat().st_mtime_ns == mtime_ns
+
+
+def test_matching_content_skips_the_write_and_records_it(root) -> None:
+    path = root / "page.html"
+    path.write_bytes(PAGE)
+    mtime_ns = path.stat().st_mtime_ns
+    record, changed = write_if_changed(path, PAGE, ["stale digest", 0, 0])
+    assert not changed
+    assert record == build_output.file_record(path, record[0])
+    assert path.stat().st_mtime_ns == mtime_ns
+
+
+def test_temp_file_is_removed_when_writing_fails(root) -> None:
+    path = root / "out" / "page.html"
+    with pytest.raises(RuntimeError):
+        with atomic_output(path) as handle:
+            handle.write(b"partial")
+            raise RuntimeError("boom")
+    assert not path.exists()
+    assert list(path.parent.iterdir()) == []
+
+    writer = OutputWriter("test", check=True)
+    path.write_bytes(b"old")
+    with writer.stream(path) as handle:
+        handle.write(PAGE)
+    assert writer.changed == ["out/page.html"]
+    assert [child.name for child in path.parent.iterdir()] == ["page.html"]
+    assert path.read_bytes() == b"old"
+
+
+def test_compressed_siblings_follow_the_output(root, monkeypatch) -> None:
+    monkeypatch.setattr(build_output, "brotli", SimpleNamespace(compress=lambda data, quality: b"br" + data))
+    path = root / "page.html"
+    gz, br = root / "page.html.gz", root / "page.html.br"
+
+    record, _ = write_if_changed(path, PAGE, None, precompress=True)
+    assert gzip.decompress(gz.read_bytes()) == PAGE
+    assert br.read_bytes() == b"br" + PAGE
+
+    # A missing sibling is rebuilt even when the output itself is unchanged.
+    gz.unlink()
+    write_if_changed(path, PAGE, record, precompress=True)
+    assert gzip.decompress(gz.read_bytes()) == PAGE
+
+    # Small outputs and builds without --precompress drop the siblings.
+    write_if_changed(path, b"<p>small</p>\n", record, precompress=True)
+    assert not gz.exists() and not br.exists()
+    write_if_changed(path, PAGE, None, precompress=True)
+    write_if_changed(path, PAGE, None, precompress=False)
+    assert not gz.exists() and not br.exists()
+
+
+def test_stale_br_sibling_is_removed_without_brotli(root, monkeypatch) -> None:
+    monkeypatch.setattr(build_output, "brotli", None)
+    path = root / "page.html"
+    (root / "page.html.br").write_bytes(b"stale")
+    write_if_changed(path, PAGE, None, precompress=True)
+    assert (root / "page.html.gz").exists()
+    assert not (root / "page.html.br").exists()
+
+
+def test_remove_deletes_the_output_and_its_siblings(root) -> None:
+    path = root / "page.html"
+    writer = OutputWriter("test", precompress=True)
+    writer.write_bytes(path, PAGE)
+    writer.remove(path)
+    assert list(root.iterdir()) == []
+    assert writer.removed == ["page.html"]
+    assert writer.records == {}
+
+
+def test_remove_in_check_mode_only_reports(root) -> None:
+    path = root / "page.html"
+    path.write_bytes(PAGE)
+    writer = OutputWriter("test", check=True)
+    writer.remove(path)
+    assert path.exists()
+    assert writer.changed == ["page.html"]
+    assert writer.removed == []
+
+
+def test_save_writes_the_manifest_and_the_report(root) -> None:
+    writer = OutputWriter("test")
+    writer.write_text(root / "b.html", "b")
+    writer.write_text(root / "a.html", "a")
+    writer.save()
+    manifest = json.loads((root / ".build-cache" / "outputs-test.json").read_text(encoding="utf-8"))
+    assert manifest["version"] == build_output.OUTPUT_MANIFEST_VERSION
+    assert list(manifest["outputs"]) == ["a.html", "b.html"]
+    report = json.loads((root / ".build-cache" / "changes-test.json").read_text(encoding="utf-8"))
+    assert report == {"generator": "test", "changed": ["a.html", "b.html"], "removed": []}
+
+    # The next run starts from the saved records and reports nothing.
+    again = OutputWriter("test")
+    assert again.records == writer.records
+    assert not again.write_text(root / "a.html", "a")
+
+
+def test_save_in_check_mode_leaves_the_manifest_alone(root) -> None:
+    writer = OutputWriter("test", check=True, report_path=root / "report.json")
+    writer.write_text(root / "a.html", "a")
+    writer.save()
+    assert not (root / ".build-cache" / "outputs-test.json").exists()
+    assert json.loads((root / "report.json").read_text(encoding="utf-8"))["changed"] == ["a.html"]
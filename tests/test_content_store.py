@@ -0,0 +1,153 @@
+"""Tests for content_store.sync_table against a stubbed PostgREST."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from urllib.parse import parse_qsl
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import content_store  # noqa: E402
+
+
+class FakeSupabase:
+    """Answers the queries sync_table sends from an in-memory ``blog_posts`` table."""
+
+    def __init__(self) -> None:
+        self.rows: dict[int, dict] = {}
+        self.queries: list[str] = []
+
+    def put(self, key: int, updated_at: str, is_published: bool = True, title: str = "") -> None:
+        self.rows[key] = {
+            "id": key,
+            "slug": f"post-{key}",
+            "title": title or f"Post {key}",
+            "is_published": is_published,
+            "updated_at": updated_at,
+        }
+
+    def __call__(self, query: str) -> list[dict]:
+        self.queries.append(query)
+        table, _, params = query.partition("?")
+        assert table == "blog_posts"
+        rows = sorted(self.rows.values(), key=lambda row: row["id"])
+        columns = None
+        for name, value in parse_qsl(params, keep_blank_values=True):
+            if name == "select":
+                columns = None if value == "*" else value.split(",")
+            elif name == "is_published":
+                rows = [row for row in rows if row["is_published"] == (value == "eq.true")]
+            elif name == "id" and value.startswith("gt."):
+                rows = [row for row in rows if row["id"] > int(value[3:])]
+            elif name == "id" and value.startswith("in."):
+                keys = {int(key.strip('"')) for key in value[4:-1].split(",")}
+                rows = [row for row in rows if row["id"] in keys]
+            elif name == "limit":
+                rows = rows[: int(value)]
+        return [{column: row.get(column) for column in columns} if columns else dict(row) for row in rows]
+
+    def row_queries(self) -> list[str]:
+        """Queries other than the key listing every sync starts with."""
+        return [query for query in self.queries if "select=id,updated_at&" not in query]
+
+
+@pytest.fixture
+def supabase(tmp_path, monkeypatch) -> FakeSupabase:
+    fake = FakeSupabase()
+    monkeypatch.setattr(content_store, "BUILD_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(content_store, "CONTENT_STORE_PATH", tmp_path / "content.sqlite3")
+    monkeypatch.setattr(content_store, "request_supabase", fake)
+    fake.put(1, "2026-01-01T00:00:00+00:00")
+    fake.put(2, "2026-01-02T00:00:00+00:00")
+    fake.put(3, "2026-01-03T00:00:00+00:00")
+    return fake
+
+
+def sync(full_refresh: bool = False) -> content_store.TableState:
+    return content_store.sync_tables(["blog_posts"], full_refresh)["blog_posts"]
+
+
+def stored() -> dict[int, dict]:
+    return {row["id"]: row for row in content_store.table_rows("blog_posts")}
+
+
+def test_first_sync_downloads_every_row(supabase) -> None:
+    state = sync()
+    assert (state.count, state.watermark) == (3, "2026-01-03T00:00:00+00:00")
+    assert sorted(stored()) == [1, 2, 3]
+    assert len(supabase.row_queries()) == 1
+
+
+def test_unchanged_listing_fetches_no_rows(supabase) -> None:
+    first = sync()
+    supabase.queries.clear()
+    second = sync()
+    assert supabase.row_queries() == []
+    assert (second.count, second.watermark, second.digest) == (first.count, first.watermark, first.digest)
+
+
+def test_delta_fetches_only_edited_and_new_rows(supabase) -> None:
+    sync()
+    supabase.put(2, "2026-02-01T00:00:00+00:00", title="Edited")
+    supabase.put(4, "2026-02-02T00:00:00+00:00")
+    supabase.queries.clear()
+    state = sync()
+    [query] = supabase.row_queries()
+    assert "id=in.(%222%22,%224%22)" in query
+    assert stored()[2]["title"] == "Edited"
+    assert sorted(stored()) == [1, 2, 3, 4]
+    assert state.watermark == "2026-02-02T00:00:00+00:00"
+
+
+def test_edit_older_than_the_watermark_is_picked_up(supabase) -> None:
+    # Stamped before row 3's updated_at, as a transaction that committed late would be.
+    before = sync()
+    supabase.put(1, "2026-01-02T12:00:00+00:00", title="Late commit")
+    state = sync()
+    assert stored()[1]["title"] == "Late commit"
+    assert state.watermark == before.watermark
+    assert state.digest != before.digest
+
+
+def test_deleted_and_unpublished_rows_are_dropped(supabase) -> None:
+    sync()
+    del supabase.rows[1]
+    supabase.put(2, "2026-01-02T00:00:00+00:00", is_published=False)
+    supabase.queries.clear()
+    state = sync()
+    assert sorted(stored()) == [3]
+    assert state.count == 1
+    assert supabase.row_queries() == []
+
+
+def test_republished_row_is_fetched_by_key(supabase) -> None:
+    sync()
+    supabase.put(2, "2026-01-02T00:00:00+00:00", is_published=False)
+    sync()
+    # Republishing does not have to touch updated_at.
+    supabase.put(2, "2026-01-02T00:00:00+00:00", is_published=True)
+    supabase.queries.clear()
+    sync()
+    [query] = supabase.row_queries()
+    assert "id=in.(%222%22)" in query
+    assert sorted(stored()) == [1, 2, 3]
+
+
+def test_full_refresh_replaces_every_stored_row(supabase) -> None:
+    sync()
+    supabase.rows = {}
+    supabase.put(5, "2026-03-01T00:00:00+00:00")
+    supabase.queries.clear()
+    state = sync(full_refresh=True)
+    assert sorted(stored()) == [5]
+    assert state.count == 1
+    [query] = supabase.row_queries()
+    assert "id=in." not in query
+
+
+def test_reading_an_empty_store_offline_fails_cleanly(supabase) -> None:
+    with pytest.raises(content_store.EmptyStoreError, match="no blog_posts rows yet"):
+        content_store.read_table("blog_posts", offline=True)
@@ -0,0 +1,51 @@
+"""Regression tests for prerender_projects.write_detail_pages under --fail-fast."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import build_output  # noqa: E402
+import prerender_projects  # noqa: E402
+from build_output import OutputWriter  # noqa: E402
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_output, "ROOT", tmp_path)
+    monkeypatch.setattr(build_output, "BUILD_CACHE_DIR", tmp_path / ".build-cache")
+    monkeypatch.setattr(prerender_projects, "ROOT", tmp_path)
+    pages = tmp_path / "pages" / "projects"
+    pages.mkdir(parents=True)
+    for name in ("a.html", "b.html", "c.html"):
+        (pages / name).write_text("old\n", encoding="utf-8")
+    return tmp_path
+
+
+def jobs(check: bool) -> list:
+    return [
+        (f"pages/projects/{name}", "new\n", None, {}, None, None, check)
+        for name in ("a.html", "b.html", "c.html")
+    ]
+
+
+def test_fail_fast_returns_only_the_pages_it_checked(site) -> None:
+    writer = OutputWriter("test-detail-pages", check=True)
+    processed = prerender_projects.write_detail_pages(writer, jobs(check=True), 1, fail_fast=True)
+    assert processed == ["pages/projects/a.html"]
+    assert writer.changed == ["pages/projects/a.html"]
+    # Stale pages get no record in check mode, so nothing here may be cached as current.
+    assert writer.records == {}
+    assert (site / "pages/projects/b.html").read_text(encoding="utf-8") == "old\n"
+
+
+def test_without_fail_fast_every_page_is_processed(site) -> None:
+    writer = OutputWriter("test-detail-pages")
+    processed = prerender_projects.write_detail_pages(writer, jobs(check=False), 1, fail_fast=False)
+    assert processed == ["pages/projects/a.html", "pages/projects/b.html", "pages/projects/c.html"]
+    assert sorted(writer.records) == processed
+    assert (site / "pages/projects/c.html").read_text(encoding="utf-8") == "new\n"
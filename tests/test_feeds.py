@@ -0,0 +1,92 @@
+"""The Atom, RSS and JSON feeds must parse and list the same posts in the same order."""
+
+from __future__ import annotations
+
+import json
+import sys
+import xml.etree.ElementTree as ElementTree
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import build_output  # noqa: E402
+import prerender_blog  # noqa: E402
+from build_output import OutputWriter  # noqa: E402
+from prerender_blog import ATOM_FEED_PATH, JSON_FEED_PATH, RSS_FEED_PATH, BlogPost  # noqa: E402
+
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+def post(number: int, **fields) -> BlogPost:
+    values = {
+        "id": number,
+        "slug": f"post-{number}",
+        "title": f"Post {number}",
+        "excerpt": "",
+        "body": f"Body {number}.\n\n![Figure](/assets/images/blog/figure.png)",
+        "cover_image_url": "",
+        "published_at": f"2026-01-{number:02d}T00:00:00Z",
+        "updated_at": "",
+        "created_at": "",
+    }
+    values.update(fields)
+    return BlogPost(**values)
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch) -> Path:
+    monkeypatch.setattr(build_output, "ROOT", tmp_path)
+    monkeypatch.setattr(build_output, "BUILD_CACHE_DIR", tmp_path / ".build-cache")
+    monkeypatch.setattr(prerender_blog, "ROOT", tmp_path)
+    (tmp_path / "pages" / "blog").mkdir(parents=True)
+    return tmp_path
+
+
+def feed_ids(root: Path) -> dict[str, list[str]]:
+    atom = ElementTree.parse(root / ATOM_FEED_PATH).getroot()
+    rss = ElementTree.parse(root / RSS_FEED_PATH).getroot()
+    feed = json.loads((root / JSON_FEED_PATH).read_text(encoding="utf-8"))
+    return {
+        "atom": [entry.find(f"{ATOM}id").text for entry in atom.iter(f"{ATOM}entry")],
+        "rss": [item.find("guid").text for item in rss.iter("item")],
+        "json": [item["id"] for item in feed["items"]],
+    }
+
+
+def test_feeds_list_the_same_posts_in_order(root) -> None:
+    posts = [
+        post(3, title="Tools & <tags>", excerpt="Café “quotes”"),
+        post(1, cover_image_url="/assets/images/blog/cover.png"),
+        post(2, updated_at="2026-02-01T00:00:00Z"),
+    ]
+    prerender_blog.write_feeds(OutputWriter("test"), posts)
+
+    expected = [prerender_blog.article_url(item) for item in posts]
+    assert feed_ids(root) == {"atom": expected, "rss": expected, "json": expected}
+
+    feed = json.loads((root / JSON_FEED_PATH).read_text(encoding="utf-8"))
+    assert feed["version"] == "https://jsonfeed.org/version/1.1"
+    assert feed["items"][0]["title"] == "Tools & <tags>"
+    assert feed["items"][0]["summary"] == "Café “quotes”"
+    assert feed["items"][1]["image"].endswith("/assets/images/blog/cover.png")
+    assert "image" not in feed["items"][0]
+    assert feed["items"][2]["date_modified"] == "2026-02-01T00:00:00Z"
+    assert f'src="{prerender_blog.SITE_ORIGIN}/assets/images/blog/figure.png"' in feed["items"][0]["content_html"]
+
+
+def test_empty_feeds_are_valid(root) -> None:
+    prerender_blog.write_feeds(OutputWriter("test"), [])
+    assert feed_ids(root) == {"atom": [], "rss": [], "json": []}
+
+
+def test_a_full_feed_keeps_every_post(root) -> None:
+    posts = [post(number % 28 + 1, slug=f"post-{number}") for number in range(prerender_blog.FEED_POST_COUNT)]
+    prerender_blog.write_feeds(OutputWriter("test"), posts)
+    assert {name: len(ids) for name, ids in feed_ids(root).items()} == {
+        "atom": prerender_blog.FEED_POST_COUNT,
+        "rss": prerender_blog.FEED_POST_COUNT,
+        "json": prerender_blog.FEED_POST_COUNT,
+    }
@@ -0,0 +1,123 @@
+"""Tests for reading js/blog-local-posts.js without running Node."""
+
+from __future__ import annotations
+
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import prerender_blog  # noqa: E402
+from prerender_blog import JsLiteralError, JsLiteralParser, read_local_posts_literal  # noqa: E402
+
+
+def parse(source: str) -> object:
+    return JsLiteralParser(source).parse_value()
+
+
+def test_quotes_and_escapes() -> None:
+    assert parse(r"""['it\'s', "say \"hi\"", 'a\nb\t\\', "\x41é\u{1F600}", 'line \
+joined']""") == ["it's", 'say "hi"', "a\nb\t\\", "Aé\U0001F600", "line joined"]
+    assert parse("""'single "double"' + "double 'single'\"""") == "single \"double\"double 'single'"
+
+
+def test_template_literals() -> None:
+    assert parse("`first\nsecond costs $5 and {braces}`") == "first\nsecond costs $5 and {braces}"
+    assert parse(r"`back\`tick`") == "back`tick"
+    with pytest.raises(JsLiteralError, match="Template substitutions"):
+        parse("`hello ${name}`")
+
+
+def test_trailing_commas_comments_and_keys() -> None:
+    source = """
+    // leading comment
+    [
+      {
+        id: 1, /* inline */ 'quoted-key': "a",
+        "double": -2.5e1, hex: 0x1F, $dollar: true, nothing: null, missing: undefined,
+        nested: [1, 2,], // trailing
+      },
+    ]
+    """
+    assert parse(source) == [
+        {
+            "id": 1,
+            "quoted-key": "a",
+            "double": -25,
+            "hex": 31,
+            "$dollar": True,
+            "nothing": None,
+            "missing": None,
+            "nested": [1, 2],
+        }
+    ]
+
+
+@pytest.mark.parametrize(
+    ("source", "message"),
+    [
+        ("['open", "Unterminated string"),
+        ("['a\nb']", "Unterminated string"),
+        ("[1 /* open", "Unterminated comment"),
+        ("[new Date()]", "Unsupported expression"),
+        ("['a' + b]", "Only string literals"),
+        ("{\n\n[x]: 1}", "Unsupported object key at line 3"),
+    ],
+)
+def test_non_literal_data_is_rejected(source, message) -> None:
+    with pytest.raises(JsLiteralError, match=message):
+        parse(source)
+
+
+def test_reads_the_assignment_only() -> None:
+    source = "(function () {\n  window.__LOCAL_BLOG_POSTS__ = [{slug: 'a'}];\n})();\n"
+    assert read_local_posts_literal(source) == [{"slug": "a"}]
+    assert read_local_posts_literal("window.other = [];") == []
+    with pytest.raises(JsLiteralError, match="not an array"):
+        read_local_posts_literal("window.__LOCAL_BLOG_POSTS__ = {};")
+
+
+@pytest.fixture
+def posts_file(tmp_path, monkeypatch):
+    path = tmp_path / "blog-local-posts.js"
+    monkeypatch.setattr(prerender_blog, "LOCAL_BLOG_POSTS_PATH", path)
+    monkeypatch.setattr(prerender_blog, "LOCAL_POSTS_CACHE", {})
+    return path
+
+
+def test_computed_values_fall_back_to_node(posts_file, monkeypatch) -> None:
+    posts_file.write_text("window.__LOCAL_BLOG_POSTS__ = [{slug: 'a', title: 'A'.toUpperCase()}];\n")
+    calls = []
+
+    def fake_node(path: Path) -> list:
+        calls.append(path)
+        return [{"slug": "a", "title": "A"}]
+
+    monkeypatch.setattr(prerender_blog, "read_local_posts_with_node", fake_node)
+    assert [post.title for post in prerender_blog.load_local_blog_posts()] == ["A"]
+    assert calls == [posts_file]
+    # Cached by mtime and size, so an unchanged file is not read again.
+    prerender_blog.load_local_blog_posts()
+    assert calls == [posts_file]
+
+
+def test_literal_data_does_not_need_node(posts_file, monkeypatch) -> None:
+    def fail(path: Path) -> list:
+        raise AssertionError("Node should not run for literal data")
+
+    monkeypatch.setattr(prerender_blog, "read_local_posts_with_node", fail)
+    posts_file.write_text("window.__LOCAL_BLOG_POSTS__ = [{slug: 'a', title: 'First'}];\n")
+    assert [post.title for post in prerender_blog.load_local_blog_posts()] == ["First"]
+    posts_file.write_text("window.__LOCAL_BLOG_POSTS__ = [{slug: 'a', title: 'Second edit'}];\n")
+    assert [post.title for post in prerender_blog.load_local_blog_posts()] == ["Second edit"]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="Node.js is not installed")
+def test_matches_node_on_the_real_file() -> None:
+    path = prerender_blog.LOCAL_BLOG_POSTS_PATH
+    if not path.exists():
+        pytest.skip("js/blog-local-posts.js is not present")
+    assert read_local_posts_literal(path.read_text(encoding="utf-8")) == prerender_blog.read_local_posts_with_node(path)
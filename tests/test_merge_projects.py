@@ -0,0 +1,54 @@
+"""prerender_projects.merge_projects must merge exactly as the scan-per-local-project merge did."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import prerender_projects  # noqa: E402
+from bench_prerender import (  # noqa: E402
+    legacy_merge_projects,
+    local_projects,
+    synthetic_local_projects,
+    synthetic_projects,
+)
+
+
+@pytest.mark.parametrize("count", [0, 1, 50, 2000])
+def test_matches_the_old_merge_with_the_real_local_projects(count) -> None:
+    rows, case_studies = synthetic_projects(count)
+    assert prerender_projects.merge_projects(rows, case_studies) == legacy_merge_projects(rows, case_studies)
+
+
+@pytest.mark.parametrize("count", [10, 500])
+def test_matches_the_old_merge_with_many_local_projects(count) -> None:
+    rows, case_studies = synthetic_projects(count)
+    with local_projects(synthetic_local_projects(count // 5, count)):
+        assert prerender_projects.merge_projects(rows, case_studies) == legacy_merge_projects(rows, case_studies)
+
+
+def test_local_project_overlays_a_row_with_an_unusable_href() -> None:
+    rows = [
+        {"id": 1, "title": "Remote", "href": "pages/alpha"},
+        {"id": 2, "title": "Duplicate", "href": "projects/alpha.html"},
+        {"id": 3, "title": "Other", "href": "../projects/beta.html?ref=x#top"},
+    ]
+    overlay = [
+        {"title": "Local alpha", "href": "projects/alpha.html"},
+        {"title": "Local alpha again", "href": "projects/alpha.html?v=2"},
+    ]
+    with local_projects(overlay):
+        merged = prerender_projects.merge_projects(rows, {"beta": {"summary": "Beta summary."}})
+        assert merged == legacy_merge_projects(rows, {"beta": {"summary": "Beta summary."}})
+    assert [(project["title"], project["href"]) for project in merged] == [
+        ("Local alpha again", "projects/alpha.html?v=2"),
+        ("Duplicate", "projects/alpha.html"),
+        ("Other", "projects/beta.html?ref=x#top"),
+    ]
+    assert merged[2]["description"] == "Beta summary."
+    # Rows are copied; the caller's dicts are left as they were.
+    assert rows[0] == {"id": 1, "title": "Remote", "href": "pages/alpha"}
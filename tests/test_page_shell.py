@@ -0,0 +1,38 @@
+"""Tests for page_shell.PageTemplate."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from page_shell import PageTemplate  # noqa: E402
+
+
+def test_render_applies_each_filter() -> None:
+    template = PageTemplate('<a title="{{ title|attr }}">{{ body|text }}</a>{{ html }}')
+    assert template.render(title='"A" & B', body="<b>'x'</b>", html="<br>") == (
+        '<a title="&quot;A&quot; &amp; B">&lt;b&gt;\'x\'&lt;/b&gt;</a><br>'
+    )
+
+
+def test_repeated_slots_and_literal_braces() -> None:
+    template = PageTemplate("{{ name|attr }} {x} {{ name|attr }} {{ name }}")
+    assert template.render(name="<n>") == "&lt;n&gt; {x} &lt;n&gt; <n>"
+
+
+def test_bind_folds_values_into_the_literals() -> None:
+    template = PageTemplate("{{ marker }}|{{ title|attr }}|{{ marker }}").bind(marker="<!-- m -->")
+    assert template.slots == [("title", "attr")]
+    assert template.render(title="a&b") == "<!-- m -->|a&amp;b|<!-- m -->"
+    assert PageTemplate("{{ a }}").bind(a="x").render() == "x"
+
+
+def test_missing_slot_and_unknown_filter() -> None:
+    with pytest.raises(TypeError, match="'title'"):
+        PageTemplate("{{ title }}").render()
+    with pytest.raises(ValueError, match="Unknown template filter"):
+        PageTemplate("{{ title|upper }}")
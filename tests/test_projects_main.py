@@ -0,0 +1,41 @@
+"""prerender_projects.run must always return; main() starts the watcher after it, as the blog does."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import prerender_projects  # noqa: E402
+
+
+def fake_build(monkeypatch, code: int) -> list[str]:
+    calls: list[str] = []
+
+    def run(args) -> int:
+        calls.append("run")
+        return code
+
+    monkeypatch.setattr(prerender_projects, "run", run)
+    monkeypatch.setattr(prerender_projects, "watch_projects", lambda args: calls.append("watch"))
+    return calls
+
+
+def test_main_watches_after_a_successful_run(monkeypatch) -> None:
+    calls = fake_build(monkeypatch, 0)
+    monkeypatch.setattr(sys, "argv", ["prerender_projects.py", "--watch"])
+    assert prerender_projects.main() == 0
+    assert calls == ["run", "watch"]
+
+
+def test_main_does_not_watch_after_a_failed_run_or_without_the_flag(monkeypatch) -> None:
+    calls = fake_build(monkeypatch, 1)
+    monkeypatch.setattr(sys, "argv", ["prerender_projects.py", "--watch"])
+    assert prerender_projects.main() == 1
+    assert calls == ["run"]
+
+    calls = fake_build(monkeypatch, 0)
+    monkeypatch.setattr(sys, "argv", ["prerender_projects.py"])
+    assert prerender_projects.main() == 0
+    assert calls == ["run"]
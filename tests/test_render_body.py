@@ -0,0 +1,87 @@
+"""Tests for the markup prerender_blog.render_body understands."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from prerender_blog import render_body  # noqa: E402
+
+
+def test_inline_backticks_at_line_start_are_not_a_fence() -> None:
+    rendered = render_body("```foo``` is how you write inline code.\n\nSecond paragraph.\n\nThird.")
+    assert "<pre>" not in rendered
+    assert rendered.split("\n") == [
+        "<p>```foo``` is how you write inline code.</p>",
+        "<p>Second paragraph.</p>",
+        "<p>Third.</p>",
+    ]
+
+
+def test_unclosed_fence_renders_as_a_paragraph() -> None:
+    rendered = render_body("Intro.\n\n```js\nconst x = 1;\n\nNext paragraph.\n\nLast.")
+    assert "<pre>" not in rendered
+    assert rendered.split("\n") == [
+        "<p>Intro.</p>",
+        "<p>```js<br>const x = 1;</p>",
+        "<p>Next paragraph.</p>",
+        "<p>Last.</p>",
+    ]
+
+
+def test_closed_fence_keeps_blank_lines_and_stops_at_the_closing_line() -> None:
+    rendered = render_body("```python\nx = 1\n\ny = 2\n```\n\nAfter.")
+    assert rendered.split("\n") == [
+        '<pre><code class="language-python">x = 1',
+        "",
+        "y = 2</code></pre>",
+        "<p>After.</p>",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("body", "expected"),
+    [
+        ("- one\n- two **b**", "<ul><li>one</li><li>two <strong>b</strong></li></ul>"),
+        ("* star item\n+ plus item", "<ul><li>star item</li><li>plus item</li></ul>"),
+        ("1. a\n2) b", "<ol><li>a</li><li>b</li></ol>"),
+        # A block that mixes bullets and numbers is not a list.
+        ("- a\n1. b", "<p>- a<br>1. b</p>"),
+    ],
+)
+def test_lists(body, expected) -> None:
+    assert render_body(body) == expected
+
+
+def test_blockquote_needs_every_line_quoted() -> None:
+    assert render_body("> quoted *em*\n>second") == "<blockquote><p>quoted <em>em</em><br>second</p></blockquote>"
+    assert render_body("> a\nnot") == "<p>&gt; a<br>not</p>"
+
+
+@pytest.mark.parametrize(
+    ("body", "expected"),
+    [
+        ("***both***", "<p><em><strong>both</strong></em></p>"),
+        ("**bold *em* more**", "<p>**bold <em>em</em> more**</p>"),
+        ("a*b*c and **x**y*", "<p>a<em>b</em>c and <strong>x</strong>y*</p>"),
+        ("2**3** 4*5", "<p>2<strong>3</strong> 4*5</p>"),
+        ("## Head *x*", "<h2>Head <em>x</em></h2>"),
+    ],
+)
+def test_emphasis_nesting(body, expected) -> None:
+    assert render_body(body) == expected
+
+
+def test_underline() -> None:
+    assert render_body("++u **s** u++") == "<p><u>u <strong>s</strong> u</u></p>"
+    assert render_body("++ not closed") == "<p>++ not closed</p>"
+
+
+def test_html_is_escaped() -> None:
+    assert render_body("x < y & \"q\" 'a'") == "<p>x &lt; y &amp; \"q\" 'a'</p>"
+    assert render_body("```py\na < b\n```") == '<pre><code class="language-py">a &lt; b</code></pre>'
+    assert 'alt="Alt &lt;x&gt;"' in render_body("![Alt <x>](/assets/images/a.png)")